@@ -0,0 +1,139 @@
+from collections import OrderedDict
+
+from redis.asyncio import Redis
+
+from app.services.cache_codec import CacheCodec, CacheCodecError, cache_codec
+from app.services.metrics import Counter, Gauge, STAGE_DURATION
+from app.services.offload import offloader
+from settings import setup_logger, BLOB_CACHE_MAX_BYTES, BLOB_CACHE_REDIS_TTL
+
+logger = setup_logger()
+
+BLOB_CACHE_REQUESTS = Counter(
+    "blob_cache_requests_total",
+    "Blob cache lookups by tier and result",
+)
+BLOB_CACHE_HIT_RATIO = Gauge(
+    "blob_cache_hit_ratio",
+    "Share of blob lookups served without fetching from GitHub",
+)
+BLOB_CACHE_BYTES = Gauge(
+    "blob_cache_bytes",
+    "Size of the blobs held in the in-process cache",
+)
+BLOB_CACHE_ENTRIES = Gauge(
+    "blob_cache_entries",
+    "Number of blobs held in the in-process cache",
+)
+
+
+class BlobCache:
+    REDIS_KEY_PREFIX = "blob:"
+
+    def __init__(
+        self,
+        max_bytes: int = BLOB_CACHE_MAX_BYTES,
+        redis_client: Redis | None = None,
+        redis_ttl: int = BLOB_CACHE_REDIS_TTL,
+        codec: CacheCodec | None = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.redis_client = redis_client
+        self.redis_ttl = redis_ttl
+        self.codec = codec or cache_codec
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _record(self, tier: str, hit: bool) -> None:
+        BLOB_CACHE_REQUESTS.inc(tier=tier, result="hit" if hit else "miss")
+
+    def _record_lookup(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        BLOB_CACHE_HIT_RATIO.set(self.hit_ratio)
+
+    def _get_local(self, sha: str) -> str | None:
+        entry = self._entries.get(sha)
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(sha)
+        return entry[0]
+
+    def _set_local(self, sha: str, content: str) -> None:
+        size = len(content.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(sha, None)
+        if previous is not None:
+            self.size -= previous[1]
+
+        self._entries[sha] = (content, size)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+        BLOB_CACHE_BYTES.set(self.size)
+        BLOB_CACHE_ENTRIES.set(len(self._entries))
+
+    async def get(self, sha: str) -> str | None:
+        content = self._get_local(sha)
+        self._record("memory", content is not None)
+        if content is not None:
+            self._record_lookup(True)
+            return content
+
+        if self.redis_client is not None:
+            try:
+                with STAGE_DURATION.time(stage="blob_cache_get"):
+                    cached = await self.redis_client.get(
+                        f"{self.REDIS_KEY_PREFIX}{sha}"
+                    )
+            except Exception as exc:
+                logger.info(f"Failed to fetch cached blob. Error: '{exc}'")
+                cached = None
+
+            if cached is not None:
+                try:
+                    content = await offloader.run(
+                        len(cached), self.codec.decode, cached, "text"
+                    )
+                except CacheCodecError as exc:
+                    logger.info(f"Discarding unreadable blob: '{exc}'")
+                else:
+                    self._set_local(sha, content)
+            self._record("redis", content is not None)
+
+        self._record_lookup(content is not None)
+        return content
+
+    async def set(self, sha: str, content: str) -> None:
+        self._set_local(sha, content)
+
+        if self.redis_client is not None:
+            try:
+                encoded = await offloader.run(
+                    len(content), self.codec.encode, content
+                )
+                with STAGE_DURATION.time(stage="blob_cache_set"):
+                    await self.redis_client.set(
+                        f"{self.REDIS_KEY_PREFIX}{sha}",
+                        encoded,
+                        ex=self.redis_ttl,
+                    )
+            except Exception as exc:
+                logger.info(
+                    f"Failed to adding a blob to cache. Error: '{exc}'"
+                )
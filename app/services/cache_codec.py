@@ -0,0 +1,194 @@
+import importlib
+import json
+import struct
+import zlib
+from types import ModuleType
+from typing import Any
+
+from app.services.metrics import Counter
+from settings import (
+    setup_logger,
+    CACHE_COMPRESSION,
+    CACHE_COMPRESSION_LEVEL,
+    CACHE_COMPRESSION_MIN_BYTES,
+    CACHE_COMPRESSIONS,
+    CACHE_SERIALIZER,
+    CACHE_SERIALIZERS,
+)
+
+logger = setup_logger()
+
+CACHE_CODEC_BYTES = Counter(
+    "cache_codec_bytes_total",
+    "Bytes encoded for Redis caches before and after compression",
+)
+
+
+def _optional_module(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+orjson = _optional_module("orjson")
+msgpack = _optional_module("msgpack")
+zstandard = _optional_module("zstandard")
+lz4_frame = _optional_module("lz4.frame")
+
+PACKAGES = {
+    "orjson": orjson,
+    "msgpack": msgpack,
+    "zstd": zstandard,
+    "lz4": lz4_frame,
+}
+
+
+class CacheCodecError(ValueError):
+    pass
+
+
+class CacheCodec:
+    MAGIC = b"\xffCR"
+    VERSION = 1
+    HEADER = struct.Struct("<3sBBB")
+    SERIALIZER_IDS = {"text": 0, "json": 1, "orjson": 2, "msgpack": 3}
+    COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+
+    def __init__(
+        self,
+        serializer: str = CACHE_SERIALIZER,
+        compression: str = CACHE_COMPRESSION,
+        compression_min_bytes: int = CACHE_COMPRESSION_MIN_BYTES,
+        compression_level: int = CACHE_COMPRESSION_LEVEL,
+    ) -> None:
+        if serializer not in CACHE_SERIALIZERS:
+            raise ValueError(
+                f"Unsupported cache serializer: {serializer}. "
+                f"Must be one of {CACHE_SERIALIZERS}"
+            )
+        if compression not in CACHE_COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported cache compression: {compression}. "
+                f"Must be one of {CACHE_COMPRESSIONS}"
+            )
+
+        self.serializer = self._available(serializer, "json")
+        self.compression = self._available(compression, "zlib")
+        self.compression_min_bytes = compression_min_bytes
+        self.compression_level = compression_level
+
+    @staticmethod
+    def _available(name: str, fallback: str) -> str:
+        if name in PACKAGES and PACKAGES[name] is None:
+            logger.warning(
+                f"Package for '{name}' is not installed. "
+                f"Falling back to {fallback}"
+            )
+            return fallback
+        return name
+
+    def _dumps(self, value: Any) -> tuple[str, bytes]:
+        if isinstance(value, str):
+            return "text", value.encode("utf-8")
+        if self.serializer == "orjson":
+            return "orjson", orjson.dumps(value)
+        if self.serializer == "msgpack":
+            return "msgpack", msgpack.packb(value, use_bin_type=True)
+        return "json", json.dumps(value, separators=(",", ":")).encode()
+
+    @staticmethod
+    def _loads(serializer: int, payload: bytes) -> Any:
+        if serializer == CacheCodec.SERIALIZER_IDS["text"]:
+            return payload.decode("utf-8")
+        if serializer in (
+            CacheCodec.SERIALIZER_IDS["json"],
+            CacheCodec.SERIALIZER_IDS["orjson"],
+        ):
+            return orjson.loads(payload) if orjson else json.loads(payload)
+        if serializer == CacheCodec.SERIALIZER_IDS["msgpack"] and msgpack:
+            return msgpack.unpackb(payload, raw=False)
+        raise CacheCodecError(f"Unsupported cache serializer id {serializer}")
+
+    def _compress(self, payload: bytes) -> tuple[str, bytes]:
+        if (
+            self.compression == "none"
+            or len(payload) < self.compression_min_bytes
+        ):
+            return "none", payload
+
+        if self.compression == "zstd":
+            compressed = zstandard.ZstdCompressor(
+                level=self.compression_level
+            ).compress(payload)
+        elif self.compression == "lz4":
+            compressed = lz4_frame.compress(
+                payload, compression_level=self.compression_level
+            )
+        else:
+            compressed = zlib.compress(payload, self.compression_level)
+
+        if len(compressed) >= len(payload):
+            return "none", payload
+        return self.compression, compressed
+
+    @staticmethod
+    def _decompress(compression: int, payload: bytes) -> bytes:
+        if compression == CacheCodec.COMPRESSION_IDS["none"]:
+            return payload
+        if compression == CacheCodec.COMPRESSION_IDS["zlib"]:
+            return zlib.decompress(payload)
+        if compression == CacheCodec.COMPRESSION_IDS["zstd"] and zstandard:
+            return zstandard.ZstdDecompressor().decompress(payload)
+        if compression == CacheCodec.COMPRESSION_IDS["lz4"] and lz4_frame:
+            return lz4_frame.decompress(payload)
+        raise CacheCodecError(
+            f"Unsupported cache compression id {compression}"
+        )
+
+    def encode(self, value: Any) -> bytes:
+        serializer, payload = self._dumps(value)
+        compression, encoded = self._compress(payload)
+        CACHE_CODEC_BYTES.inc(len(payload), stage="serialized")
+        CACHE_CODEC_BYTES.inc(len(encoded), stage="stored")
+
+        return self.HEADER.pack(
+            self.MAGIC,
+            self.VERSION,
+            self.SERIALIZER_IDS[serializer],
+            self.COMPRESSION_IDS[compression],
+        ) + encoded
+
+    def decode(self, data: bytes | str, legacy: str = "json") -> Any:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        if not data.startswith(self.MAGIC):
+            try:
+                if legacy == "text":
+                    return data.decode("utf-8")
+                return json.loads(data)
+            except ValueError as exc:
+                raise CacheCodecError(f"Unreadable cache entry: {exc}")
+
+        try:
+            _, version, serializer, compression = self.HEADER.unpack_from(
+                data
+            )
+        except struct.error as exc:
+            raise CacheCodecError(f"Truncated cache entry: {exc}")
+        if version != self.VERSION:
+            raise CacheCodecError(f"Unsupported cache entry version {version}")
+
+        try:
+            return self._loads(
+                serializer,
+                self._decompress(compression, data[self.HEADER.size:]),
+            )
+        except CacheCodecError:
+            raise
+        except Exception as exc:
+            raise CacheCodecError(f"Unreadable cache entry: {exc}")
+
+
+cache_codec = CacheCodec()
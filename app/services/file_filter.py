@@ -0,0 +1,111 @@
+import re
+
+from settings import (
+    FILE_FILTER_ENABLED,
+    FILE_FILTER_EXCLUDED_DIRS,
+    FILE_FILTER_EXCLUDED_EXTENSIONS,
+    FILE_FILTER_EXCLUDED_FILES,
+    FILE_FILTER_MAX_FILE_SIZE,
+)
+
+BYTES_PER_TOKEN = 4
+
+SOURCE_EXTENSIONS = (
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".kt", ".go", ".rs",
+    ".rb", ".php", ".cs", ".cpp", ".cc", ".c", ".h", ".hpp", ".swift",
+    ".scala", ".sql", ".html", ".css", ".scss", ".vue", ".svelte",
+)
+PROJECT_FILES = (
+    "readme.md", "readme.rst", "readme.txt", "pyproject.toml",
+    "requirements.txt", "package.json", "dockerfile", "docker-compose.yml",
+    "setup.py", "manage.py", "main.py", "app.py", "index.js", "index.ts",
+)
+
+
+def _words(text: str) -> set[str]:
+    return {
+        word
+        for word in re.split(r"[^a-z0-9]+", text.lower())
+        if len(word) > 2
+    }
+
+
+class FileFilter:
+    def __init__(
+        self,
+        enabled: bool = FILE_FILTER_ENABLED,
+        max_file_size: int = FILE_FILTER_MAX_FILE_SIZE,
+        excluded_dirs: tuple[str, ...] = FILE_FILTER_EXCLUDED_DIRS,
+        excluded_files: tuple[str, ...] = FILE_FILTER_EXCLUDED_FILES,
+        excluded_extensions: tuple[str, ...] = (
+            FILE_FILTER_EXCLUDED_EXTENSIONS
+        ),
+    ) -> None:
+        self.enabled = enabled
+        self.max_file_size = max_file_size
+        self.excluded_dirs = frozenset(excluded_dirs)
+        self.excluded_files = frozenset(excluded_files)
+        self.excluded_extensions = tuple(excluded_extensions)
+
+    def is_excluded_dir(self, path: str) -> bool:
+        return self.enabled and any(
+            part in self.excluded_dirs for part in path.split("/")
+        )
+
+    def is_relevant_file(self, path: str, size: int | None = None) -> bool:
+        if not self.enabled:
+            return True
+
+        directory, _, name = path.rpartition("/")
+        if directory and self.is_excluded_dir(directory):
+            return False
+        if name in self.excluded_files:
+            return False
+        if name.lower().endswith(self.excluded_extensions):
+            return False
+
+        return size is None or size <= self.max_file_size
+
+    @staticmethod
+    def score(path: str, keywords: set[str]) -> float:
+        name = path.rsplit("/", 1)[-1].lower()
+        score = 0.0
+
+        if name in PROJECT_FILES:
+            score += 3.0
+        if name.endswith(SOURCE_EXTENSIONS):
+            score += 2.0
+        if "test" in name:
+            score -= 0.5
+
+        score += 1.5 * len(_words(path) & keywords)
+        score -= 0.2 * path.count("/")
+
+        return score
+
+    def rank(
+        self, files: list[dict], assignment_description: str = ""
+    ) -> list[dict]:
+        keywords = _words(assignment_description)
+
+        return sorted(
+            files, key=lambda item: -self.score(item["path"], keywords)
+        )
+
+    def select(
+        self, files: list[dict], token_limit: int | None
+    ) -> tuple[list[dict], list[dict]]:
+        if token_limit is None:
+            return files, []
+
+        selected, skipped = [], []
+        estimated_tokens = 0
+        for item in files:
+            file_tokens = item.get("size", 0) // BYTES_PER_TOKEN
+            if estimated_tokens + file_tokens > token_limit:
+                skipped.append(item)
+                continue
+            selected.append(item)
+            estimated_tokens += file_tokens
+
+        return selected, skipped
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Mapping
+
+import httpx
+
+from app.services.metrics import Counter, Gauge
+from app.services.resilience import parse_retry_after
+from settings import (
+    setup_logger,
+    GITHUB_MAX_CONCURRENT_REQUESTS,
+    GITHUB_RATE_LIMIT_MAX_WAIT,
+    GITHUB_RATE_LIMIT_PACING_THRESHOLD,
+)
+
+logger = setup_logger()
+
+QUEUE_DEPTH = Gauge(
+    "github_scheduler_queue_depth",
+    "GitHub requests waiting for a free scheduler slot",
+)
+IN_FLIGHT = Gauge(
+    "github_scheduler_in_flight",
+    "GitHub requests currently in flight",
+)
+RATE_LIMIT_REMAINING = Gauge(
+    "github_rate_limit_remaining",
+    "Requests left in the current GitHub rate limit window",
+)
+RATE_LIMIT_RESET = Gauge(
+    "github_rate_limit_reset_timestamp",
+    "Unix time when the GitHub rate limit window resets",
+)
+RATE_LIMIT_PAUSED = Gauge(
+    "github_rate_limit_paused_seconds",
+    "Seconds until the scheduler resumes sending GitHub requests",
+)
+RATE_LIMITED_RESPONSES = Counter(
+    "github_rate_limited_responses_total",
+    "GitHub responses rejected by a primary or secondary rate limit",
+)
+
+
+class GitHubFetchScheduler:
+    SECONDARY_RATE_LIMIT_WAIT = 60.0
+
+    def __init__(
+        self,
+        max_concurrency: int = GITHUB_MAX_CONCURRENT_REQUESTS,
+        max_wait: float = GITHUB_RATE_LIMIT_MAX_WAIT,
+        pacing_threshold: int = GITHUB_RATE_LIMIT_PACING_THRESHOLD,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.pacing_threshold = pacing_threshold
+        self.rate_limit_remaining: int | None = None
+        self.rate_limit_reset: float | None = None
+        self._paused_until = 0.0
+        self._pacing_interval = 0.0
+        self._next_request_at = 0.0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        semaphore = self._get_semaphore()
+        QUEUE_DEPTH.inc()
+        try:
+            await semaphore.acquire()
+        finally:
+            QUEUE_DEPTH.dec()
+
+        IN_FLIGHT.inc()
+        try:
+            await self._wait_for_turn()
+            yield
+        finally:
+            IN_FLIGHT.dec()
+            semaphore.release()
+
+    async def _wait_for_turn(self) -> None:
+        now = time.time()
+        start = max(now, self._paused_until, self._next_request_at)
+        self._next_request_at = start + self._pacing_interval
+
+        delay = start - now
+        RATE_LIMIT_PAUSED.set(max(self._paused_until - now, 0.0))
+        if delay > 0:
+            logger.info(f"Waiting {delay:.2f}s before the next GitHub request")
+            await asyncio.sleep(delay)
+
+    def pause(self, delay: float) -> None:
+        self._paused_until = max(self._paused_until, time.time() + delay)
+        RATE_LIMIT_PAUSED.set(delay)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+
+        self.rate_limit_remaining = int(remaining)
+        self.rate_limit_reset = float(reset)
+        RATE_LIMIT_REMAINING.set(self.rate_limit_remaining)
+        RATE_LIMIT_RESET.set(self.rate_limit_reset)
+
+        self._pacing_interval = 0.0
+        if 0 < self.rate_limit_remaining <= self.pacing_threshold:
+            window = max(self.rate_limit_reset - time.time(), 0.0)
+            self._pacing_interval = min(
+                window / self.rate_limit_remaining, self.max_wait
+            )
+
+    def retry_delay(self, response: httpx.Response) -> float | None:
+        if response.status_code not in (403, 429):
+            return None
+
+        headers = response.headers
+        retry_after = parse_retry_after(headers)
+        if retry_after is not None:
+            delay = retry_after
+        elif headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(headers.get("X-RateLimit-Reset", time.time()))
+            delay = max(reset - time.time(), 0.0) + 1.0
+        elif "rate limit" in response.text.lower():
+            delay = self.SECONDARY_RATE_LIMIT_WAIT
+        else:
+            return None
+
+        RATE_LIMITED_RESPONSES.inc(status_code=response.status_code)
+        return delay
+
+
+github_scheduler = GitHubFetchScheduler()
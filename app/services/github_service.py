@@ -1,8 +1,11 @@
 import asyncio
 import base64
+import hashlib
+import io
 import os
-from datetime import datetime
-from typing import Any, Dict, List
+import tarfile
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 import httpx
 from dotenv import load_dotenv
@@ -10,15 +13,78 @@ from fastapi import HTTPException
 from fastapi import status
 from pydantic import HttpUrl
 
-from settings import setup_logger
+from app.services.blob_cache import BlobCache
+from app.services.file_filter import FileFilter
+from app.services.github_scheduler import github_scheduler
+from app.services.http_client import create_github_client
+from app.services.metrics import Counter, STAGE_DURATION
+from app.services.offload import offloader
+from app.services.repo_model import RepoFile, Repository
+from app.services.resilience import (
+    CircuitOpenError,
+    github_circuit_breaker,
+    github_retry_policy,
+    parse_retry_after,
+)
+from app.services.response_store import github_response_store
+from app.services.snapshot_store import SnapshotStore
+from app.services.token_counter import TokenBudget
+from settings import (
+    setup_logger,
+    GITHUB_API_URL,
+    GITHUB_FETCH_MODE,
+    GITHUB_FETCH_MODES,
+    GITHUB_RATE_LIMIT_MAX_RETRIES,
+    INCREMENTAL_REVIEW_MAX_FILES,
+)
 
 logger = setup_logger()
 
 load_dotenv()
 
+GITHUB_REQUESTS = Counter(
+    "github_requests_total",
+    "GitHub API requests by response status",
+)
+GITHUB_RETRIES = Counter(
+    "github_retries_total",
+    "Retried GitHub API requests by reason",
+)
+
+RETRYABLE_STATUS_CODES = (500, 502, 503, 504)
+
 
 class GitHubService:
-    API_HOST = "https://api.github.com"
+    API_HOST = GITHUB_API_URL
+
+    def __init__(
+        self,
+        fetch_mode: str = GITHUB_FETCH_MODE,
+        client: httpx.AsyncClient | None = None,
+        blob_cache: BlobCache | None = None,
+        file_filter: FileFilter | None = None,
+        snapshot_store: SnapshotStore | None = None,
+    ) -> None:
+        if fetch_mode not in GITHUB_FETCH_MODES:
+            raise ValueError(
+                f"Unsupported fetch mode: {fetch_mode}. "
+                f"Must be one of {GITHUB_FETCH_MODES}"
+            )
+        self.fetch_mode = fetch_mode
+        self.client = client
+        self.blob_cache = blob_cache
+        self.file_filter = file_filter or FileFilter()
+        self.snapshot_store = snapshot_store
+        self._head_commits: dict[tuple[str, str], str] = {}
+
+    @asynccontextmanager
+    async def _get_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.client is not None:
+            yield self.client
+            return
+
+        async with create_github_client() as client:
+            yield client
 
     @staticmethod
     def _validate_url(url: str) -> HttpUrl:
@@ -66,165 +132,763 @@ class GitHubService:
 
     @staticmethod
     async def _make_request(
-        url: str, client: httpx.AsyncClient
+        url: str, client: httpx.AsyncClient, conditional: bool = False
     ) -> list[dict] | dict:
+        stored = github_response_store.get(url) if conditional else None
+
+        response = await GitHubService._send_request(
+            url,
+            client,
+            extra_headers=stored.conditional_headers() if stored else None,
+        )
+
+        if stored is not None:
+            github_response_store.record(response.status_code == 304)
+            if response.status_code == 304:
+                logger.info(f"Repo contents not modified: {url}")
+                return stored.data
+
+        data = response.json()
+        if conditional:
+            github_response_store.put(
+                url, response.headers, data, len(response.content)
+            )
+        return data
+
+    @staticmethod
+    async def _send_request(
+        url: str,
+        client: httpx.AsyncClient,
+        follow_redirects: bool = False,
+        extra_headers: dict[str, str] | None = None,
+    ) -> httpx.Response:
         headers = {
             "Accept": "application/vnd.github+json",
             "Authorization": f"Bearer {os.getenv('GITHUB_TOKEN')}",
             "X-GitHub-Api-Version": "2022-11-28",
+            **(extra_headers or {}),
         }
 
         logger.info(f"Making request to: {url}")
-        number_retry = 10
+        retries = github_retry_policy.start()
+        number_rate_limit_retry = GITHUB_RATE_LIMIT_MAX_RETRIES
         while True:
+            try:
+                github_circuit_breaker.check()
+            except CircuitOpenError as exc:
+                logger.warning(exc)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="GitHub is unavailable. Please try again later.",
+                )
+
             try:
                 logger.info(f"Trying to fetch repo contents: {url}")
-                response = await client.get(url, headers=headers)
-                if response.status_code == 200:
-                    logger.info(
-                        f"Repo contents fetched successfully. "
-                        f"Status code: {response.status_code}. "
+                async with github_scheduler.slot():
+                    response = await client.get(
+                        url,
+                        headers=headers,
+                        follow_redirects=follow_redirects,
                     )
-                    return response.json()
-                elif response.status_code == 403:
-                    logger.info(
-                        f"Status code: {response.status_code}, "
-                        f"Message: {response.text}"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail={response.text},
-                    )
-                elif response.status_code == 404:
-                    logger.info(f"Repo contents not found for url: {url}.")
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Repo contents not found for url: {url}",
-                    )
-                elif response.status_code == 429:
-                    logger.info(
-                        f"Status code: {response.status_code}, "
-                        f"Message: {response.text}"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                        detail={response.text},
-                    )
-                else:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Error fetching repo contents: "
-                               f"{response}, status code: "
-                               f"{response.status_code}",
-                    )
-            except httpx.ConnectTimeout:
-                logger.info("Connect timeout to GitHub. Retry...")
-                if number_retry == 0:
-                    logger.warning(
-                        "Connect timeout. Cannot fetch repo contents"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-                        detail="Connect timeout. "
-                               "Cannot fetch repo contents",
-                    )
-                number_retry -= 1
+            except httpx.TransportError as exc:
+                github_circuit_breaker.record_failure()
+                GITHUB_REQUESTS.inc(status="transport_error")
+                logger.info(f"Error connecting to GitHub: {exc!r}")
+                if await retries.wait():
+                    GITHUB_RETRIES.inc(reason="transport_error")
+                    continue
+
+                logger.warning("Connect timeout. Cannot fetch repo contents")
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="Connect timeout. Cannot fetch repo contents",
+                )
+
+            GITHUB_REQUESTS.inc(status=str(response.status_code))
+            github_scheduler.update_from_headers(response.headers)
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                github_circuit_breaker.record_failure()
+                logger.info(
+                    f"GitHub responded with {response.status_code} "
+                    f"for {url}"
+                )
+                if await retries.wait(parse_retry_after(response.headers)):
+                    GITHUB_RETRIES.inc(reason="server_error")
+                    continue
+            else:
+                github_circuit_breaker.record_success()
+
+            retry_delay = github_scheduler.retry_delay(response)
+            if (
+                retry_delay is not None
+                and number_rate_limit_retry > 0
+                and retry_delay
+                <= min(github_scheduler.max_wait, retries.remaining())
+            ):
+                logger.info(
+                    f"Rate limited by GitHub. "
+                    f"Retrying in {retry_delay:.2f}s"
+                )
+                github_scheduler.pause(retry_delay)
+                number_rate_limit_retry -= 1
+                GITHUB_RETRIES.inc(reason="rate_limit")
+                continue
+
+            if response.status_code == 304 and extra_headers:
+                return response
+            elif response.status_code == 200:
+                logger.info(
+                    f"Repo contents fetched successfully. "
+                    f"Status code: {response.status_code}. "
+                )
+                return response
+            elif response.status_code == 403:
+                logger.info(
+                    f"Status code: {response.status_code}, "
+                    f"Message: {response.text}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=response.text,
+                )
+            elif response.status_code == 404:
+                logger.info(f"Repo contents not found for url: {url}.")
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Repo contents not found for url: {url}",
+                )
+            elif response.status_code == 429:
+                logger.info(
+                    f"Status code: {response.status_code}, "
+                    f"Message: {response.text}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail=response.text,
+                )
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error fetching repo contents: "
+                           f"{response}, status code: "
+                           f"{response.status_code}",
+                )
 
     async def _fetch_repo_contents(
-        self, owner: str, repo: str, client: httpx.AsyncClient
+        self,
+        owner: str,
+        repo: str,
+        client: httpx.AsyncClient,
+        ref: str | None = None,
     ) -> list[dict[Any, Any]] | dict[Any, Any]:
 
-        url = f"{GitHubService.API_HOST}/repos/{owner}/{repo}/contents"
+        url = f"{self.API_HOST}/repos/{owner}/{repo}/contents"
+        if ref:
+            url = f"{url}?ref={ref}"
 
-        return await self._make_request(url, client)
+        return await self._make_request(url, client, conditional=True)
+
+    async def _fetch_repo_tree(
+        self,
+        owner: str,
+        repo: str,
+        client: httpx.AsyncClient,
+        ref: str | None = None,
+    ) -> dict[str, Any]:
+        url = (
+            f"{self.API_HOST}/repos/{owner}/{repo}/git/trees/{ref or 'HEAD'}"
+            f"?recursive=1"
+        )
+
+        return await self._make_request(url, client, conditional=True)
+
+    async def _download_repo_archive(
+        self,
+        owner: str,
+        repo: str,
+        client: httpx.AsyncClient,
+        ref: str | None = None,
+    ) -> bytes:
+        url = f"{self.API_HOST}/repos/{owner}/{repo}/tarball"
+        if ref:
+            url = f"{url}/{ref}"
+
+        response = await self._send_request(
+            url, client, follow_redirects=True
+        )
+        return response.content
+
+    @staticmethod
+    def _decode_bytes(raw: bytes) -> str | None:
+        if b"\0" in raw[:8192]:
+            return None
+        try:
+            return raw.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
 
     @staticmethod
-    def _decode_content(content: str) -> str:
-        return base64.b64decode(content).decode("utf-8")
+    def _decode_content(content: str) -> str | None:
+        with STAGE_DURATION.time(stage="decode"):
+            return GitHubService._decode_bytes(base64.b64decode(content))
 
-    async def _get_file_content(
-        self, item: dict, client: httpx.AsyncClient
-    ) -> dict[str, str | Any]:
-        if item.get("url"):
-            self_data = await self._make_request(item["url"], client)
+    @staticmethod
+    async def _gather(*coroutines: Any) -> list[Any]:
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
 
-            if isinstance(self_data, dict) and self_data.get("content"):
-                content = self._decode_content(self_data["content"])
-                name = item["name"]
-                type_content = item["type"]
-                return {"name": name, "type": type_content, "content": content}
+    async def _get_cached_blob(self, sha: str | None) -> str | None:
+        if self.blob_cache is None or not sha:
+            return None
 
-        return {}
+        return await self.blob_cache.get(sha)
 
-    async def _get_dir_content(
+    async def _cache_blob(self, sha: str | None, content: str) -> None:
+        if self.blob_cache is not None and sha:
+            await self.blob_cache.set(sha, content)
+
+    async def _get_blob_content(
         self, item: dict, client: httpx.AsyncClient
-    ) -> List[Dict[str, Any]]:
+    ) -> str | None:
+        content = await self._get_cached_blob(item.get("sha"))
+        if content is not None:
+            return content
+
+        blob_data = await self._make_request(item["url"], client)
+        encoded = blob_data.get("content", "")
+        content = await offloader.run(
+            len(encoded), self._decode_content, encoded
+        )
+        if content is None:
+            logger.info(f"Skipping binary file: {item['path']}")
+            return None
+        await self._cache_blob(item.get("sha"), content)
+
+        return content
+
+    def _select_files(
+        self,
+        files: list[dict[str, Any]],
+        token_budget: TokenBudget | None = None,
+        assignment_description: str = "",
+    ) -> list[dict[str, Any]]:
+        files = [
+            item
+            for item in files
+            if self.file_filter.is_relevant_file(
+                item["path"], item.get("size")
+            )
+        ]
+        ranked = self.file_filter.rank(files, assignment_description)
+        selected, skipped = self.file_filter.select(
+            ranked,
+            token_budget.limit - token_budget.total if token_budget else None,
+        )
+        if skipped and token_budget is not None:
+            token_budget.skipped += len(skipped)
+        if skipped:
+            logger.info(
+                f"Skipping {len(skipped)} least relevant files "
+                f"to stay within the token budget"
+            )
+
+        return selected
+
+    async def _receive_repo_tree(
+        self,
+        tree_data: dict[str, Any],
+        client: httpx.AsyncClient,
+        token_budget: TokenBudget | None = None,
+        assignment_description: str = "",
+    ) -> Repository:
+        directories = [
+            item["path"]
+            for item in tree_data.get("tree", [])
+            if item["type"] == "tree"
+            and not self.file_filter.is_excluded_dir(item["path"])
+        ]
+        files = self._select_files(
+            [
+                item
+                for item in tree_data.get("tree", [])
+                if item["type"] == "blob" and item.get("mode") != "120000"
+            ],
+            token_budget,
+            assignment_description,
+        )
+
+        async def get_file(item: dict) -> RepoFile | None:
+            content = await self._get_blob_content(item, client)
+            if content is None:
+                return None
 
+            file = RepoFile(
+                item["path"],
+                content,
+                sha=item.get("sha"),
+                size=item.get("size"),
+            )
+            if token_budget is not None:
+                file.tokens = await offloader.run(
+                    file.size,
+                    token_budget.add,
+                    content,
+                    item.get("sha"),
+                    threads_only=True,
+                )
+            return file
+
+        fetched = await self._gather(*(get_file(item) for item in files))
+
+        return Repository(
+            sorted(
+                (file for file in fetched if file is not None),
+                key=lambda file: file.path,
+            ),
+            directories,
+        )
+
+    def _extract_repo_archive(
+        self,
+        archive: bytes,
+        token_budget: TokenBudget | None = None,
+        assignment_description: str = "",
+    ) -> Repository:
+        repository = Repository()
+
+        with tarfile.open(fileobj=io.BytesIO(archive), mode="r:*") as tar:
+            members = {}
+            for member in tar:
+                _, _, path = member.name.partition("/")
+                path = path.rstrip("/")
+                if not path:
+                    continue
+
+                if member.isdir():
+                    if not self.file_filter.is_excluded_dir(path):
+                        repository.add_directory(path)
+                elif member.isfile():
+                    members[path] = member
+
+            files = self._select_files(
+                [
+                    {"path": path, "size": member.size}
+                    for path, member in members.items()
+                ],
+                token_budget,
+                assignment_description,
+            )
+            for item in sorted(files, key=lambda item: item["path"]):
+                path = item["path"]
+                file_obj = tar.extractfile(members[path])
+                with STAGE_DURATION.time(stage="decode"):
+                    content = self._decode_bytes(
+                        file_obj.read() if file_obj else b""
+                    )
+                if content is None:
+                    logger.info(f"Skipping binary file: {path}")
+                    continue
+                file = RepoFile(path, content, size=item["size"])
+                if token_budget is not None:
+                    file.tokens = token_budget.add(content)
+                repository.add_file(file)
+
+        return repository
+
+    async def _fetch_repo(
+        self,
+        owner: str,
+        repo: str,
+        client: httpx.AsyncClient,
+        token_budget: TokenBudget | None = None,
+        assignment_description: str = "",
+        ref: str | None = None,
+    ) -> Repository:
+        if self.fetch_mode == "tarball":
+            with STAGE_DURATION.time(stage="content_fetch"):
+                archive = await self._download_repo_archive(
+                    owner, repo, client, ref
+                )
+            with STAGE_DURATION.time(stage="archive_extract"):
+                return await offloader.run(
+                    len(archive),
+                    self._extract_repo_archive,
+                    archive,
+                    token_budget,
+                    assignment_description,
+                    threads_only=True,
+                )
+
+        if self.fetch_mode == "tree":
+            with STAGE_DURATION.time(stage="tree_fetch"):
+                tree_data = await self._fetch_repo_tree(
+                    owner, repo, client, ref
+                )
+            if not tree_data.get("truncated"):
+                with STAGE_DURATION.time(stage="content_fetch"):
+                    return await self._receive_repo_tree(
+                        tree_data,
+                        client,
+                        token_budget,
+                        assignment_description,
+                    )
+
+            logger.warning(
+                f"Git tree for '{owner}/{repo}' is truncated. "
+                f"Falling back to Contents API"
+            )
+
+        with STAGE_DURATION.time(stage="tree_fetch"):
+            raw_repo_data = await self._fetch_repo_contents(
+                owner, repo, client, ref
+            )
+        with STAGE_DURATION.time(stage="content_fetch"):
+            return await self._receive_repo_data(
+                raw_repo_data, client, token_budget
+            )
+
+    async def _get_file_content(
+        self,
+        item: dict,
+        client: httpx.AsyncClient,
+        token_budget: TokenBudget | None = None,
+        path: str | None = None,
+    ) -> RepoFile | None:
         if item.get("url"):
-            dir_data = await self._make_request(item["url"], client)
-            return await self._receive_repo_data(dir_data, client)
+            content = await self._get_cached_blob(item.get("sha"))
+
+            if content is None:
+                self_data = await self._make_request(item["url"], client)
+
+                if isinstance(self_data, dict) and self_data.get("content"):
+                    encoded = self_data["content"]
+                    content = await offloader.run(
+                        len(encoded), self._decode_content, encoded
+                    )
+                    if content is None:
+                        logger.info(
+                            f"Skipping binary file: "
+                            f"{path or item.get('path') or item['name']}"
+                        )
+                        return None
+                    await self._cache_blob(item.get("sha"), content)
+
+            if content:
+                file = RepoFile(
+                    path or item.get("path") or item["name"],
+                    content,
+                    sha=item.get("sha"),
+                    size=item.get("size"),
+                )
+                if token_budget is not None:
+                    file.tokens = await offloader.run(
+                        file.size,
+                        token_budget.add,
+                        content,
+                        item.get("sha"),
+                        threads_only=True,
+                    )
+                return file
+
+        return None
 
-        return [{"name": item["name"], "type": "dir", "content": []}]
+    async def _get_dir_content(
+        self,
+        item: dict,
+        path: str,
+        client: httpx.AsyncClient,
+        repository: Repository,
+        token_budget: TokenBudget | None = None,
+    ) -> None:
+        if item.get("url"):
+            dir_data = await self._make_request(
+                item["url"], client, conditional=True
+            )
+            await self._receive_repo_data(
+                dir_data, client, token_budget, repository, f"{path}/"
+            )
 
     async def _receive_repo_data(
         self,
         repo_data: list[dict[Any, Any]] | dict[Any, Any],
         client: httpx.AsyncClient,
-    ) -> list[dict[Any, Any]]:
-        structure_data = []
+        token_budget: TokenBudget | None = None,
+        repository: Repository | None = None,
+        prefix: str = "",
+    ) -> Repository:
+        is_root = repository is None
+        if repository is None:
+            repository = Repository()
 
         tasks = []
-        directories = []
         for item in repo_data:
-            if item["type"] == "file":
-                tasks.append(self._get_file_content(item, client))
-            elif item["type"] == "dir":
-                directories.append(item)
-                tasks.append(self._get_dir_content(item, client))
+            path = item.get("path") or f"{prefix}{item['name']}"
+            if item["type"] == "file" and self.file_filter.is_relevant_file(
+                path, item.get("size")
+            ):
+                tasks.append(
+                    self._get_file_content(item, client, token_budget, path)
+                )
+            elif item["type"] == "dir" and not (
+                self.file_filter.is_excluded_dir(path)
+            ):
+                repository.add_directory(path)
+                tasks.append(
+                    self._get_dir_content(
+                        item, path, client, repository, token_budget
+                    )
+                )
 
-        results = await asyncio.gather(*tasks)
+        results = await self._gather(*tasks)
+        repository.files.extend(
+            file for file in results if isinstance(file, RepoFile)
+        )
+        if is_root:
+            repository.files.sort(key=lambda file: file.path)
 
-        result_idx = 0
-        for item in repo_data:
-            if item["type"] == "file":
-                structure_data.append(results[result_idx])
-                result_idx += 1
-            elif item["type"] == "dir":
-                directory_structure = {
-                    "name": item["name"],
-                    "type": item["type"],
-                    "content": results[result_idx],
+        return repository
+
+    async def _resolve_head_commit(
+        self, owner: str, repo: str, client: httpx.AsyncClient
+    ) -> str:
+        commit_sha = self._head_commits.get((owner, repo))
+        if commit_sha is None:
+            url = f"{self.API_HOST}/repos/{owner}/{repo}/commits/HEAD"
+            response = await self._send_request(
+                url,
+                client,
+                extra_headers={"Accept": "application/vnd.github.sha"},
+            )
+            commit_sha = response.text.strip()
+            self._head_commits[(owner, repo)] = commit_sha
+
+        return commit_sha
+
+    async def get_head_commit(self, repo_url: str) -> tuple[str, str, str]:
+        owner, repo = self._get_owner_and_repo(self._validate_url(repo_url))
+
+        async with self._get_client() as client:
+            commit_sha = await self._resolve_head_commit(owner, repo, client)
+
+        return owner, repo, commit_sha
+
+    async def _compare_commits(
+        self,
+        owner: str,
+        repo: str,
+        base_sha: str,
+        head_sha: str,
+        client: httpx.AsyncClient,
+    ) -> dict[str, Any]:
+        url = (
+            f"{self.API_HOST}/repos/{owner}/{repo}/compare/"
+            f"{base_sha}...{head_sha}"
+        )
+
+        return await self._make_request(url, client)
+
+    async def fetch_changes(
+        self,
+        repo_url: str,
+        base_sha: str,
+        token_budget: TokenBudget | None = None,
+        max_files: int = INCREMENTAL_REVIEW_MAX_FILES,
+    ) -> tuple[Repository, list[str]] | None:
+        owner, repo = self._get_owner_and_repo(self._validate_url(repo_url))
+
+        async with self._get_client() as client:
+            head_sha = await self._resolve_head_commit(owner, repo, client)
+            with STAGE_DURATION.time(stage="compare_fetch"):
+                comparison = await self._compare_commits(
+                    owner, repo, base_sha, head_sha, client
+                )
+
+            changed = comparison.get("files", [])
+            if comparison.get("status") not in ("ahead", "identical") or (
+                len(changed) > max_files
+            ):
+                logger.info(
+                    f"Cannot review '{owner}/{repo}' incrementally: "
+                    f"{comparison.get('status')}, {len(changed)} files changed"
+                )
+                return None
+
+            removed = [
+                item["previous_filename"]
+                for item in changed
+                if item.get("previous_filename")
+            ] + [
+                item["filename"]
+                for item in changed
+                if item.get("status") == "removed"
+            ]
+            files = [
+                {
+                    "path": item["filename"],
+                    "sha": item["sha"],
+                    "url": (
+                        f"{self.API_HOST}/repos/{owner}/{repo}/git/blobs/"
+                        f"{item['sha']}"
+                    ),
                 }
-                structure_data.append(directory_structure)
-                result_idx += 1
+                for item in changed
+                if item.get("status") != "removed"
+                and item.get("sha")
+                and self.file_filter.is_relevant_file(item["filename"])
+            ]
+
+            logger.info(
+                f"{len(changed)} files changed in '{owner}/{repo}' since "
+                f"{base_sha[:7]}. Fetching {len(files)} of them"
+            )
 
-        return structure_data
+            with STAGE_DURATION.time(stage="content_fetch"):
+                contents = await self._gather(
+                    *(self._get_blob_content(item, client) for item in files)
+                )
 
-    async def main(self, repo_url: str) -> list[dict]:
-        valid_url = self._validate_url(repo_url)
-        if valid_url:
-            start_time = datetime.now()
+        repository = Repository(
+            sorted(
+                (
+                    RepoFile(item["path"], content, sha=item["sha"])
+                    for item, content in zip(files, contents)
+                    if content is not None
+                ),
+                key=lambda file: file.path,
+            )
+        )
+        if token_budget is not None:
+            for file in repository:
+                file.tokens = token_budget.add(file.content, file.sha)
 
-            owner, repo = self._get_owner_and_repo(valid_url)
+        return repository, removed
 
-            try:
-                limits = httpx.Limits(
-                    max_connections=100, max_keepalive_connections=10
+    @staticmethod
+    def _restore_snapshot(
+        entries: list[tuple[str, bytes | None]],
+        file_tokens: dict[str, int],
+        token_budget: TokenBudget | None = None,
+    ) -> Repository:
+        repository = Repository()
+        for path, data in entries:
+            if data is None:
+                repository.add_directory(path)
+                continue
+
+            file = RepoFile(path, data, tokens=file_tokens.get(path))
+            if token_budget is not None:
+                if file.tokens is None:
+                    file.tokens = token_budget.add(file.content)
+                else:
+                    token_budget.add_counted(file.tokens)
+            repository.add_file(file)
+
+        return repository
+
+    async def _fetch_repo_snapshot(
+        self,
+        owner: str,
+        repo: str,
+        client: httpx.AsyncClient,
+        token_budget: TokenBudget | None = None,
+        assignment_description: str = "",
+    ) -> Repository:
+        commit_sha = await self._resolve_head_commit(owner, repo, client)
+        if self.snapshot_store is None:
+            return await self._fetch_repo(
+                owner,
+                repo,
+                client,
+                token_budget,
+                assignment_description,
+                commit_sha,
+            )
+
+        key = SnapshotStore.build_key(owner, repo, commit_sha)
+        limit = token_budget.limit if token_budget is not None else None
+        selection = hashlib.sha256(
+            f"{limit}:{assignment_description}".encode("utf-8")
+        ).hexdigest()
+
+        snapshot = await self.snapshot_store.get(key)
+        if snapshot is not None:
+            meta, entries = snapshot
+            if meta.get("selection") in (None, selection) and (
+                limit is None
+                or (meta.get("tokens") is not None and meta["tokens"] <= limit)
+            ):
+                logger.info(f"Using stored snapshot of {key}")
+                return await offloader.run(
+                    sum(len(data or b"") for _, data in entries),
+                    self._restore_snapshot,
+                    entries,
+                    meta.get("file_tokens", {}),
+                    token_budget,
+                    threads_only=True,
                 )
-                async with httpx.AsyncClient(limits=limits) as client:
-                    raw_repo_data = await self._fetch_repo_contents(
-                        owner, repo, client
-                    )
-                    clean_repo_data = await self._receive_repo_data(
-                        raw_repo_data, client
-                    )
 
-                    end_time = datetime.now()
-                    time_taken = end_time - start_time
+        skipped = token_budget.skipped if token_budget is not None else 0
+        repo_data = await self._fetch_repo(
+            owner,
+            repo,
+            client,
+            token_budget,
+            assignment_description,
+            commit_sha,
+        )
+        complete = token_budget is None or token_budget.skipped == skipped
+        await self.snapshot_store.put(
+            key,
+            [(path, None) for path in repo_data.directories]
+            + [(file.path, file.content) for file in repo_data],
+            selection=None if complete else selection,
+            tokens=token_budget.total if token_budget is not None else None,
+            file_tokens={
+                file.path: file.tokens
+                for file in repo_data
+                if file.tokens is not None
+            },
+        )
+
+        return repo_data
+
+    async def main(
+        self,
+        repo_url: str,
+        token_budget: TokenBudget | None = None,
+        assignment_description: str = "",
+    ) -> Repository:
+        with STAGE_DURATION.time(stage="validate_url"):
+            valid_url = self._validate_url(repo_url)
+        if valid_url:
+            owner, repo = self._get_owner_and_repo(valid_url)
+
+            try:
+                async with self._get_client() as client:
+                    with STAGE_DURATION.time(stage="github_fetch") as timer:
+                        clean_repo_data = await self._fetch_repo_snapshot(
+                            owner,
+                            repo,
+                            client,
+                            token_budget,
+                            assignment_description,
+                        )
 
                     logger.info(
-                        f"Time taken to fetch repo contents: {time_taken}"
+                        f"Time taken to fetch repo contents "
+                        f"({self.fetch_mode} mode): {timer.elapsed:.3f}s"
                     )
+                    if self.blob_cache is not None:
+                        logger.info(
+                            f"Blob cache hit ratio: "
+                            f"{self.blob_cache.hit_ratio:.2%}"
+                        )
                     return clean_repo_data
 
             except Exception as exc:
@@ -0,0 +1,29 @@
+from importlib.util import find_spec
+
+import httpx
+
+from settings import (
+    setup_logger,
+    GITHUB_HTTP2,
+    GITHUB_KEEPALIVE_EXPIRY,
+    GITHUB_MAX_CONNECTIONS,
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+logger = setup_logger()
+
+
+def create_github_client(**client_kwargs) -> httpx.AsyncClient:
+    http2 = GITHUB_HTTP2 and find_spec("h2") is not None
+    if GITHUB_HTTP2 and not http2:
+        logger.warning(
+            "Package 'h2' is not installed. Falling back to HTTP/1.1"
+        )
+
+    limits = httpx.Limits(
+        max_connections=GITHUB_MAX_CONNECTIONS,
+        max_keepalive_connections=GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=GITHUB_KEEPALIVE_EXPIRY,
+    )
+
+    return httpx.AsyncClient(limits=limits, http2=http2, **client_kwargs)
@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator
+
+from dotenv import load_dotenv
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AuthenticationError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.services.metrics import Counter
+from app.services.resilience import CircuitBreaker, parse_retry_after
+from settings import (
+    setup_logger,
+    LLM_BACKEND,
+    LLM_BACKENDS,
+    OPENAI_MODEL,
+    STUB_LLM_ERROR_RATE,
+    STUB_LLM_LATENCY,
+    STUB_LLM_RESPONSE_TOKENS,
+    STUB_LLM_TOKENS_PER_SECOND,
+)
+
+load_dotenv()
+
+logger = setup_logger()
+
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM tokens consumed by model and kind",
+)
+
+
+class LLMTimeoutError(Exception):
+    pass
+
+
+class LLMUnavailableError(Exception):
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = True,
+        retry_after: float | None = None,
+    ) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMUnavailableError):
+    pass
+
+
+def _map_openai_error(exc: Exception) -> Exception:
+    if isinstance(exc, APITimeoutError):
+        return LLMTimeoutError(str(exc))
+    if isinstance(exc, RateLimitError):
+        return LLMRateLimitError(
+            str(exc), retry_after=parse_retry_after(exc.response.headers)
+        )
+    if isinstance(exc, AuthenticationError):
+        return LLMUnavailableError(str(exc), retryable=False)
+    if isinstance(exc, APIStatusError):
+        return LLMUnavailableError(
+            str(exc), retry_after=parse_retry_after(exc.response.headers)
+        )
+
+    return LLMUnavailableError(str(exc))
+
+
+class LLMBackend(ABC):
+    def __init__(self, model: str = OPENAI_MODEL) -> None:
+        self.model = model
+        self.circuit_breaker = CircuitBreaker(f"llm:{model}")
+
+    @abstractmethod
+    async def complete(self, messages: list[dict[str, str]]) -> str:
+        pass
+
+    @abstractmethod
+    def stream(self, messages: list[dict[str, str]]) -> AsyncIterator[str]:
+        pass
+
+
+class OpenAIBackend(LLMBackend):
+    def __init__(
+        self, model: str = OPENAI_MODEL, client: AsyncOpenAI | None = None
+    ) -> None:
+        super().__init__(model)
+        self.client = client or AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_retries=0,
+        )
+
+    def _record_usage(self, usage: Any) -> None:
+        if usage is None:
+            return
+
+        LLM_TOKENS.inc(usage.prompt_tokens, model=self.model, kind="prompt")
+        LLM_TOKENS.inc(
+            usage.completion_tokens, model=self.model, kind="completion"
+        )
+
+    async def complete(self, messages: list[dict[str, str]]) -> str:
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model, messages=messages
+            )
+        except (
+            APIConnectionError,
+            AuthenticationError,
+            InternalServerError,
+            RateLimitError,
+        ) as exc:
+            raise _map_openai_error(exc) from exc
+
+        self._record_usage(getattr(response, "usage", None))
+        return response.choices[0].message.content
+
+    async def stream(
+        self, messages: list[dict[str, str]]
+    ) -> AsyncIterator[str]:
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            async for chunk in stream:
+                self._record_usage(getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except (
+            APIConnectionError,
+            AuthenticationError,
+            InternalServerError,
+            RateLimitError,
+        ) as exc:
+            raise _map_openai_error(exc) from exc
+
+
+class StubBackend(LLMBackend):
+    CHARS_PER_TOKEN = 4
+
+    def __init__(
+        self,
+        model: str = OPENAI_MODEL,
+        latency: float = STUB_LLM_LATENCY,
+        tokens_per_second: float = STUB_LLM_TOKENS_PER_SECOND,
+        response_tokens: int = STUB_LLM_RESPONSE_TOKENS,
+        error_rate: float = STUB_LLM_ERROR_RATE,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(model)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+    def _build_review(self, messages: list[dict[str, str]]) -> str:
+        prompt = messages[-1]["content"]
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        review = {
+            "Found files": prompt.count("File: "),
+            "Downsides/Comments": "",
+            "Rating": int(digest[:8], 16) % 11,
+            "Conclusion": f"Stub review {digest[:12]}",
+        }
+        padding = self.response_tokens * self.CHARS_PER_TOKEN - len(
+            json.dumps(review)
+        )
+        review["Downsides/Comments"] = ("lorem " * (padding // 6 + 1))[
+            : max(padding, 0)
+        ]
+
+        return json.dumps(review)
+
+    def _split_tokens(self, text: str) -> list[str]:
+        return [
+            text[index:index + self.CHARS_PER_TOKEN]
+            for index in range(0, len(text), self.CHARS_PER_TOKEN)
+        ]
+
+    def _record_usage(
+        self, messages: list[dict[str, str]], review: str
+    ) -> None:
+        prompt_chars = sum(len(message["content"]) for message in messages)
+        LLM_TOKENS.inc(
+            prompt_chars // self.CHARS_PER_TOKEN,
+            model=self.model,
+            kind="prompt",
+        )
+        LLM_TOKENS.inc(
+            len(self._split_tokens(review)),
+            model=self.model,
+            kind="completion",
+        )
+
+    async def _start(self) -> None:
+        await asyncio.sleep(self.latency)
+        if self.random.random() < self.error_rate:
+            raise LLMUnavailableError("Simulated LLM backend failure")
+
+    async def complete(self, messages: list[dict[str, str]]) -> str:
+        await self._start()
+        review = self._build_review(messages)
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(
+                len(self._split_tokens(review)) / self.tokens_per_second
+            )
+        self._record_usage(messages, review)
+
+        return review
+
+    async def stream(
+        self, messages: list[dict[str, str]]
+    ) -> AsyncIterator[str]:
+        await self._start()
+        review = self._build_review(messages)
+        for token in self._split_tokens(review):
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield token
+        self._record_usage(messages, review)
+
+
+def create_llm_backend(
+    name: str = LLM_BACKEND, model: str = OPENAI_MODEL
+) -> LLMBackend:
+    if name not in LLM_BACKENDS:
+        raise ValueError(
+            f"Unsupported LLM backend: {name}. Must be one of {LLM_BACKENDS}"
+        )
+
+    logger.info(f"Using '{name}' LLM backend for '{model}'")
+    if name == "stub":
+        return StubBackend(model)
+
+    return OpenAIBackend(model)
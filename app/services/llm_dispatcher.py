@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from app.services.metrics import Counter, Gauge
+from settings import (
+    setup_logger,
+    LLM_DISPATCH_MAX_WAIT,
+    LLM_PRIORITIES,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    OPENAI_MODEL,
+)
+
+logger = setup_logger()
+
+DISPATCH_QUEUE_DEPTH = Gauge(
+    "llm_dispatcher_queue_depth",
+    "LLM requests waiting for rate limit budget by model and priority",
+)
+DISPATCH_TOKENS_AVAILABLE = Gauge(
+    "llm_dispatcher_tokens_available",
+    "Tokens left in the per-minute LLM budget by model",
+)
+DISPATCHED_TOKENS = Counter(
+    "llm_dispatched_tokens_total",
+    "Estimated tokens admitted by the LLM dispatcher by model and priority",
+)
+DISPATCH_TIMEOUTS = Counter(
+    "llm_dispatch_timeouts_total",
+    "LLM requests that waited too long for rate limit budget",
+)
+
+
+class LLMQueueTimeoutError(Exception):
+    pass
+
+
+class LLMDispatcher:
+    def __init__(
+        self,
+        model: str = OPENAI_MODEL,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        max_wait: float = LLM_DISPATCH_MAX_WAIT,
+    ) -> None:
+        self.model = model
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self.max_wait = max_wait
+        self._tokens = float(tokens_per_minute)
+        self._requests = float(requests_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: list[tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.tokens_per_minute > 0 or self.requests_per_minute > 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.tokens_per_minute > 0:
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + elapsed * self.tokens_per_minute / 60,
+            )
+        if self.requests_per_minute > 0:
+            self._requests = min(
+                float(self.requests_per_minute),
+                self._requests + elapsed * self.requests_per_minute / 60,
+            )
+
+    def _delay(self, tokens: int, now: float) -> float:
+        delay = self._paused_until - now
+        if self.tokens_per_minute > 0:
+            missing = min(tokens, self.tokens_per_minute) - self._tokens
+            delay = max(delay, missing * 60 / self.tokens_per_minute)
+        if self.requests_per_minute > 0:
+            missing = 1 - self._requests
+            delay = max(delay, missing * 60 / self.requests_per_minute)
+        return max(delay, 0.0)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        self._refill(now)
+        while self._queue:
+            _, _, tokens, future = self._queue[0]
+            if future.done() or future.get_loop().is_closed():
+                heapq.heappop(self._queue)
+                continue
+
+            delay = self._delay(tokens, now)
+            if delay > 0:
+                self._timer = future.get_loop().call_later(
+                    delay, self._dispatch
+                )
+                break
+
+            heapq.heappop(self._queue)
+            self._tokens -= tokens
+            self._requests -= 1
+            future.set_result(None)
+
+        DISPATCH_TOKENS_AVAILABLE.set(self._tokens, model=self.model)
+
+    async def acquire(
+        self, tokens: int, priority: str = "interactive"
+    ) -> None:
+        if priority not in LLM_PRIORITIES:
+            raise ValueError(
+                f"Unsupported priority: {priority}. "
+                f"Must be one of {LLM_PRIORITIES}"
+            )
+        if not self.enabled:
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._queue,
+            (
+                LLM_PRIORITIES.index(priority),
+                next(self._sequence),
+                tokens,
+                future,
+            ),
+        )
+        DISPATCH_QUEUE_DEPTH.inc(model=self.model, priority=priority)
+        self._dispatch()
+
+        try:
+            if not future.done():
+                logger.info(
+                    f"Queueing {priority} request of {tokens} tokens "
+                    f"for '{self.model}'"
+                )
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            DISPATCH_TIMEOUTS.inc(model=self.model, priority=priority)
+            self._dispatch()
+            raise LLMQueueTimeoutError(
+                f"LLM request of {tokens} tokens waited more than "
+                f"{self.max_wait}s for rate limit budget"
+            )
+        except asyncio.CancelledError:
+            self._dispatch()
+            raise
+        finally:
+            DISPATCH_QUEUE_DEPTH.dec(model=self.model, priority=priority)
+
+        DISPATCHED_TOKENS.inc(tokens, model=self.model, priority=priority)
+
+    def pause(self, delay: float) -> None:
+        self._paused_until = max(
+            self._paused_until, time.monotonic() + delay
+        )
+        if self._queue:
+            self._dispatch()
+
+
+llm_dispatchers: dict[str, LLMDispatcher] = {}
+
+
+def get_llm_dispatcher(model: str) -> LLMDispatcher:
+    if model not in llm_dispatchers:
+        llm_dispatchers[model] = LLMDispatcher(model)
+    return llm_dispatchers[model]
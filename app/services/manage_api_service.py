@@ -1,19 +1,63 @@
-from typing import Dict, Any
+import asyncio
+from typing import Any, AsyncIterator, Dict
 
+import httpx
 from fastapi import HTTPException
 from fastapi import status
 
+from app.services.blob_cache import BlobCache
 from app.services.github_service import GitHubService
 from app.services.openai_services import OpenAIService
-from settings import setup_logger
+from app.services.metrics import Counter
+from app.services.model_router import ModelRouter
+from app.services.offload import offloader
+from app.services.review_cache import (
+    ChunkReviewCache,
+    ReviewCache,
+    ReviewHistory,
+)
+from app.services.snapshot_store import SnapshotStore
+from app.services.token_counter import TokenBudget, token_counter
+from settings import (
+    setup_logger,
+    INCREMENTAL_REVIEW_ENABLED,
+    MAP_REDUCE_ENABLED,
+    MODEL_TOKEN_LIMITS,
+    OPENAI_MODEL,
+    REPO_MAX_TOKENS,
+    REVIEW_STREAM_PROGRESS_INTERVAL,
+)
 
 logger = setup_logger()
 
+INCREMENTAL_REVIEWS = Counter(
+    "incremental_reviews_total",
+    "Re-reviews of a previously reviewed repository by outcome",
+)
+
 
 class ManageAPIService:
-    def __init__(self):
-        self.github_service = GitHubService()
-        self.openai_service = OpenAIService()
+    def __init__(
+        self,
+        github_client: httpx.AsyncClient | None = None,
+        blob_cache: BlobCache | None = None,
+        chunk_cache: ChunkReviewCache | None = None,
+        model_router: ModelRouter | None = None,
+        snapshot_store: SnapshotStore | None = None,
+        review_history: ReviewHistory | None = None,
+        priority: str = "interactive",
+    ):
+        self.github_service = GitHubService(
+            client=github_client,
+            blob_cache=blob_cache,
+            snapshot_store=snapshot_store,
+        )
+        self.openai_service = OpenAIService(
+            chunk_cache=chunk_cache, priority=priority, router=model_router
+        )
+        self.review_history = (
+            review_history if INCREMENTAL_REVIEW_ENABLED else None
+        )
 
     @staticmethod
     def _validate_candidate_level(candidate_level: str) -> bool:
@@ -25,6 +69,86 @@ class ManageAPIService:
             )
         return True
 
+    @staticmethod
+    def _create_token_budget() -> TokenBudget:
+        return TokenBudget(
+            REPO_MAX_TOKENS
+            if MAP_REDUCE_ENABLED
+            else MODEL_TOKEN_LIMITS[OPENAI_MODEL],
+            token_counter,
+        )
+
+    async def get_review_cache_key(
+        self, repo_url: str, candidate_level: str, assignment_description: str
+    ) -> str:
+        owner, repo, commit_sha = await self.github_service.get_head_commit(
+            repo_url
+        )
+
+        return ReviewCache.build_key(
+            owner,
+            repo,
+            commit_sha,
+            candidate_level,
+            assignment_description,
+            OPENAI_MODEL,
+        )
+
+    async def _review_changes(
+        self,
+        repo_url: str,
+        candidate_level: str,
+        assignment_description: str,
+        previous: dict[str, Any],
+    ) -> tuple[dict[str, Any], list[str]] | None:
+        token_budget = TokenBudget(
+            MODEL_TOKEN_LIMITS[OPENAI_MODEL] // 2, token_counter
+        )
+        try:
+            changes = await self.github_service.fetch_changes(
+                repo_url, previous["commit_sha"], token_budget
+            )
+        except HTTPException as exc:
+            logger.info(
+                f"Falling back to a full review of '{repo_url}': "
+                f"{exc.detail}"
+            )
+            return None
+
+        if changes is None:
+            return None
+
+        repo_data, removed = changes
+        files = sorted(
+            set(previous.get("files", [])).difference(removed).union(
+                repo_data.paths
+            )
+        )
+        if not repo_data and not removed:
+            INCREMENTAL_REVIEWS.inc(result="unchanged")
+            return previous["review"], files
+
+        try:
+            review = await self.openai_service.review_changes(
+                repo_data,
+                removed,
+                previous["review"],
+                candidate_level,
+                assignment_description,
+                repo_url,
+            )
+        except HTTPException as exc:
+            if exc.status_code != 400:
+                raise
+            logger.info(
+                f"Falling back to a full review of '{repo_url}': "
+                f"{exc.detail}"
+            )
+            return None
+
+        INCREMENTAL_REVIEWS.inc(result="incremental")
+        return review, files
+
     async def main(
         self, repo_url: str, candidate_level: str, assignment_description: str
     ) -> Dict[str, Any]:
@@ -34,21 +158,117 @@ class ManageAPIService:
             )
             self._validate_candidate_level(candidate_level)
 
-            logger.info(f"Trying to fetch repo contents for '{repo_url}'")
+            if self.review_history is None:
+                code_review, _ = await self._full_review(
+                    repo_url, candidate_level, assignment_description
+                )
+                return code_review
 
-            repo_data = await self.github_service.main(repo_url)
+            owner, repo, commit_sha = (
+                await self.github_service.get_head_commit(repo_url)
+            )
+            history_key = ReviewHistory.build_key(
+                owner,
+                repo,
+                candidate_level,
+                assignment_description,
+                OPENAI_MODEL,
+            )
+            previous = await self.review_history.get(history_key)
 
-            logger.info(f"Trying to analyze code with OpenAI for '{repo_url}'")
+            result = None
+            if previous is not None:
+                if previous["commit_sha"] == commit_sha:
+                    INCREMENTAL_REVIEWS.inc(result="unchanged")
+                    return previous["review"]
+                result = await self._review_changes(
+                    repo_url, candidate_level, assignment_description, previous
+                )
+                if result is None:
+                    INCREMENTAL_REVIEWS.inc(result="fallback")
 
-            code_review = await self.openai_service.analyze_code_with_openai(
-                repo_data, candidate_level, assignment_description, repo_url
-            )
+            if result is None:
+                result = await self._full_review(
+                    repo_url, candidate_level, assignment_description
+                )
 
-            logger.info(
-                f"Finished analyzing code with OpenAI for '{repo_url}'."
+            code_review, files = result
+            await self.review_history.set(
+                history_key, commit_sha, code_review, files
             )
 
             return code_review
 
         except HTTPException as exc:
             raise exc
+
+    async def _full_review(
+        self, repo_url: str, candidate_level: str, assignment_description: str
+    ) -> tuple[Dict[str, Any], list[str]]:
+        logger.info(f"Trying to fetch repo contents for '{repo_url}'")
+
+        token_budget = self._create_token_budget()
+        repo_data = await self.github_service.main(
+            repo_url, token_budget, assignment_description
+        )
+
+        logger.info(f"Trying to analyze code with OpenAI for '{repo_url}'")
+
+        code_review = await self.openai_service.analyze_code_with_openai(
+            repo_data, candidate_level, assignment_description, repo_url
+        )
+
+        logger.info(f"Finished analyzing code with OpenAI for '{repo_url}'.")
+
+        return code_review, repo_data.paths
+
+    async def stream(
+        self, repo_url: str, candidate_level: str, assignment_description: str
+    ) -> AsyncIterator[tuple[str, Any]]:
+        self._validate_candidate_level(candidate_level)
+
+        token_budget = self._create_token_budget()
+        yield "fetch_started", {"repo_url": repo_url}
+
+        fetch = asyncio.ensure_future(
+            self.github_service.main(
+                repo_url, token_budget, assignment_description
+            )
+        )
+        try:
+            while not fetch.done():
+                await asyncio.wait(
+                    {fetch}, timeout=REVIEW_STREAM_PROGRESS_INTERVAL
+                )
+                yield "files_fetched", {
+                    "files": token_budget.files,
+                    "tokens": token_budget.total,
+                    "done": fetch.done(),
+                }
+        finally:
+            fetch.cancel()
+
+        async for event in self.openai_service.stream_code_review(
+            fetch.result(), candidate_level, assignment_description, repo_url
+        ):
+            yield event
+
+    async def build_batch_request(
+        self, repo_url: str, candidate_level: str, assignment_description: str
+    ) -> Dict[str, Any]:
+        self._validate_candidate_level(candidate_level)
+
+        repo_data = await self.github_service.main(
+            repo_url,
+            TokenBudget(MODEL_TOKEN_LIMITS[OPENAI_MODEL], token_counter),
+            assignment_description,
+        )
+
+        return await offloader.run(
+            repo_data.size,
+            self.openai_service.build_batch_request,
+            repo_data,
+            candidate_level,
+            assignment_description,
+            threads_only=True,
+        )
@@ -0,0 +1,158 @@
+import threading
+import time
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._values: dict[tuple[tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    @staticmethod
+    def _key(labels: dict[str, str]) -> tuple[tuple[str, str], ...]:
+        return tuple(
+            sorted((key, str(value)) for key, value in labels.items())
+        )
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _add(self, amount: float, labels: dict[str, str]) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list[tuple[str, tuple[tuple[str, str], ...], float]]:
+        with self._lock:
+            return [
+                (self.name, key, value) for key, value in self._values.items()
+            ]
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for name, key, value in self.samples():
+            labels = ",".join(f'{label}="{val}"' for label, val in key)
+            lines.append(
+                f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(amount, labels)
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(-amount, labels)
+
+
+class _Timer:
+    def __init__(self, histogram: "Histogram", labels: dict[str, str]) -> None:
+        self.histogram = histogram
+        self.labels = labels
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.elapsed = time.perf_counter() - self._start
+        self.histogram.observe(self.elapsed, **self.labels)
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+    DEFAULT_BUCKETS = (
+        0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+        1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+    )
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation)
+        self.buckets = tuple(sorted(buckets))
+        self._bucket_counts: dict[tuple[tuple[str, str], ...], list[int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._bucket_counts.setdefault(
+                key, [0] * (len(self.buckets) + 1)
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def time(self, **labels: str) -> _Timer:
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        return sum(self._bucket_counts.get(self._key(labels), []))
+
+    def samples(self) -> list[tuple[str, tuple[tuple[str, str], ...], float]]:
+        samples = []
+        with self._lock:
+            for key, counts in self._bucket_counts.items():
+                cumulative = 0
+                bounds = [*map(str, self.buckets), "+Inf"]
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    bucket_key = (*key, ("le", bound))
+                    samples.append(
+                        (f"{self.name}_bucket", bucket_key, cumulative)
+                    )
+                samples.append((f"{self.name}_sum", key, self._values[key]))
+                samples.append((f"{self.name}_count", key, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(
+            metric.render() for metric in self._metrics.values()
+        ) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = Histogram(
+    "review_stage_duration_seconds",
+    "Duration of review pipeline stages",
+)
@@ -0,0 +1,124 @@
+from typing import Callable
+
+from app.services.llm_backends import LLMBackend, create_llm_backend
+from app.services.metrics import Counter, Gauge, Histogram
+from settings import (
+    setup_logger,
+    CANDIDATE_LEVEL_TIERS,
+    LLM_ROUTING_MODELS,
+    LLM_ROUTING_STRATEGIES,
+    LLM_ROUTING_STRATEGY,
+    MODEL_PROMPT_COSTS,
+    MODEL_QUALITY_TIERS,
+    MODEL_TOKEN_LIMITS,
+)
+
+logger = setup_logger()
+
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds",
+    "LLM request latency by model and outcome",
+)
+LLM_MODEL_LATENCY = Gauge(
+    "llm_model_latency_seconds",
+    "Moving average of LLM request latency used for routing",
+)
+ROUTED_REQUESTS = Counter(
+    "llm_routed_requests_total",
+    "LLM requests by the model they were routed to and why",
+)
+
+
+class ModelRouter:
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        models: tuple[str, ...] = LLM_ROUTING_MODELS,
+        strategy: str = LLM_ROUTING_STRATEGY,
+        backend_factory: Callable[[str], LLMBackend] | None = None,
+    ) -> None:
+        if strategy not in LLM_ROUTING_STRATEGIES:
+            raise ValueError(
+                f"Unsupported routing strategy: {strategy}. "
+                f"Must be one of {LLM_ROUTING_STRATEGIES}"
+            )
+        unknown = [
+            model for model in models if model not in MODEL_TOKEN_LIMITS
+        ]
+        if not models or unknown:
+            raise ValueError(
+                f"Unsupported routing models: {unknown or models}. "
+                f"Must be some of {tuple(MODEL_TOKEN_LIMITS)}"
+            )
+
+        self.models = models
+        self.strategy = strategy
+        self.backend_factory = backend_factory or (
+            lambda model: create_llm_backend(model=model)
+        )
+        self.latency: dict[str, float] = {}
+        self._backends: dict[str, LLMBackend] = {}
+
+    def backend(self, model: str) -> LLMBackend:
+        if model not in self._backends:
+            self._backends[model] = self.backend_factory(model)
+        return self._backends[model]
+
+    def _rank(self, model: str) -> tuple[float, ...]:
+        cost = MODEL_PROMPT_COSTS.get(model, 0.0)
+        latency = self.latency.get(model, float("inf"))
+        if self.strategy == "cost":
+            return cost, latency
+        return latency, cost
+
+    def route(
+        self, prompt_tokens: int, candidate_level: str | None = None
+    ) -> list[LLMBackend]:
+        fitting = [
+            model
+            for model in self.models
+            if MODEL_TOKEN_LIMITS[model] >= prompt_tokens
+        ] or [max(self.models, key=MODEL_TOKEN_LIMITS.__getitem__)]
+
+        required_tier = CANDIDATE_LEVEL_TIERS.get(
+            (candidate_level or "").lower(),
+            max(MODEL_QUALITY_TIERS.get(model, 0) for model in fitting),
+        )
+        qualified = [
+            model
+            for model in fitting
+            if MODEL_QUALITY_TIERS.get(model, 0) >= required_tier
+        ] or sorted(
+            fitting,
+            key=lambda model: MODEL_QUALITY_TIERS.get(model, 0),
+            reverse=True,
+        )[:1]
+
+        backends = [
+            self.backend(model) for model in sorted(qualified, key=self._rank)
+        ]
+        available = [
+            backend
+            for backend in backends
+            if backend.circuit_breaker.available
+        ]
+
+        return available or backends
+
+    def record(self, model: str, elapsed: float, outcome: str) -> None:
+        LLM_REQUEST_DURATION.observe(elapsed, model=model, outcome=outcome)
+        if outcome == "rate_limit":
+            return
+
+        previous = self.latency.get(model)
+        self.latency[model] = (
+            elapsed
+            if previous is None
+            else previous
+            + self.LATENCY_SMOOTHING * (elapsed - previous)
+        )
+        LLM_MODEL_LATENCY.set(self.latency[model], model=model)
+
+
+model_router = ModelRouter()
@@ -0,0 +1,98 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, TypeVar
+
+from app.services.metrics import Counter
+from settings import (
+    setup_logger,
+    OFFLOAD_INLINE_MAX_BYTES,
+    OFFLOAD_PROCESS_MIN_BYTES,
+    OFFLOAD_PROCESS_WORKERS,
+    OFFLOAD_THREAD_WORKERS,
+)
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+OFFLOADED_TASKS = Counter(
+    "offloaded_tasks_total",
+    "CPU-bound tasks by the pool they ran in",
+)
+
+
+class Offloader:
+    def __init__(
+        self,
+        inline_max_bytes: int = OFFLOAD_INLINE_MAX_BYTES,
+        process_min_bytes: int = OFFLOAD_PROCESS_MIN_BYTES,
+        thread_workers: int = OFFLOAD_THREAD_WORKERS,
+        process_workers: int = OFFLOAD_PROCESS_WORKERS,
+    ) -> None:
+        self.inline_max_bytes = inline_max_bytes
+        self.process_min_bytes = process_min_bytes
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.thread_workers,
+                thread_name_prefix="offload",
+            )
+        return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._process_pool
+
+    def _choose_pool(
+        self, size: int, threads_only: bool
+    ) -> tuple[str, Executor | None]:
+        if size <= self.inline_max_bytes:
+            return "inline", None
+        if (
+            not threads_only
+            and self.process_workers > 0
+            and 0 < self.process_min_bytes <= size
+        ):
+            return "process", self._get_process_pool()
+        return "thread", self._get_thread_pool()
+
+    async def run(
+        self,
+        size: int,
+        func: Callable[..., T],
+        *args: Any,
+        threads_only: bool = False,
+    ) -> T:
+        pool, executor = self._choose_pool(size, threads_only)
+        OFFLOADED_TASKS.inc(pool=pool)
+        if executor is None:
+            return func(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(func, *args)
+        )
+
+    def shutdown(self) -> None:
+        for executor in (self._thread_pool, self._process_pool):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
+
+
+offloader = Offloader()
@@ -1,38 +1,112 @@
+import asyncio
 import json
-import os
-from datetime import datetime
-
-import tiktoken
-from dotenv import load_dotenv
-from openai import (
-    AsyncOpenAI,
-    APITimeoutError,
-    AuthenticationError,
-    InternalServerError,
-    RateLimitError,
-)
-from fastapi import HTTPException, status
+import time
+from typing import Any, AsyncIterator, Iterator
 
-from settings import setup_logger, OPENAI_MODEL, MODEL_TOKEN_LIMITS
+from fastapi import HTTPException, status
 
-load_dotenv()
+from app.services.llm_backends import (
+    LLMBackend,
+    LLMRateLimitError,
+    LLMTimeoutError,
+    LLMUnavailableError,
+)
+from app.services.llm_dispatcher import (
+    LLMDispatcher,
+    LLMQueueTimeoutError,
+    get_llm_dispatcher,
+)
+from app.services.metrics import Counter, STAGE_DURATION
+from app.services.model_router import (
+    ROUTED_REQUESTS,
+    ModelRouter,
+    model_router,
+)
+from app.services.offload import offloader
+from app.services.resilience import (
+    CircuitOpenError,
+    RetryBudget,
+    RetryPolicy,
+    llm_retry_policy,
+)
+from app.services.repo_model import Repository
+from app.services.review_cache import ChunkReviewCache
+from app.services.token_counter import count_tokens
+from settings import (
+    setup_logger,
+    LLM_DISPATCH_COMPLETION_TOKENS,
+    OPENAI_MODEL,
+    MODEL_TOKEN_LIMITS,
+    MAP_REDUCE_CHUNK_TOKENS,
+    MAP_REDUCE_CONCURRENCY,
+    MAP_REDUCE_ENABLED,
+)
 
 logger = setup_logger()
 
+LLM_RETRIES = Counter(
+    "llm_retries_total",
+    "Retried LLM requests by reason",
+)
+
+PROMPT_CHARS_PER_TOKEN = 4
+
+REVIEW_FORMAT = (
+    "Return the review result (text) in the following format: "
+    "Found files, Downsides/Comments, Rating (from 0 to 10), "
+    "Conclusion. "
+    "It must be dictionary. "
+    "Return data without special characters or formatting."
+)
+
 
 class OpenAIService:
 
-    def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY"),
-        )
+    def __init__(
+        self,
+        chunk_cache: ChunkReviewCache | None = None,
+        backend: LLMBackend | None = None,
+        retry_policy: RetryPolicy | None = None,
+        dispatcher: LLMDispatcher | None = None,
+        priority: str = "interactive",
+        router: ModelRouter | None = None,
+    ):
+        self.backend = backend
+        self.router = router or model_router
+        self.chunk_cache = chunk_cache
+        self.retry_policy = retry_policy or llm_retry_policy
+        self.dispatcher = dispatcher
+        self.priority = priority
 
     @staticmethod
-    def _validate_length_prompt(prompt: str) -> None:
-        encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+    def _count_tokens(text: str) -> int:
+        return count_tokens(text, OPENAI_MODEL)
 
-        tokens = encoding.encode(prompt)
-        length_tokens_prompt = len(tokens)
+    def _count_repo_tokens(self, repo_data: Repository, indent=0) -> int:
+        length_tokens = 0
+        for depth, name, file in repo_data.walk():
+            prefix = " " * (indent + depth * 2)
+            if file is None:
+                length_tokens += self._count_tokens(
+                    prefix + f"Directory: {name}\n"
+                )
+                continue
+
+            length_tokens += self._count_tokens(
+                prefix + f"File: {name}\nContent:\n"
+            ) + 1
+            if file.tokens is not None:
+                length_tokens += file.tokens
+            else:
+                length_tokens += self._count_tokens(file.content)
+        return length_tokens
+
+    @staticmethod
+    def _validate_length_prompt(
+        prompt: str, length_tokens_prompt: int | None = None
+    ) -> None:
+        if length_tokens_prompt is None:
+            length_tokens_prompt = OpenAIService._count_tokens(prompt)
 
         model_max_tokens = MODEL_TOKEN_LIMITS[OPENAI_MODEL]
 
@@ -43,118 +117,627 @@ class OpenAIService:
                 f"Max tokens: {MODEL_TOKEN_LIMITS[OPENAI_MODEL]}",
             )
 
+    def _iter_repo_data_for_prompt(
+        self, repo_data: Repository, indent=0
+    ) -> Iterator[str]:
+        for depth, name, file in repo_data.walk():
+            prefix = " " * (indent + depth * 2)
+            if file is None:
+                yield prefix + f"Directory: {name}\n"
+                continue
+
+            yield prefix
+            yield f"File: {name}\nContent:\n"
+            yield file.content
+            yield "\n\n"
+
     def _format_repo_data_for_prompt(
-        self, repo_data: list[dict], indent=0
+        self, repo_data: Repository, indent=0
     ) -> str:
-        formatted_data = ""
-        for item in repo_data:
-            if item.get("type") == "file":
-                formatted_data += " " * indent + (
-                    f"File: {item['name']}\n"
-                    f"Content:\n"
-                    f"{item['content']}\n\n"
-                )
-            elif item.get("type") == "dir":
-                formatted_data += " " * indent + f"Directory: {item['name']}\n"
-                formatted_data += self._format_repo_data_for_prompt(
-                    item["content"], indent + 2
-                )
-        return formatted_data
+        return "".join(self._iter_repo_data_for_prompt(repo_data, indent))
 
-    async def analyze_code_with_openai(
+    def _build_review_prompt(
         self,
-        repo_data: list[dict],
+        repo_data: Repository,
         candidate_level: str,
         assignment_description: str,
-        repo_url: str,
-    ) -> None:
-        start_analyzing_code = datetime.now()
+    ) -> str:
+        return "".join(
+            [
+                "Here is a repository with the following files: ",
+                *self._iter_repo_data_for_prompt(repo_data),
+                f". Description: {assignment_description}. "
+                f"Analyze the code for a {candidate_level} developer, "
+                f"and provide feedback."
+                f"{REVIEW_FORMAT}",
+            ]
+        )
 
-        logger.info(f"Starting code review with OpenAI for '{repo_url}'")
-        logger.info(
-            f"Starting formatting repo data for prompt for '{repo_url}'"
+    def _split_file(
+        self, path: str, content: str, budget: int
+    ) -> list[tuple[str, int]]:
+        parts = []
+        current: list[str] = []
+        current_tokens = 0
+        for line in content.splitlines(keepends=True):
+            line_tokens = self._count_tokens(line)
+            if current and current_tokens + line_tokens > budget:
+                parts.append(("".join(current), current_tokens))
+                current, current_tokens = [], 0
+            current.append(line)
+            current_tokens += line_tokens
+        if current:
+            parts.append(("".join(current), current_tokens))
+
+        return [
+            (
+                f"File: {path} (part {index} of {len(parts)})\n"
+                f"Content:\n{part}\n\n",
+                part_tokens,
+            )
+            for index, (part, part_tokens) in enumerate(parts, start=1)
+        ]
+
+    def _split_into_chunks(
+        self, repo_data: Repository, budget: int
+    ) -> list[str]:
+        chunks: list[str] = []
+        current: list[str] = []
+        current_tokens = 0
+
+        for file in repo_data:
+            formatted_file = (
+                f"File: {file.path}\nContent:\n{file.content}\n\n"
+            )
+            file_tokens = self._count_tokens(formatted_file)
+
+            if file_tokens > budget:
+                pieces = self._split_file(file.path, file.content, budget)
+            else:
+                pieces = [(formatted_file, file_tokens)]
+
+            for piece, piece_tokens in pieces:
+                if current and current_tokens + piece_tokens > budget:
+                    chunks.append("".join(current))
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += piece_tokens
+
+        if current:
+            chunks.append("".join(current))
+
+        return chunks
+
+    @staticmethod
+    def _review_messages(prompt: str) -> list[dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": "You are a code review assistant.",
+            },
+            {"role": "user", "content": prompt},
+        ]
+
+    def _routes(
+        self, prompt_tokens: int, candidate_level: str | None
+    ) -> list[LLMBackend]:
+        if self.backend is not None:
+            return [self.backend]
+        return self.router.route(prompt_tokens, candidate_level)
+
+    def _dispatcher_for(self, model: str) -> LLMDispatcher:
+        return self.dispatcher or get_llm_dispatcher(model)
+
+    @staticmethod
+    def _error_reason(exc: LLMTimeoutError | LLMUnavailableError) -> str:
+        if isinstance(exc, LLMTimeoutError):
+            return "timeout"
+        if isinstance(exc, LLMRateLimitError):
+            return "rate_limit"
+        return "unavailable"
+
+    def _record_backend_error(
+        self,
+        exc: LLMTimeoutError | LLMUnavailableError,
+        backend: LLMBackend,
+        started: float,
+    ) -> None:
+        self.router.record(
+            backend.model, time.monotonic() - started, self._error_reason(exc)
         )
+        if isinstance(exc, LLMRateLimitError) and exc.retry_after:
+            self._dispatcher_for(backend.model).pause(exc.retry_after)
+
+        if isinstance(exc, LLMTimeoutError) or (
+            exc.retryable and not isinstance(exc, LLMRateLimitError)
+        ):
+            backend.circuit_breaker.record_failure()
+        else:
+            backend.circuit_breaker.record_success()
 
-        formatted_data_from_github = self._format_repo_data_for_prompt(
-            repo_data
+    def _record_backend_success(
+        self, backend: LLMBackend, started: float
+    ) -> None:
+        self.router.record(backend.model, time.monotonic() - started, "ok")
+        backend.circuit_breaker.record_success()
+
+    def _can_fall_back(
+        self,
+        exc: LLMTimeoutError | LLMUnavailableError,
+        backend: LLMBackend,
+        routes: list[LLMBackend],
+    ) -> bool:
+        if not isinstance(exc, (LLMTimeoutError, LLMRateLimitError)):
+            return False
+        if backend is routes[-1]:
+            return False
+
+        logger.warning(
+            f"Falling back from '{backend.model}' after "
+            f"{self._error_reason(exc)}"
         )
+        return True
 
-        logger.info(f"Finished formatting repo data for prompt ({repo_url})")
+    async def _retry_or_raise(
+        self,
+        exc: LLMTimeoutError | LLMUnavailableError,
+        retries: RetryBudget,
+        retryable: bool = True,
+    ) -> None:
+        reason = self._error_reason(exc)
 
+        if (
+            retryable
+            and getattr(exc, "retryable", True)
+            and await retries.wait(getattr(exc, "retry_after", None))
+        ):
+            LLM_RETRIES.inc(reason=reason)
+            logger.info(
+                f"Retrying OpenAI request after {reason} "
+                f"(attempt {retries.attempt})"
+            )
+            return
+
+        logger.critical(f"OpenAI request failed: {exc}")
+        if isinstance(exc, LLMTimeoutError):
+            raise HTTPException(
+                status_code=status.HTTP_408_REQUEST_TIMEOUT,
+                detail="Request timeout. Please try again later.",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service unavailable. Please try again later.",
+        )
+
+    def _check_circuit(self, backend: LLMBackend) -> None:
         try:
-            self._validate_length_prompt(formatted_data_from_github)
+            backend.circuit_breaker.check()
+        except CircuitOpenError as exc:
+            logger.warning(exc)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service unavailable. Please try again later.",
+            )
 
-            prompt = (
-                f"Here is a repository with the following files: "
-                f"{formatted_data_from_github}. "
-                f"Description: {assignment_description}. "
-                f"Analyze the code for a {candidate_level} developer, "
-                f"and provide feedback."
-                f"Return the review result (text) in the following format: "
-                f"Found files, Downsides/Comments, Rating (from 0 to 10), "
-                f"Conclusion. "
-                f"It must be dictionary. "
-                f"Return data without special characters or formatting."
+    async def _wait_for_budget(
+        self, backend: LLMBackend, prompt_tokens: int
+    ) -> None:
+        try:
+            with STAGE_DURATION.time(stage="llm_queue"):
+                await self._dispatcher_for(backend.model).acquire(
+                    prompt_tokens + LLM_DISPATCH_COMPLETION_TOKENS,
+                    self.priority,
+                )
+        except LLMQueueTimeoutError as exc:
+            logger.warning(exc)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Service is busy. Please try again later.",
             )
 
-            number_retry_connection = 10
+    async def _request_review(
+        self,
+        prompt: str,
+        repo_url: str,
+        prompt_tokens: int | None = None,
+        candidate_level: str | None = None,
+    ) -> dict[str, Any]:
+        if prompt_tokens is None:
+            prompt_tokens = len(prompt) // PROMPT_CHARS_PER_TOKEN
+        retries = self.retry_policy.start()
 
-            while True:
+        while True:
+            routes = self._routes(prompt_tokens, candidate_level)
+            for index, backend in enumerate(routes):
+                self._check_circuit(backend)
+                await self._wait_for_budget(backend, prompt_tokens)
+                ROUTED_REQUESTS.inc(
+                    model=backend.model,
+                    reason="fallback" if index else "primary",
+                )
+                started = time.monotonic()
                 try:
                     logger.info(
-                        f"Trying to analyze code with OpenAI for '{repo_url}'"
+                        f"Trying to analyze code with OpenAI "
+                        f"({backend.model}) for '{repo_url}'"
                     )
-                    response = await self.client.chat.completions.create(
-                        model=OPENAI_MODEL,
-                        messages=[
-                            {
-                                "role": "system",
-                                "content": "You are a code review assistant.",
-                            },
-                            {"role": "user", "content": prompt},
-                        ],
+                    with STAGE_DURATION.time(stage="llm_call"):
+                        review = await backend.complete(
+                            self._review_messages(prompt)
+                        )
+                except (LLMTimeoutError, LLMUnavailableError) as exc:
+                    self._record_backend_error(exc, backend, started)
+                    if self._can_fall_back(exc, backend, routes):
+                        continue
+                    await self._retry_or_raise(exc, retries)
+                    break
+
+                self._record_backend_success(backend, started)
+                with STAGE_DURATION.time(stage="json_parse"):
+                    return await offloader.run(
+                        len(review), json.loads, review
                     )
 
-                    review = response.choices[0].message.content
-                    review_json = json.loads(review)
+    async def _stream_review(
+        self,
+        prompt: str,
+        repo_url: str,
+        prompt_tokens: int | None = None,
+        candidate_level: str | None = None,
+    ) -> AsyncIterator[str]:
+        if prompt_tokens is None:
+            prompt_tokens = len(prompt) // PROMPT_CHARS_PER_TOKEN
+        retries = self.retry_policy.start()
+        received = False
 
+        while True:
+            routes = self._routes(prompt_tokens, candidate_level)
+            for index, backend in enumerate(routes):
+                self._check_circuit(backend)
+                await self._wait_for_budget(backend, prompt_tokens)
+                ROUTED_REQUESTS.inc(
+                    model=backend.model,
+                    reason="fallback" if index else "primary",
+                )
+                started = time.monotonic()
+                try:
                     logger.info(
-                        f"Finished analyzing code with OpenAI for {repo_url}"
+                        f"Trying to stream code review from OpenAI "
+                        f"({backend.model}) for '{repo_url}'"
+                    )
+                    with STAGE_DURATION.time(stage="llm_stream"):
+                        async for text in backend.stream(
+                            self._review_messages(prompt)
+                        ):
+                            received = True
+                            yield text
+                except (LLMTimeoutError, LLMUnavailableError) as exc:
+                    self._record_backend_error(exc, backend, started)
+                    if not received and self._can_fall_back(
+                        exc, backend, routes
+                    ):
+                        continue
+                    await self._retry_or_raise(
+                        exc, retries, retryable=not received
                     )
+                    break
+
+                self._record_backend_success(backend, started)
+                return
+
+    async def _review_chunk(
+        self,
+        chunk: str,
+        part: int,
+        parts: int,
+        candidate_level: str,
+        assignment_description: str,
+        repo_url: str,
+    ) -> dict[str, Any]:
+        cache_key = None
+        if self.chunk_cache is not None:
+            cache_key = ChunkReviewCache.build_key(
+                chunk, candidate_level, assignment_description, OPENAI_MODEL
+            )
+            cached_review = await self.chunk_cache.get(cache_key)
+            if cached_review is not None:
+                logger.info(
+                    f"Found cached review of part {part} for '{repo_url}'"
+                )
+                return cached_review
 
-                    end_analyzing_code = datetime.now()
-                    time_taken = end_analyzing_code - start_analyzing_code
+        prompt = (
+            f"Here is part {part} of {parts} of a repository "
+            f"with the following files: {chunk}. "
+            f"Description: {assignment_description}. "
+            f"Analyze this part of the code for a {candidate_level} "
+            f"developer, and provide feedback. "
+            f"{REVIEW_FORMAT}"
+        )
+        review = await self._request_review(
+            prompt, repo_url, candidate_level=candidate_level
+        )
+
+        if cache_key is not None:
+            await self.chunk_cache.set(cache_key, review)
+
+        return review
+
+    async def _reduce_reviews(
+        self,
+        reviews: list[dict[str, Any]],
+        candidate_level: str,
+        assignment_description: str,
+        repo_url: str,
+    ) -> dict[str, Any]:
+        budget = MODEL_TOKEN_LIMITS[OPENAI_MODEL] // 2
+        groups: list[list[dict[str, Any]]] = [[]]
+        group_tokens = 0
+        for review in reviews:
+            review_tokens = self._count_tokens(json.dumps(review))
+            if groups[-1] and group_tokens + review_tokens > budget:
+                groups.append([])
+                group_tokens = 0
+            groups[-1].append(review)
+            group_tokens += review_tokens
+
+        merged = []
+        for group in groups:
+            prompt = (
+                f"Here are reviews of {len(group)} parts of one repository: "
+                f"{json.dumps(group)}. "
+                f"Description: {assignment_description}. "
+                f"Merge them into a single review of the whole repository "
+                f"for a {candidate_level} developer. "
+                f"{REVIEW_FORMAT}"
+            )
+            merged.append(
+                await self._request_review(
+                    prompt, repo_url, candidate_level=candidate_level
+                )
+            )
+
+        if len(merged) == 1:
+            return merged[0]
+
+        return await self._reduce_reviews(
+            merged, candidate_level, assignment_description, repo_url
+        )
+
+    async def _map_reduce_review(
+        self,
+        repo_data: Repository,
+        candidate_level: str,
+        assignment_description: str,
+        repo_url: str,
+    ) -> dict[str, Any]:
+        budget = min(
+            MAP_REDUCE_CHUNK_TOKENS, MODEL_TOKEN_LIMITS[OPENAI_MODEL]
+        ) - self._count_tokens(assignment_description)
+        chunks = await offloader.run(
+            repo_data.size,
+            self._split_into_chunks,
+            repo_data,
+            budget,
+            threads_only=True,
+        )
+
+        logger.info(
+            f"Repository '{repo_url}' exceeds the token limit. "
+            f"Reviewing it in {len(chunks)} parts"
+        )
+
+        semaphore = asyncio.Semaphore(MAP_REDUCE_CONCURRENCY)
+
+        async def review_chunk(part: int, chunk: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self._review_chunk(
+                    chunk,
+                    part,
+                    len(chunks),
+                    candidate_level,
+                    assignment_description,
+                    repo_url,
+                )
+
+        reviews = await asyncio.gather(
+            *(
+                review_chunk(part, chunk)
+                for part, chunk in enumerate(chunks, start=1)
+            )
+        )
+
+        return await self._reduce_reviews(
+            reviews, candidate_level, assignment_description, repo_url
+        )
+
+    async def analyze_code_with_openai(
+        self,
+        repo_data: Repository,
+        candidate_level: str,
+        assignment_description: str,
+        repo_url: str,
+    ) -> dict[str, Any]:
+        logger.info(f"Starting code review with OpenAI for '{repo_url}'")
+
+        try:
+            with STAGE_DURATION.time(stage="token_count"):
+                length_tokens_prompt = self._count_repo_tokens(repo_data)
+
+            with STAGE_DURATION.time(stage="llm_analysis") as timer:
+                if (
+                    MAP_REDUCE_ENABLED
+                    and length_tokens_prompt
+                    > MODEL_TOKEN_LIMITS[OPENAI_MODEL]
+                ):
+                    review_json = await self._map_reduce_review(
+                        repo_data,
+                        candidate_level,
+                        assignment_description,
+                        repo_url,
+                    )
+                else:
                     logger.info(
-                        f"Time taken to analyze code with OpenAI: {time_taken}"
+                        f"Starting formatting repo data for prompt "
+                        f"for '{repo_url}'"
                     )
-                    return review_json
 
-                except APITimeoutError:
-                    if number_retry_connection == 0:
-                        logger.critical(
-                            "Request timeout for OpenAI. Service unavailable."
+                    with STAGE_DURATION.time(stage="prompt_format"):
+                        prompt = await offloader.run(
+                            repo_data.size,
+                            self._build_review_prompt,
+                            repo_data,
+                            candidate_level,
+                            assignment_description,
+                            threads_only=True,
                         )
-                        raise HTTPException(
-                            status_code=status.HTTP_408_REQUEST_TIMEOUT,
-                            detail="Request timeout. Please try again later.",
-                        )
-                    else:
-                        number_retry_connection -= 1
-                        logger.info(
-                            f"Timeout error for OpenAI. "
-                            f"Retrying ({number_retry_connection}. "
-                            f"Left {number_retry_connection})"
-                        )
-                except (
-                    AuthenticationError,
-                    InternalServerError,
-                    RateLimitError,
-                ) as exc:
-                    logger.critical(exc)
-                    raise HTTPException(
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                        detail="Service unavailable. Please try again later.",
+
+                    logger.info(
+                        f"Finished formatting repo data for prompt "
+                        f"({repo_url})"
+                    )
+
+                    self._validate_length_prompt(prompt, length_tokens_prompt)
+
+                    review_json = await self._request_review(
+                        prompt,
+                        repo_url,
+                        length_tokens_prompt,
+                        candidate_level,
                     )
 
+            logger.info(
+                f"Finished analyzing code with OpenAI for {repo_url}"
+            )
+            logger.info(
+                f"Time taken to analyze code with OpenAI: "
+                f"{timer.elapsed:.3f}s"
+            )
+            return review_json
+
         except HTTPException as exc:
             raise exc
+
+    def _build_changes_prompt(
+        self,
+        repo_data: Repository,
+        removed: list[str],
+        previous_review: dict[str, Any],
+        candidate_level: str,
+        assignment_description: str,
+    ) -> str:
+        removed_files = (
+            f"Removed files: {', '.join(removed)}. " if removed else ""
+        )
+
+        return "".join(
+            [
+                f"Here is the previous review of a repository: "
+                f"{json.dumps(previous_review)}. "
+                f"Since then the developer changed the following files: ",
+                *self._iter_repo_data_for_prompt(repo_data),
+                f". {removed_files}"
+                f"Description: {assignment_description}. "
+                f"Update the review for a {candidate_level} developer: "
+                f"keep the findings about unchanged files, drop the ones "
+                f"that were fixed and add new ones for the changed code. "
+                f"{REVIEW_FORMAT}",
+            ]
+        )
+
+    async def review_changes(
+        self,
+        repo_data: Repository,
+        removed: list[str],
+        previous_review: dict[str, Any],
+        candidate_level: str,
+        assignment_description: str,
+        repo_url: str,
+    ) -> dict[str, Any]:
+        logger.info(f"Starting incremental code review for '{repo_url}'")
+
+        prompt = self._build_changes_prompt(
+            repo_data,
+            removed,
+            previous_review,
+            candidate_level,
+            assignment_description,
+        )
+        await offloader.run(
+            len(prompt), self._validate_length_prompt, prompt,
+            threads_only=True,
+        )
+
+        with STAGE_DURATION.time(stage="llm_analysis"):
+            return await self._request_review(
+                prompt, repo_url, candidate_level=candidate_level
+            )
+
+    async def stream_code_review(
+        self,
+        repo_data: Repository,
+        candidate_level: str,
+        assignment_description: str,
+        repo_url: str,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        with STAGE_DURATION.time(stage="token_count"):
+            length_tokens_prompt = self._count_repo_tokens(repo_data)
+        yield "tokens_counted", {"tokens": length_tokens_prompt}
+
+        if (
+            MAP_REDUCE_ENABLED
+            and length_tokens_prompt > MODEL_TOKEN_LIMITS[OPENAI_MODEL]
+        ):
+            yield "review_started", {"mode": "map_reduce"}
+            review_json = await self._map_reduce_review(
+                repo_data, candidate_level, assignment_description, repo_url
+            )
+        else:
+            with STAGE_DURATION.time(stage="prompt_format"):
+                prompt = await offloader.run(
+                    repo_data.size,
+                    self._build_review_prompt,
+                    repo_data,
+                    candidate_level,
+                    assignment_description,
+                    threads_only=True,
+                )
+            self._validate_length_prompt(prompt, length_tokens_prompt)
+
+            yield "review_started", {"mode": "single"}
+            review_parts = []
+            async for text in self._stream_review(
+                prompt, repo_url, length_tokens_prompt, candidate_level
+            ):
+                review_parts.append(text)
+                yield "model_tokens", {"text": text}
+            review_text = "".join(review_parts)
+            with STAGE_DURATION.time(stage="json_parse"):
+                review_json = await offloader.run(
+                    len(review_text), json.loads, review_text
+                )
+
+        logger.info(f"Finished streaming code review for {repo_url}")
+        yield "review", review_json
+
+    def build_batch_request(
+        self,
+        repo_data: Repository,
+        candidate_level: str,
+        assignment_description: str,
+    ) -> dict[str, Any]:
+        prompt = self._build_review_prompt(
+            repo_data, candidate_level, assignment_description
+        )
+        prompt_tokens = self._count_repo_tokens(repo_data)
+        self._validate_length_prompt(prompt, prompt_tokens)
+        backend = self._routes(prompt_tokens, candidate_level)[0]
+
+        return {
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": backend.model,
+                "messages": self._review_messages(prompt),
+            },
+        }
@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(slots=True, eq=False)
+class RepoFile:
+    path: str
+    data: str | bytes
+    sha: str | None = None
+    size: int | None = None
+    tokens: int | None = None
+
+    @property
+    def name(self) -> str:
+        return self.path.rpartition("/")[2]
+
+    def __post_init__(self) -> None:
+        if self.size is None:
+            self.size = len(self.data)
+
+    @property
+    def content(self) -> str:
+        if isinstance(self.data, bytes):
+            self.data = self.data.decode("utf-8", errors="replace")
+        return self.data
+
+
+class Repository:
+    __slots__ = ("files", "directories")
+
+    def __init__(
+        self,
+        files: list[RepoFile] | None = None,
+        directories: list[str] | None = None,
+    ) -> None:
+        self.files = files if files is not None else []
+        self.directories = directories if directories is not None else []
+
+    def __iter__(self) -> Iterator[RepoFile]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __bool__(self) -> bool:
+        return bool(self.files or self.directories)
+
+    def add_file(self, file: RepoFile) -> None:
+        self.files.append(file)
+
+    def add_directory(self, path: str) -> None:
+        self.directories.append(path)
+
+    @property
+    def paths(self) -> list[str]:
+        return [file.path for file in self.files]
+
+    @property
+    def size(self) -> int:
+        return sum(file.size for file in self.files)
+
+    def walk(self) -> Iterator[tuple[int, str, RepoFile | None]]:
+        directories = set(self.directories)
+        for file in self.files:
+            directories.update(
+                file.path[:index]
+                for index, char in enumerate(file.path)
+                if char == "/"
+            )
+
+        entries: list[tuple[tuple[str, ...], RepoFile | None]] = [
+            (tuple(path.split("/")), None) for path in directories
+        ]
+        entries.extend(
+            (tuple(file.path.split("/")), file) for file in self.files
+        )
+        entries.sort(key=lambda entry: entry[0])
+
+        for parts, file in entries:
+            yield len(parts) - 1, parts[-1], file
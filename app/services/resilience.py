@@ -0,0 +1,191 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+
+from app.services.metrics import Counter, Gauge
+from settings import (
+    setup_logger,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    GITHUB_RETRY_BASE_DELAY,
+    GITHUB_RETRY_DEADLINE,
+    GITHUB_RETRY_MAX_DELAY,
+    GITHUB_RETRY_MAX_RETRIES,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_DEADLINE,
+    LLM_RETRY_MAX_DELAY,
+    LLM_RETRY_MAX_RETRIES,
+)
+
+logger = setup_logger()
+
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state by upstream (0 closed, 1 half-open, 2 open)",
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes by upstream and new state",
+)
+CIRCUIT_REJECTED = Counter(
+    "circuit_breaker_rejected_total",
+    "Calls rejected without reaching the upstream by an open circuit",
+)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> float | None:
+    retry_after = headers.get("Retry-After")
+    if retry_after is None:
+        return None
+
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float,
+        deadline: float,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.random = rng or random.Random()
+
+    def backoff(self, attempt: int) -> float:
+        cap = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return self.random.uniform(0, cap)
+
+    def start(self) -> "RetryBudget":
+        return RetryBudget(self)
+
+
+class RetryBudget:
+    def __init__(self, policy: RetryPolicy) -> None:
+        self.policy = policy
+        self.attempt = 0
+        self.expires_at = time.monotonic() + policy.deadline
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def next_delay(self, retry_after: float | None = None) -> float | None:
+        if self.attempt >= self.policy.max_retries:
+            return None
+
+        delay = self.policy.backoff(self.attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if delay > self.remaining():
+            return None
+
+        self.attempt += 1
+        return delay
+
+    async def wait(self, retry_after: float | None = None) -> bool:
+        delay = self.next_delay(retry_after)
+        if delay is None:
+            return False
+
+        logger.info(f"Retry {self.attempt} in {delay:.2f}s")
+        await asyncio.sleep(delay)
+        return True
+
+
+class CircuitBreaker:
+    STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+    def __init__(
+        self,
+        upstream: str,
+        failure_threshold: int = CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    ) -> None:
+        self.upstream = upstream
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        CIRCUIT_STATE.set(0, upstream=upstream)
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+
+        logger.info(
+            f"Circuit breaker for '{self.upstream}' moved from "
+            f"{self.state} to {state}"
+        )
+        self.state = state
+        CIRCUIT_STATE.set(self.STATES[state], upstream=self.upstream)
+        CIRCUIT_TRANSITIONS.inc(upstream=self.upstream, state=state)
+
+    @property
+    def available(self) -> bool:
+        return (
+            self.state != "open"
+            or time.monotonic() - self._opened_at >= self.recovery_timeout
+        )
+
+    def check(self) -> None:
+        if self.state == "closed":
+            return
+
+        now = time.monotonic()
+        if now - self._opened_at >= self.recovery_timeout:
+            self._opened_at = now
+            self._set_state("half_open")
+            return
+
+        CIRCUIT_REJECTED.inc(upstream=self.upstream)
+        raise CircuitOpenError(
+            f"Circuit breaker for '{self.upstream}' is open"
+        )
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._set_state("closed")
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if (
+            self.state == "half_open"
+            or self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state("open")
+
+
+github_retry_policy = RetryPolicy(
+    max_retries=GITHUB_RETRY_MAX_RETRIES,
+    base_delay=GITHUB_RETRY_BASE_DELAY,
+    max_delay=GITHUB_RETRY_MAX_DELAY,
+    deadline=GITHUB_RETRY_DEADLINE,
+)
+llm_retry_policy = RetryPolicy(
+    max_retries=LLM_RETRY_MAX_RETRIES,
+    base_delay=LLM_RETRY_BASE_DELAY,
+    max_delay=LLM_RETRY_MAX_DELAY,
+    deadline=LLM_RETRY_DEADLINE,
+)
+github_circuit_breaker = CircuitBreaker("github")
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from typing import Any, Mapping, NamedTuple
+
+from app.services.metrics import Counter, Gauge
+from settings import GITHUB_RESPONSE_STORE_MAX_BYTES
+
+CONDITIONAL_REQUESTS = Counter(
+    "github_conditional_requests_total",
+    "Conditional GitHub requests by result",
+)
+RESPONSE_STORE_BYTES = Gauge(
+    "github_response_store_bytes",
+    "Size of the GitHub responses kept for conditional requests",
+)
+
+
+class StoredResponse(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    data: Any
+    size: int
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class GitHubResponseStore:
+    def __init__(self, max_bytes: int = GITHUB_RESPONSE_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, StoredResponse] = OrderedDict()
+
+    def get(self, url: str) -> StoredResponse | None:
+        entry = self._entries.get(url)
+        if entry is not None:
+            self._entries.move_to_end(url)
+        return entry
+
+    def put(
+        self, url: str, headers: Mapping[str, str], data: Any, size: int
+    ) -> None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not (etag or last_modified) or size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(url, None)
+        if previous is not None:
+            self.size -= previous.size
+
+        self._entries[url] = StoredResponse(etag, last_modified, data, size)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+        RESPONSE_STORE_BYTES.set(self.size)
+
+    def record(self, not_modified: bool) -> None:
+        CONDITIONAL_REQUESTS.inc(
+            result="not_modified" if not_modified else "modified"
+        )
+
+
+github_response_store = GitHubResponseStore()
@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+
+from app.services.cache_codec import CacheCodec, CacheCodecError, cache_codec
+from app.services.metrics import Counter, STAGE_DURATION
+from app.services.offload import offloader
+from settings import (
+    setup_logger,
+    CHUNK_REVIEW_CACHE_TTL,
+    REVIEW_CACHE_REFRESH_AFTER,
+    REVIEW_CACHE_TTL,
+    REVIEW_HISTORY_TTL,
+)
+
+logger = setup_logger()
+
+REVIEW_CACHE_REQUESTS = Counter(
+    "review_cache_requests_total",
+    "Review cache lookups by result",
+)
+CHUNK_REVIEW_CACHE_REQUESTS = Counter(
+    "chunk_review_cache_requests_total",
+    "Map-reduce chunk review cache lookups by result",
+)
+REVIEW_CACHE_REFRESHES = Counter(
+    "review_cache_refreshes_total",
+    "Background refreshes of stale reviews by result",
+)
+
+
+class ReviewCache:
+    KEY_PREFIX = "review:"
+    REFRESH_LOCK_TTL = 600
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        ttl: int = REVIEW_CACHE_TTL,
+        refresh_after: int = REVIEW_CACHE_REFRESH_AFTER,
+        codec: CacheCodec | None = None,
+    ) -> None:
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.codec = codec or cache_codec
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def build_key(
+        owner: str,
+        repo: str,
+        commit_sha: str,
+        candidate_level: str,
+        assignment_description: str,
+        model: str,
+    ) -> str:
+        description_hash = hashlib.sha256(
+            assignment_description.encode("utf-8")
+        ).hexdigest()[:16]
+
+        return (
+            f"{ReviewCache.KEY_PREFIX}{owner}/{repo}@{commit_sha}:"
+            f"{candidate_level.lower()}:{model}:{description_hash}"
+        )
+
+    async def get(self, key: str) -> tuple[dict[str, Any], bool] | None:
+        try:
+            with STAGE_DURATION.time(stage="review_cache_get"):
+                cached = await self.redis_client.get(key)
+        except Exception as exc:
+            logger.info(f"Failed to fetch cached result. Error: '{exc}'")
+            return None
+
+        if not cached:
+            REVIEW_CACHE_REQUESTS.inc(result="miss")
+            return None
+
+        try:
+            entry = await offloader.run(
+                len(cached), self.codec.decode, cached
+            )
+        except CacheCodecError as exc:
+            logger.info(f"Discarding unreadable cached result: '{exc}'")
+            REVIEW_CACHE_REQUESTS.inc(result="miss")
+            return None
+
+        stale = time.time() - entry["created_at"] > self.refresh_after
+        REVIEW_CACHE_REQUESTS.inc(result="stale" if stale else "hit")
+
+        return entry["review"], stale
+
+    async def set(self, key: str, review: dict[str, Any]) -> None:
+        entry = {"created_at": time.time(), "review": review}
+        try:
+            with STAGE_DURATION.time(stage="review_cache_set"):
+                await self.redis_client.set(
+                    key, self.codec.encode(entry), ex=self.ttl
+                )
+        except Exception as exc:
+            logger.info(f"Failed to adding a result to cache. Error: '{exc}'")
+
+    async def _acquire_refresh_lock(self, key: str) -> bool:
+        try:
+            return bool(
+                await self.redis_client.set(
+                    f"{key}:refresh", 1, nx=True, ex=self.REFRESH_LOCK_TTL
+                )
+            )
+        except Exception as exc:
+            logger.info(f"Failed to acquire refresh lock. Error: '{exc}'")
+            return False
+
+    async def _refresh(
+        self, key: str, produce: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> None:
+        try:
+            if not await self._acquire_refresh_lock(key):
+                return
+
+            logger.info(f"Refreshing stale review '{key}'")
+            await self.set(key, await produce())
+            REVIEW_CACHE_REFRESHES.inc(result="success")
+        except Exception as exc:
+            REVIEW_CACHE_REFRESHES.inc(result="error")
+            logger.warning(f"Failed to refresh review '{key}'. Error: {exc}")
+        finally:
+            self._refreshing.discard(key)
+
+    def refresh_in_background(
+        self, key: str, produce: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, produce))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class ChunkReviewCache:
+    KEY_PREFIX = "chunk_review:"
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        ttl: int = CHUNK_REVIEW_CACHE_TTL,
+        codec: CacheCodec | None = None,
+    ) -> None:
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.codec = codec or cache_codec
+
+    @staticmethod
+    def build_key(
+        chunk: str,
+        candidate_level: str,
+        assignment_description: str,
+        model: str,
+    ) -> str:
+        digest = hashlib.sha256()
+        for part in (model, candidate_level.lower(), assignment_description):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(chunk.encode("utf-8"))
+
+        return f"{ChunkReviewCache.KEY_PREFIX}{digest.hexdigest()}"
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            with STAGE_DURATION.time(stage="chunk_cache_get"):
+                cached = await self.redis_client.get(key)
+        except Exception as exc:
+            logger.info(f"Failed to fetch cached chunk review: '{exc}'")
+            return None
+
+        if cached:
+            try:
+                review = await offloader.run(
+                    len(cached), self.codec.decode, cached
+                )
+            except CacheCodecError as exc:
+                logger.info(f"Discarding unreadable chunk review: '{exc}'")
+            else:
+                CHUNK_REVIEW_CACHE_REQUESTS.inc(result="hit")
+                return review
+
+        CHUNK_REVIEW_CACHE_REQUESTS.inc(result="miss")
+        return None
+
+    async def set(self, key: str, review: dict[str, Any]) -> None:
+        try:
+            with STAGE_DURATION.time(stage="chunk_cache_set"):
+                await self.redis_client.set(
+                    key, self.codec.encode(review), ex=self.ttl
+                )
+        except Exception as exc:
+            logger.info(f"Failed to adding a chunk review to cache: '{exc}'")
+
+
+class ReviewHistory:
+    KEY_PREFIX = "review_history:"
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        ttl: int = REVIEW_HISTORY_TTL,
+        codec: CacheCodec | None = None,
+    ) -> None:
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.codec = codec or cache_codec
+
+    @staticmethod
+    def build_key(
+        owner: str,
+        repo: str,
+        candidate_level: str,
+        assignment_description: str,
+        model: str,
+    ) -> str:
+        description_hash = hashlib.sha256(
+            assignment_description.encode("utf-8")
+        ).hexdigest()[:16]
+
+        return (
+            f"{ReviewHistory.KEY_PREFIX}{owner}/{repo}:"
+            f"{candidate_level.lower()}:{model}:{description_hash}"
+        )
+
+    async def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            cached = await self.redis_client.get(key)
+        except Exception as exc:
+            logger.info(f"Failed to fetch review history: '{exc}'")
+            return None
+
+        if not cached:
+            return None
+
+        try:
+            return await offloader.run(len(cached), self.codec.decode, cached)
+        except CacheCodecError as exc:
+            logger.info(f"Discarding unreadable review history: '{exc}'")
+            return None
+
+    async def set(
+        self,
+        key: str,
+        commit_sha: str,
+        review: dict[str, Any],
+        files: list[str],
+    ) -> None:
+        entry = {"commit_sha": commit_sha, "review": review, "files": files}
+        try:
+            await self.redis_client.set(
+                key, self.codec.encode(entry), ex=self.ttl
+            )
+        except Exception as exc:
+            logger.info(f"Failed to store review history: '{exc}'")
@@ -0,0 +1,325 @@
+import asyncio
+import ipaddress
+import json
+import socket
+import time
+import uuid
+from typing import Any, Callable
+
+import httpx
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+
+from app.services.manage_api_service import ManageAPIService
+from app.services.metrics import Counter
+from settings import (
+    setup_logger,
+    REVIEW_JOB_LEASE_TTL,
+    REVIEW_JOB_QUEUE,
+    REVIEW_JOB_TTL,
+    REVIEW_WEBHOOK_ALLOWED_HOSTS,
+    REVIEW_WEBHOOK_MAX_RETRIES,
+    REVIEW_WEBHOOK_TIMEOUT,
+    REVIEW_WORKER_CONCURRENCY,
+)
+
+logger = setup_logger()
+
+REVIEW_JOBS = Counter(
+    "review_jobs_total",
+    "Asynchronous review jobs by status",
+)
+REVIEW_WEBHOOKS = Counter(
+    "review_webhooks_total",
+    "Review job webhook deliveries by result",
+)
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    return ip.is_global and not ip.is_multicast
+
+
+async def validate_webhook_url(url: str) -> None:
+    parsed = httpx.URL(url)
+    if parsed.scheme not in ("http", "https") or not parsed.host:
+        raise ValueError(
+            f"Unsupported webhook URL: {url}. Must be an http(s) URL"
+        )
+
+    host = parsed.host.lower()
+    if REVIEW_WEBHOOK_ALLOWED_HOSTS:
+        if host not in REVIEW_WEBHOOK_ALLOWED_HOSTS:
+            raise ValueError(
+                f"Unsupported webhook host: {host}. "
+                f"Must be one of {REVIEW_WEBHOOK_ALLOWED_HOSTS}"
+            )
+        return
+
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            host,
+            parsed.port or (443 if parsed.scheme == "https" else 80),
+            type=socket.SOCK_STREAM,
+        )
+    except OSError as exc:
+        raise ValueError(f"Failed to resolve webhook host {host}: {exc}")
+
+    if not addresses or not all(
+        _is_public_address(address[4][0]) for address in addresses
+    ):
+        raise ValueError(
+            f"Unsupported webhook host: {host}. "
+            f"Must resolve to public addresses only"
+        )
+
+
+class ReviewJobQueue:
+    KEY_PREFIX = "review_job:"
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        queue: str = REVIEW_JOB_QUEUE,
+        ttl: int = REVIEW_JOB_TTL,
+        lease_ttl: int = REVIEW_JOB_LEASE_TTL,
+    ) -> None:
+        self.redis_client = redis_client
+        self.queue = queue
+        self.processing = f"{queue}:processing"
+        self.ttl = ttl
+        self.lease_ttl = lease_ttl
+        self._unleased: set[str] = set()
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+    def _lease_key(self, job_id: str) -> str:
+        return f"{self.KEY_PREFIX}{job_id}:lease"
+
+    async def _update(self, job_id: str, **fields: Any) -> None:
+        key = self._job_key(job_id)
+        await self.redis_client.hset(
+            key, mapping={**fields, "updated_at": time.time()}
+        )
+        await self.redis_client.expire(key, self.ttl)
+
+    async def enqueue(self, request: dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        await self._update(
+            job_id,
+            status="queued",
+            request=json.dumps(request),
+            created_at=time.time(),
+        )
+        await self.redis_client.lpush(self.queue, job_id)
+        REVIEW_JOBS.inc(status="queued")
+
+        return job_id
+
+    async def dequeue(
+        self, timeout: float = 5
+    ) -> tuple[str, dict[str, Any]] | None:
+        job_id = await self.redis_client.blmove(
+            self.queue, self.processing, timeout, src="RIGHT", dest="LEFT"
+        )
+        if job_id is None:
+            return None
+        if isinstance(job_id, bytes):
+            job_id = job_id.decode("utf-8")
+
+        job = await self.get(job_id)
+        if job is None:
+            logger.warning(f"Review job {job_id} expired before it started")
+            await self.ack(job_id)
+            return None
+
+        await self.extend_lease(job_id)
+        await self._update(job_id, status="running")
+        REVIEW_JOBS.inc(status="running")
+
+        return job_id, job["request"]
+
+    async def extend_lease(self, job_id: str) -> None:
+        await self.redis_client.set(
+            self._lease_key(job_id), 1, ex=self.lease_ttl
+        )
+
+    async def ack(self, job_id: str) -> None:
+        await self.redis_client.lrem(self.processing, 1, job_id)
+        await self.redis_client.delete(self._lease_key(job_id))
+
+    async def requeue_stale(self) -> int:
+        unleased = set()
+        for job_id in await self.redis_client.lrange(
+            self.processing, 0, -1
+        ):
+            if isinstance(job_id, bytes):
+                job_id = job_id.decode("utf-8")
+            if not await self.redis_client.exists(self._lease_key(job_id)):
+                unleased.add(job_id)
+
+        stale = unleased & self._unleased
+        self._unleased = unleased - stale
+
+        requeued = 0
+        for job_id in stale:
+            if not await self.redis_client.lrem(self.processing, 1, job_id):
+                continue
+            if await self.get(job_id) is None:
+                continue
+            logger.warning(f"Requeueing abandoned review job {job_id}")
+            await self._update(job_id, status="queued")
+            await self.redis_client.rpush(self.queue, job_id)
+            REVIEW_JOBS.inc(status="requeued")
+            requeued += 1
+
+        return requeued
+
+    async def complete(self, job_id: str, result: dict[str, Any]) -> None:
+        await self._update(
+            job_id, status="completed", result=json.dumps(result)
+        )
+        REVIEW_JOBS.inc(status="completed")
+
+    async def fail(self, job_id: str, status_code: int, detail: Any) -> None:
+        await self._update(
+            job_id,
+            status="failed",
+            error=json.dumps(
+                {
+                    "status_code": status_code,
+                    "detail": jsonable_encoder(detail),
+                }
+            ),
+        )
+        REVIEW_JOBS.inc(status="failed")
+
+    async def get(self, job_id: str) -> dict[str, Any] | None:
+        raw = await self.redis_client.hgetall(self._job_key(job_id))
+        if not raw:
+            return None
+
+        job = {
+            (key.decode("utf-8") if isinstance(key, bytes) else key): (
+                value.decode("utf-8") if isinstance(value, bytes) else value
+            )
+            for key, value in raw.items()
+        }
+        result = {"job_id": job_id, "status": job["status"]}
+        for field in ("request", "result", "error"):
+            if field in job:
+                result[field] = json.loads(job[field])
+
+        return result
+
+
+class ReviewWorker:
+    ERROR_BACKOFF = 1
+
+    def __init__(
+        self,
+        queue: ReviewJobQueue,
+        service_factory: Callable[[], ManageAPIService],
+        webhook_client: httpx.AsyncClient | None = None,
+        concurrency: int = REVIEW_WORKER_CONCURRENCY,
+    ) -> None:
+        self.queue = queue
+        self.service_factory = service_factory
+        self.webhook_client = webhook_client
+        self.concurrency = concurrency
+
+    async def _notify(self, webhook_url: str, job: dict[str, Any]) -> None:
+        if self.webhook_client is None:
+            return
+
+        try:
+            await validate_webhook_url(webhook_url)
+        except ValueError as exc:
+            logger.warning(f"Skipping webhook delivery: {exc}")
+            REVIEW_WEBHOOKS.inc(result="rejected")
+            return
+
+        for attempt in range(1, REVIEW_WEBHOOK_MAX_RETRIES + 1):
+            try:
+                response = await self.webhook_client.post(
+                    webhook_url, json=job, timeout=REVIEW_WEBHOOK_TIMEOUT
+                )
+                response.raise_for_status()
+                REVIEW_WEBHOOKS.inc(result="delivered")
+                return
+            except httpx.HTTPError as exc:
+                logger.warning(
+                    f"Webhook delivery to '{webhook_url}' failed "
+                    f"(attempt {attempt}): {exc}"
+                )
+                if attempt < REVIEW_WEBHOOK_MAX_RETRIES:
+                    await asyncio.sleep(attempt)
+
+        REVIEW_WEBHOOKS.inc(result="failed")
+
+    async def _keep_lease(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_ttl / 3)
+            try:
+                await self.queue.extend_lease(job_id)
+            except Exception as exc:
+                logger.warning(
+                    f"Failed to extend lease of review job {job_id}: '{exc}'"
+                )
+
+    async def process(self, job_id: str, request: dict[str, Any]) -> None:
+        logger.info(
+            f"Running review job {job_id} for '{request['github_repo_url']}'"
+        )
+        heartbeat = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            result = await self.service_factory().main(
+                request["github_repo_url"],
+                request["candidate_level"],
+                request["assignment_description"],
+            )
+            await self.queue.complete(job_id, result)
+        except HTTPException as exc:
+            await self.queue.fail(job_id, exc.status_code, exc.detail)
+        except Exception as exc:
+            logger.error(f"Review job {job_id} failed. Error: '{exc}'")
+            await self.queue.fail(job_id, 500, str(exc))
+        finally:
+            heartbeat.cancel()
+        await self.queue.ack(job_id)
+
+        if request.get("webhook_url"):
+            job = await self.queue.get(job_id)
+            if job is not None:
+                job.pop("request", None)
+                await self._notify(request["webhook_url"], job)
+
+    async def _run_loop(self) -> None:
+        while True:
+            try:
+                job = await self.queue.dequeue()
+                if job is not None:
+                    await self.process(*job)
+            except Exception as exc:
+                logger.error(f"Review worker loop failed. Error: '{exc}'")
+                await asyncio.sleep(self.ERROR_BACKOFF)
+
+    async def _requeue_loop(self) -> None:
+        while True:
+            try:
+                await self.queue.requeue_stale()
+            except Exception as exc:
+                logger.warning(f"Failed to requeue stale review jobs: '{exc}'")
+            await asyncio.sleep(self.queue.lease_ttl)
+
+    async def run(self) -> None:
+        logger.info(
+            f"Starting {self.concurrency} review workers "
+            f"on queue '{self.queue.queue}'"
+        )
+        await asyncio.gather(
+            self._requeue_loop(),
+            *(self._run_loop() for _ in range(self.concurrency)),
+        )
@@ -0,0 +1,185 @@
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+
+from app.services.cache_codec import CacheCodec, cache_codec
+from app.services.metrics import Counter
+from settings import (
+    setup_logger,
+    SINGLE_FLIGHT_LOCK_TTL,
+    SINGLE_FLIGHT_WAIT_TIMEOUT,
+)
+
+logger = setup_logger()
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "single_flight_calls_total",
+    "Review pipeline calls by single-flight role",
+)
+
+
+class SingleFlight:
+    KEY_PREFIX = "singleflight:"
+    RESULT_TTL = 60
+    LOCK_POLL_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        redis_client: Redis | None = None,
+        lock_ttl: int = SINGLE_FLIGHT_LOCK_TTL,
+        wait_timeout: float = SINGLE_FLIGHT_WAIT_TIMEOUT,
+        codec: CacheCodec | None = None,
+    ) -> None:
+        self.redis_client = redis_client
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.codec = codec or cache_codec
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(
+        self, key: str, produce: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        task = self._calls.get(key)
+        if task is not None:
+            SINGLE_FLIGHT_CALLS.inc(role="process_follower")
+            logger.info(f"Joining in-flight review '{key}'")
+            return await asyncio.shield(task)
+
+        task = asyncio.create_task(self._run(key, produce))
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(
+        self, key: str, produce: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        if self.redis_client is None:
+            SINGLE_FLIGHT_CALLS.inc(role="leader")
+            return await produce()
+
+        lock_key = f"{self.KEY_PREFIX}{key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis_client.set(
+                lock_key, token, nx=True, ex=self.lock_ttl
+            )
+        except Exception as exc:
+            logger.info(f"Failed to acquire single-flight lock: '{exc}'")
+            SINGLE_FLIGHT_CALLS.inc(role="leader")
+            return await produce()
+
+        if acquired:
+            return await self._lead(key, lock_key, token, produce)
+
+        result = await self._follow(key, lock_key)
+        if result is not None:
+            SINGLE_FLIGHT_CALLS.inc(role="redis_follower")
+            return self._unpack(result)
+
+        logger.info(f"No result for review '{key}' to wait for. Running it")
+        SINGLE_FLIGHT_CALLS.inc(role="leader")
+        return await produce()
+
+    async def _lead(
+        self,
+        key: str,
+        lock_key: str,
+        token: str,
+        produce: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        SINGLE_FLIGHT_CALLS.inc(role="leader")
+        try:
+            result = await produce()
+            await self._publish(key, {"status": "ok", "result": result})
+            return result
+        except HTTPException as exc:
+            await self._publish(
+                key,
+                {
+                    "status": "error",
+                    "status_code": exc.status_code,
+                    "detail": jsonable_encoder(exc.detail),
+                },
+            )
+            raise
+        except Exception as exc:
+            await self._publish(
+                key,
+                {"status": "error", "status_code": 500, "detail": str(exc)},
+            )
+            raise
+        finally:
+            try:
+                if await self.redis_client.get(lock_key) == token.encode():
+                    await self.redis_client.delete(lock_key)
+            except Exception as exc:
+                logger.info(f"Failed to release single-flight lock: '{exc}'")
+
+    async def _publish(self, key: str, message: dict[str, Any]) -> None:
+        try:
+            payload = self.codec.encode(message)
+            await self.redis_client.set(
+                f"{self.KEY_PREFIX}{key}:result", payload, ex=self.RESULT_TTL
+            )
+            await self.redis_client.publish(
+                f"{self.KEY_PREFIX}{key}:done", payload
+            )
+        except Exception as exc:
+            logger.info(f"Failed to publish single-flight result: '{exc}'")
+
+    async def _follow(
+        self, key: str, lock_key: str
+    ) -> dict[str, Any] | None:
+        logger.info(f"Waiting for review '{key}' from another worker")
+        result_key = f"{self.KEY_PREFIX}{key}:result"
+        pubsub = self.redis_client.pubsub()
+        try:
+            await pubsub.subscribe(f"{self.KEY_PREFIX}{key}:done")
+
+            stored = await self.redis_client.get(result_key)
+            if stored:
+                return self.codec.decode(stored)
+
+            deadline = time.monotonic() + self.wait_timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=min(remaining, self.LOCK_POLL_INTERVAL),
+                )
+                if message is not None:
+                    return self.codec.decode(message["data"])
+
+                if not await self.redis_client.exists(lock_key):
+                    stored = await self.redis_client.get(result_key)
+                    if stored:
+                        return self.codec.decode(stored)
+                    logger.info(
+                        f"Review '{key}' was released without a result"
+                    )
+                    return None
+        except Exception as exc:
+            logger.info(f"Failed to wait for single-flight result: '{exc}'")
+        finally:
+            await pubsub.aclose()
+
+        return None
+
+    @staticmethod
+    def _unpack(message: dict[str, Any]) -> dict[str, Any]:
+        if message["status"] == "error":
+            raise HTTPException(
+                status_code=message["status_code"], detail=message["detail"]
+            )
+        return message["result"]
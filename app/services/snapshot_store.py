@@ -0,0 +1,186 @@
+import asyncio
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any
+
+from app.services.metrics import Counter, Gauge
+from settings import (
+    setup_logger,
+    SNAPSHOT_STORE_DIR,
+    SNAPSHOT_STORE_MAX_BYTES,
+)
+
+logger = setup_logger()
+
+SNAPSHOT_REQUESTS = Counter(
+    "snapshot_store_requests_total",
+    "Repository snapshot lookups by result",
+)
+SNAPSHOT_BYTES = Gauge(
+    "snapshot_store_bytes",
+    "Size of the repository snapshots kept on disk",
+)
+SNAPSHOT_EVICTIONS = Counter(
+    "snapshot_store_evictions_total",
+    "Repository snapshots removed to stay under the size cap",
+)
+
+
+class SnapshotStore:
+    MAGIC = b"CRSNAP01"
+    HEADER = struct.Struct("<8sI")
+    SUFFIX = ".pack"
+
+    def __init__(
+        self,
+        root: str = SNAPSHOT_STORE_DIR,
+        max_bytes: int = SNAPSHOT_STORE_MAX_BYTES,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def build_key(owner: str, repo: str, commit_sha: str) -> str:
+        return f"{owner}/{repo}@{commit_sha}"
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, f"{digest}{self.SUFFIX}")
+
+    def _pack(
+        self, key: str, entries: list[tuple[str, str | None]], **meta: Any
+    ) -> list[bytes]:
+        index_entries = []
+        blobs = []
+        offset = 0
+        for path, content in entries:
+            if content is None:
+                index_entries.append([path, -1, 0])
+                continue
+
+            data = content.encode("utf-8")
+            index_entries.append([path, offset, len(data)])
+            blobs.append(data)
+            offset += len(data)
+
+        index = json.dumps(
+            {"key": key, "meta": meta, "entries": index_entries}
+        ).encode("utf-8")
+
+        return [self.HEADER.pack(self.MAGIC, len(index)), index, *blobs]
+
+    def _unpack(
+        self, key: str, packed: mmap.mmap
+    ) -> tuple[dict[str, Any], list[tuple[str, bytes | None]]]:
+        magic, index_size = self.HEADER.unpack_from(packed)
+        if magic != self.MAGIC:
+            raise ValueError("Unknown snapshot format")
+
+        start = self.HEADER.size
+        index = json.loads(packed[start:start + index_size])
+        if index["key"] != key:
+            raise ValueError(f"Snapshot belongs to {index['key']}")
+
+        data_start = start + index_size
+        entries = [
+            (
+                path,
+                None
+                if offset < 0
+                else packed[data_start + offset:data_start + offset + size],
+            )
+            for path, offset, size in index["entries"]
+        ]
+
+        return index["meta"], entries
+
+    def _read(
+        self, key: str
+    ) -> tuple[dict[str, Any], list[tuple[str, bytes | None]]] | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as snapshot_file:
+                with mmap.mmap(
+                    snapshot_file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as packed:
+                    snapshot = self._unpack(key, packed)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, struct.error) as exc:
+            logger.info(f"Discarding unreadable snapshot {path}: '{exc}'")
+            self._remove(path)
+            return None
+
+        return snapshot
+
+    def _write(
+        self, key: str, entries: list[tuple[str, str | None]], **meta: Any
+    ) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as snapshot_file:
+                snapshot_file.writelines(self._pack(key, entries, **meta))
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            self._remove(temp_path)
+            raise
+
+        self._collect_garbage()
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _collect_garbage(self) -> None:
+        with open(os.path.join(self.root, ".lock"), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+
+            snapshots = []
+            for entry in os.scandir(self.root):
+                if entry.name.endswith(self.SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    snapshots.append(
+                        (stat.st_mtime, stat.st_size, entry.path)
+                    )
+
+            size = sum(snapshot_size for _, snapshot_size, _ in snapshots)
+            for _, snapshot_size, path in sorted(snapshots):
+                if size <= self.max_bytes:
+                    break
+                self._remove(path)
+                size -= snapshot_size
+                SNAPSHOT_EVICTIONS.inc()
+
+            SNAPSHOT_BYTES.set(size)
+
+    async def get(
+        self, key: str
+    ) -> tuple[dict[str, Any], list[tuple[str, bytes | None]]] | None:
+        snapshot = await asyncio.to_thread(self._read, key)
+        SNAPSHOT_REQUESTS.inc(result="miss" if snapshot is None else "hit")
+
+        return snapshot
+
+    async def put(
+        self, key: str, entries: list[tuple[str, str | None]], **meta: Any
+    ) -> None:
+        try:
+            await asyncio.to_thread(self._write, key, entries, **meta)
+        except OSError as exc:
+            logger.info(f"Failed to store snapshot of {key}. Error: '{exc}'")
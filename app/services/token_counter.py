@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import tiktoken
+from fastapi import HTTPException, status
+
+from app.services.metrics import STAGE_DURATION
+from settings import OPENAI_MODEL, TOKEN_COUNT_CACHE_SIZE
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str = OPENAI_MODEL) -> tiktoken.Encoding:
+    return tiktoken.encoding_for_model(model)
+
+
+def count_tokens(text: str, model: str = OPENAI_MODEL) -> int:
+    return len(get_encoding(model).encode(text))
+
+
+class TokenCounter:
+    def __init__(
+        self,
+        model: str = OPENAI_MODEL,
+        max_entries: int = TOKEN_COUNT_CACHE_SIZE,
+    ) -> None:
+        self.model = model
+        self.max_entries = max_entries
+        self._counts: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, text: str, sha: str | None = None) -> int:
+        if sha is None:
+            return count_tokens(text, self.model)
+
+        with self._lock:
+            tokens = self._counts.get(sha)
+            if tokens is not None:
+                self._counts.move_to_end(sha)
+                return tokens
+
+        tokens = count_tokens(text, self.model)
+        with self._lock:
+            self._counts[sha] = tokens
+            if len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+        return tokens
+
+
+class TokenBudget:
+    def __init__(self, limit: int, counter: TokenCounter) -> None:
+        self.limit = limit
+        self.counter = counter
+        self.total = 0
+        self.files = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def add(self, content: str, sha: str | None = None) -> int:
+        with STAGE_DURATION.time(stage="file_token_count"):
+            tokens = self.counter.count(content, sha)
+
+        return self.add_counted(tokens)
+
+    def add_counted(self, tokens: int) -> int:
+        with self._lock:
+            self.total += tokens
+            self.files += 1
+            total = self.total
+
+        if total > self.limit:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Repository is too long: at least {total} "
+                f"tokens. Max tokens: {self.limit}",
+            )
+
+        return tokens
+
+
+token_counter = TokenCounter()
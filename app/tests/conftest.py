@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+
+def _to_bytes(value) -> bytes:
+    return value if isinstance(value, bytes) else str(value).encode()
+
+
+class FakePubSub:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.channels: list[str] = []
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.append(channel)
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        try:
+            data = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return {"type": "message", "data": data}
+
+    async def aclose(self) -> None:
+        for channel in self.channels:
+            self.redis.subscribers[channel].remove(self.queue)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.lists: dict[str, list[bytes]] = {}
+        self.subscribers: dict[str, list[asyncio.Queue]] = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = _to_bytes(value)
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def expire(self, key, ttl):
+        return True
+
+    async def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {_to_bytes(k): _to_bytes(v) for k, v in mapping.items()}
+        )
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, _to_bytes(value))
+
+    async def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(_to_bytes(value))
+
+    async def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    async def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if _to_bytes(value) in items:
+            items.remove(_to_bytes(value))
+            return 1
+        return 0
+
+    async def blmove(self, source, destination, timeout, src, dest):
+        await asyncio.sleep(0)
+        if not self.lists.get(source):
+            return None
+        value = self.lists[source].pop()
+        self.lists.setdefault(destination, []).insert(0, value)
+        return value
+
+    async def publish(self, channel, message):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait(_to_bytes(message))
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+
+@pytest.fixture
+def fake_redis() -> FakeRedis:
+    return FakeRedis()
@@ -0,0 +1,100 @@
+import base64
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.blob_cache import BlobCache
+from app.services.github_service import GitHubService
+
+
+@pytest.mark.asyncio
+async def test_get_returns_cached_content():
+    cache = BlobCache(max_bytes=100)
+    await cache.set("sha1", "print('hi')")
+
+    assert await cache.get("sha1") == "print('hi')"
+    assert await cache.get("sha2") is None
+    assert cache.hit_ratio == 0.5
+
+
+@pytest.mark.asyncio
+async def test_set_evicts_least_recently_used():
+    cache = BlobCache(max_bytes=10)
+    await cache.set("a", "aaaa")
+    await cache.set("b", "bbbb")
+    await cache.get("a")
+    await cache.set("c", "cccc")
+
+    assert await cache.get("a") == "aaaa"
+    assert await cache.get("b") is None
+    assert await cache.get("c") == "cccc"
+    assert cache.size == 8
+
+
+@pytest.mark.asyncio
+async def test_get_falls_back_to_redis():
+    redis_client = AsyncMock()
+    redis_client.get = AsyncMock(return_value=b"cached")
+    cache = BlobCache(redis_client=redis_client)
+
+    assert await cache.get("sha1") == "cached"
+    assert await cache.get("sha1") == "cached"
+    redis_client.get.assert_awaited_once_with("blob:sha1")
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_ignored():
+    redis_client = AsyncMock()
+    redis_client.get = AsyncMock(side_effect=ConnectionError("down"))
+    redis_client.set = AsyncMock(side_effect=ConnectionError("down"))
+    cache = BlobCache(redis_client=redis_client)
+
+    await cache.set("sha1", "content")
+    assert await cache.get("sha2") is None
+
+
+@pytest.mark.asyncio
+async def test_github_service_skips_fetch_for_cached_blob(mocker):
+    cache = BlobCache()
+    await cache.set("sha1", "print('hi')")
+    service = GitHubService(blob_cache=cache)
+    mock_request = mocker.patch.object(GitHubService, "_make_request")
+
+    result = await service._get_file_content(
+        {
+            "name": "main.py",
+            "type": "file",
+            "sha": "sha1",
+            "url": "https://api.github.com/repos/owner/repo/contents/main.py",
+        },
+        AsyncMock(),
+    )
+
+    assert (result.path, result.content) == ("main.py", "print('hi')")
+    mock_request.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_github_service_skips_binary_blob_in_contents_mode(mocker):
+    cache = BlobCache()
+    service = GitHubService(blob_cache=cache)
+    mocker.patch.object(
+        GitHubService,
+        "_make_request",
+        return_value={
+            "content": base64.b64encode(b"\x00\x01binary").decode()
+        },
+    )
+
+    result = await service._get_file_content(
+        {
+            "name": "data",
+            "type": "file",
+            "sha": "sha1",
+            "url": "https://api.github.com/repos/owner/repo/contents/data",
+        },
+        AsyncMock(),
+    )
+
+    assert result is None
+    assert await cache.get("sha1") is None
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from app.services import cache_codec as cache_codec_module
+from app.services.blob_cache import BlobCache
+from app.services.cache_codec import CacheCodec, CacheCodecError
+
+REVIEW = {"Found files": ["main.py"], "Rating": 7, "Conclusion": "Good"}
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack"])
+def test_round_trip(serializer):
+    codec = CacheCodec(serializer=serializer, compression="none")
+
+    encoded = codec.encode(REVIEW)
+
+    assert encoded.startswith(CacheCodec.MAGIC)
+    assert codec.decode(encoded) == REVIEW
+    assert codec.decode(codec.encode("print('привіт')")) == "print('привіт')"
+
+
+def test_compresses_only_above_threshold():
+    codec = CacheCodec(compression="zlib", compression_min_bytes=100)
+    large = {"content": "x = 1\n" * 1000}
+
+    small_entry = codec.encode(REVIEW)
+    large_entry = codec.encode(large)
+
+    assert small_entry[CacheCodec.HEADER.size - 1] == 0
+    assert large_entry[CacheCodec.HEADER.size - 1] == (
+        CacheCodec.COMPRESSION_IDS["zlib"]
+    )
+    assert len(large_entry) < len(json.dumps(large)) // 10
+    assert codec.decode(large_entry) == large
+
+
+def test_reads_entries_written_before_the_codec():
+    codec = CacheCodec()
+
+    assert codec.decode(json.dumps(REVIEW)) == REVIEW
+    assert codec.decode(b"print('hi')", legacy="text") == "print('hi')"
+
+
+def test_rejects_unknown_versions_and_garbage():
+    codec = CacheCodec(compression="none")
+    entry = bytearray(codec.encode(REVIEW))
+    entry[len(CacheCodec.MAGIC)] = CacheCodec.VERSION + 1
+
+    with pytest.raises(CacheCodecError):
+        codec.decode(bytes(entry))
+    with pytest.raises(CacheCodecError):
+        codec.decode(CacheCodec.MAGIC + b"\x01\x01\x01{not json")
+    with pytest.raises(CacheCodecError):
+        codec.decode(b"not json")
+
+
+def test_falls_back_when_package_is_missing(monkeypatch):
+    monkeypatch.setitem(cache_codec_module.PACKAGES, "zstd", None)
+    monkeypatch.setitem(cache_codec_module.PACKAGES, "msgpack", None)
+
+    codec = CacheCodec(serializer="msgpack", compression="zstd")
+
+    assert (codec.serializer, codec.compression) == ("json", "zlib")
+    with pytest.raises(ValueError):
+        CacheCodec(compression="brotli")
+
+
+@pytest.mark.asyncio
+async def test_blob_cache_stores_encoded_blobs(fake_redis):
+    codec = CacheCodec(compression="zlib", compression_min_bytes=10)
+    content = "def main():\n    pass\n" * 100
+
+    await BlobCache(redis_client=fake_redis, codec=codec).set("sha", content)
+
+    assert len(fake_redis.data["blob:sha"]) < len(content)
+    assert await BlobCache(
+        redis_client=fake_redis, codec=codec
+    ).get("sha") == content
@@ -0,0 +1,55 @@
+from app.services.file_filter import FileFilter
+
+
+def test_is_relevant_file_skips_excluded_paths():
+    file_filter = FileFilter(max_file_size=1000)
+
+    assert file_filter.is_relevant_file("src/main.py", 100)
+    assert not file_filter.is_relevant_file("node_modules/lib/index.js", 10)
+    assert not file_filter.is_relevant_file("poetry.lock", 10)
+    assert not file_filter.is_relevant_file("static/logo.png", 10)
+    assert not file_filter.is_relevant_file("static/app.min.js", 10)
+    assert not file_filter.is_relevant_file("src/data.py", 1001)
+
+
+def test_is_excluded_dir():
+    file_filter = FileFilter()
+
+    assert file_filter.is_excluded_dir("frontend/node_modules")
+    assert file_filter.is_excluded_dir("vendor")
+    assert not file_filter.is_excluded_dir("src/vendors")
+
+
+def test_disabled_filter_keeps_everything():
+    file_filter = FileFilter(enabled=False)
+
+    assert file_filter.is_relevant_file("node_modules/lib/index.js", 10**9)
+    assert not file_filter.is_excluded_dir("node_modules")
+
+
+def test_rank_prefers_files_matching_description():
+    files = [
+        {"path": "docs/notes.txt"},
+        {"path": "app/tests/test_views.py"},
+        {"path": "app/payments/stripe_client.py"},
+        {"path": "README.md"},
+    ]
+
+    ranked = FileFilter().rank(files, "Integrate Stripe payments")
+
+    assert ranked[0]["path"] == "app/payments/stripe_client.py"
+    assert ranked[-1]["path"] == "docs/notes.txt"
+
+
+def test_select_keeps_files_within_token_limit():
+    files = [
+        {"path": "a.py", "size": 400},
+        {"path": "b.py", "size": 800},
+        {"path": "c.py", "size": 200},
+    ]
+
+    selected, skipped = FileFilter().select(files, 160)
+
+    assert [item["path"] for item in selected] == ["a.py", "c.py"]
+    assert [item["path"] for item in skipped] == ["b.py"]
+    assert FileFilter().select(files, None) == (files, [])
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from email.utils import formatdate
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+
+from app.services.github_scheduler import (
+    GitHubFetchScheduler,
+    QUEUE_DEPTH,
+    RATE_LIMITED_RESPONSES,
+)
+from app.services.github_service import GitHubService
+from app.services.metrics import REGISTRY
+
+
+@pytest.mark.asyncio
+async def test_slot_limits_concurrency():
+    scheduler = GitHubFetchScheduler(max_concurrency=3)
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fetch():
+        nonlocal in_flight, max_in_flight
+        async with scheduler.slot():
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(fetch() for _ in range(10)))
+
+    assert max_in_flight == 3
+    assert QUEUE_DEPTH.get() == 0
+
+
+def test_retry_delay_uses_retry_after():
+    scheduler = GitHubFetchScheduler()
+    response = httpx.Response(429, headers={"Retry-After": "7"})
+
+    assert scheduler.retry_delay(response) == 7.0
+
+
+def test_retry_delay_accepts_http_date_retry_after():
+    scheduler = GitHubFetchScheduler()
+    response = httpx.Response(
+        429, headers={"Retry-After": formatdate(time.time() + 30, usegmt=True)}
+    )
+
+    assert 28 <= scheduler.retry_delay(response) <= 30
+
+
+def test_retry_delay_waits_for_reset_when_exhausted():
+    scheduler = GitHubFetchScheduler()
+    response = httpx.Response(
+        403,
+        headers={
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": str(int(time.time()) + 30),
+        },
+    )
+
+    assert 29 <= scheduler.retry_delay(response) <= 32
+
+
+def test_retry_delay_ignores_permission_errors():
+    scheduler = GitHubFetchScheduler()
+    response = httpx.Response(403, text="Resource not accessible")
+
+    assert scheduler.retry_delay(response) is None
+
+
+def test_update_from_headers_paces_requests():
+    scheduler = GitHubFetchScheduler(pacing_threshold=10, max_wait=60)
+    scheduler.update_from_headers(
+        httpx.Headers(
+            {
+                "X-RateLimit-Remaining": "5",
+                "X-RateLimit-Reset": str(time.time() + 10),
+            }
+        )
+    )
+
+    assert scheduler.rate_limit_remaining == 5
+    assert 1.5 <= scheduler._pacing_interval <= 2.0
+
+
+@pytest.mark.asyncio
+async def test_make_request_retries_rate_limited_response():
+    url = "https://api.github.com/repos/owner/repo/contents"
+    rate_limited_before = RATE_LIMITED_RESPONSES.get(status_code="429")
+
+    client = AsyncMock()
+    client.get = AsyncMock(
+        side_effect=[
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json=[{"name": "main.py"}]),
+        ]
+    )
+
+    result = await GitHubService._make_request(url, client)
+
+    assert result == [{"name": "main.py"}]
+    assert client.get.await_count == 2
+    assert (
+        RATE_LIMITED_RESPONSES.get(status_code="429")
+        == rate_limited_before + 1
+    )
+
+
+def test_metrics_render_scheduler_state():
+    rendered = REGISTRY.render()
+
+    assert "# TYPE github_scheduler_queue_depth gauge" in rendered
+    assert "github_rate_limited_responses_total" in rendered
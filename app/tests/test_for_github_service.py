@@ -1,12 +1,31 @@
+import base64
+import io
+import tarfile
 from unittest.mock import AsyncMock, patch
 
 import fastapi
 import pytest
 from fastapi import HTTPException
+import httpx
 from httpx import AsyncClient
 from pydantic_core import Url
 
 from app.services.github_service import GitHubService
+from app.services.metrics import STAGE_DURATION
+from app.services.repo_model import RepoFile, Repository
+from app.services.resilience import CircuitBreaker, RetryPolicy
+from app.services.snapshot_store import SnapshotStore
+
+
+def files(repository: Repository) -> list[tuple[str, str]]:
+    return [(file.path, file.content) for file in repository]
+
+
+@pytest.fixture
+def head_commit(mocker):
+    return mocker.patch.object(
+        GitHubService, "_resolve_head_commit", return_value="abc123"
+    )
 
 
 @pytest.mark.asyncio
@@ -58,7 +77,9 @@ async def test_make_request_not_found():
 
     async with AsyncMock() as client:
         client.get = AsyncMock(
-            return_value=AsyncMock(status_code=404, text="Not Found")
+            return_value=httpx.Response(
+                404, text="Not Found", request=httpx.Request("GET", url)
+            )
         )
 
         with pytest.raises(HTTPException) as exc:
@@ -66,6 +87,25 @@ async def test_make_request_not_found():
         assert exc.value.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_make_request_forbidden_keeps_message():
+    url = "https://api.github.com/repos/owner/repo/contents"
+
+    async with AsyncMock() as client:
+        client.get = AsyncMock(
+            return_value=httpx.Response(
+                403,
+                text="Resource not accessible",
+                request=httpx.Request("GET", url),
+            )
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            await GitHubService._make_request(url, client)
+        assert exc.value.status_code == 403
+        assert exc.value.detail == "Resource not accessible"
+
+
 @pytest.mark.asyncio
 async def test_fetch_repo_contents(mocker):
     response_data = [
@@ -90,7 +130,7 @@ async def test_fetch_repo_contents(mocker):
 
 
 @pytest.mark.asyncio
-async def test_main():
+async def test_main(head_commit):
     url = "https://github.com/owner/repo"
     service = GitHubService()
 
@@ -117,9 +157,368 @@ async def test_main():
 
     with (
         mock_validate_url
-    ), mock_get_owner_repo, mock_fetch_contents, mock_receive_data:
+    ), mock_get_owner_repo, mock_fetch_contents as fetch_contents, (
+        mock_receive_data
+    ):
         result = await service.main(url)
 
+    assert fetch_contents.call_args.args[3] == "abc123"
     assert len(result) == 1
     assert result[0]["name"] == "file.txt"
     assert result[0]["content"] == "Hello World!"
+
+
+def test_init_invalid_fetch_mode():
+    with pytest.raises(ValueError):
+        GitHubService(fetch_mode="zipball")
+
+
+def test_extract_repo_archive():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name in ("owner-repo-abc123", "owner-repo-abc123/src"):
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.DIRTYPE
+            tar.addfile(info)
+        data = b"print('hi')"
+        info = tarfile.TarInfo("owner-repo-abc123/src/main.py")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+
+    result = GitHubService()._extract_repo_archive(buffer.getvalue())
+
+    assert files(result) == [("src/main.py", "print('hi')")]
+    assert result.directories == ["src"]
+
+
+def test_extract_repo_archive_skips_irrelevant_files():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, data in (
+            ("owner-repo-abc123/main.py", b"print('hi')"),
+            ("owner-repo-abc123/logo.bin", b"\x89PNG\0\0"),
+            ("owner-repo-abc123/node_modules/lib.js", b"module"),
+            ("owner-repo-abc123/poetry.lock", b"[[package]]"),
+        ):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+    result = GitHubService()._extract_repo_archive(buffer.getvalue())
+
+    assert files(result) == [("main.py", "print('hi')")]
+
+
+@pytest.mark.asyncio
+async def test_receive_repo_tree_skips_excluded_paths(mocker):
+    tree_data = {
+        "tree": [
+            {"path": "node_modules", "type": "tree"},
+            {
+                "path": "node_modules/lib.js",
+                "type": "blob",
+                "size": 10,
+                "url": "https://api.github.com/blobs/1",
+            },
+            {
+                "path": "logo.png",
+                "type": "blob",
+                "size": 10,
+                "url": "https://api.github.com/blobs/2",
+            },
+            {
+                "path": "main.py",
+                "type": "blob",
+                "size": 10,
+                "url": "https://api.github.com/blobs/3",
+            },
+        ],
+    }
+    mock_request = mocker.patch.object(
+        GitHubService,
+        "_make_request",
+        return_value={"content": base64.b64encode(b"print('hi')").decode()},
+    )
+
+    result = await GitHubService()._receive_repo_tree(tree_data, AsyncMock())
+
+    assert files(result) == [("main.py", "print('hi')")]
+    mock_request.assert_called_once_with(
+        "https://api.github.com/blobs/3", mocker.ANY
+    )
+
+
+@pytest.mark.asyncio
+async def test_main_tree_mode(mocker, head_commit):
+    service = GitHubService(fetch_mode="tree")
+    tree_data = {
+        "truncated": False,
+        "tree": [
+            {"path": "src", "type": "tree", "mode": "040000"},
+            {
+                "path": "src/main.py",
+                "type": "blob",
+                "mode": "100644",
+                "url": "https://api.github.com/blobs/1",
+            },
+            {
+                "path": "link",
+                "type": "blob",
+                "mode": "120000",
+                "url": "https://api.github.com/blobs/2",
+            },
+        ],
+    }
+    mock_request = mocker.patch.object(
+        GitHubService,
+        "_make_request",
+        side_effect=[
+            tree_data,
+            {"content": base64.b64encode(b"print('hi')").decode()},
+        ],
+    )
+
+    result = await service.main("https://github.com/owner/repo")
+
+    assert files(result) == [("src/main.py", "print('hi')")]
+    assert result.directories == ["src"]
+    assert mock_request.call_count == 2
+    assert mock_request.call_args_list[0].args[0] == (
+        "https://api.github.com/repos/owner/repo/git/trees/abc123"
+        "?recursive=1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_main_reuses_shared_client(mocker, head_commit):
+    mock_fetch = mocker.patch.object(
+        GitHubService, "_fetch_repo", return_value=[]
+    )
+
+    async with AsyncClient() as client:
+        service = GitHubService(client=client)
+        await service.main("https://github.com/owner/repo")
+        await service.main("https://github.com/owner/repo")
+
+        assert not client.is_closed
+        assert all(
+            call.args[2] is client for call in mock_fetch.call_args_list
+        )
+
+
+@pytest.mark.asyncio
+async def test_make_request_serves_not_modified_from_store():
+    url = "https://api.github.com/repos/owner/etag-repo/contents"
+    listing = [{"name": "main.py", "type": "file"}]
+
+    client = AsyncMock()
+    client.get = AsyncMock(
+        side_effect=[
+            httpx.Response(200, json=listing, headers={"ETag": '"abc"'}),
+            httpx.Response(304, headers={"ETag": '"abc"'}),
+        ]
+    )
+
+    first = await GitHubService._make_request(url, client, conditional=True)
+    second = await GitHubService._make_request(url, client, conditional=True)
+
+    assert first == second == listing
+    first_headers = client.get.call_args_list[0].kwargs["headers"]
+    assert "If-None-Match" not in first_headers
+    assert (
+        client.get.call_args_list[1].kwargs["headers"]["If-None-Match"]
+        == '"abc"'
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_head_commit():
+    client = AsyncMock()
+    client.get = AsyncMock(return_value=httpx.Response(200, text="abc123\n"))
+    service = GitHubService(client=client)
+
+    result = await service.get_head_commit("https://github.com/owner/repo")
+
+    assert result == ("owner", "repo", "abc123")
+    assert client.get.call_args.kwargs["headers"]["Accept"] == (
+        "application/vnd.github.sha"
+    )
+
+
+@pytest.mark.asyncio
+async def test_main_records_stage_durations(mocker, head_commit):
+    mocker.patch.object(
+        GitHubService, "_make_request", return_value={"tree": []}
+    )
+    before = {
+        stage: STAGE_DURATION.count(stage=stage)
+        for stage in ("validate_url", "tree_fetch", "github_fetch")
+    }
+
+    await GitHubService(fetch_mode="tree").main(
+        "https://github.com/owner/repo"
+    )
+
+    assert all(
+        STAGE_DURATION.count(stage=stage) == count + 1
+        for stage, count in before.items()
+    )
+
+
+@pytest.mark.asyncio
+async def test_make_request_retries_transient_errors(mocker):
+    url = "https://api.github.com/repos/owner/repo/contents"
+    mocker.patch(
+        "app.services.github_service.github_retry_policy",
+        RetryPolicy(max_retries=3, base_delay=0, max_delay=0, deadline=10),
+    )
+    mocker.patch(
+        "app.services.github_service.github_circuit_breaker",
+        CircuitBreaker("github-test"),
+    )
+    client = AsyncMock()
+    client.get = AsyncMock(
+        side_effect=[
+            httpx.ConnectTimeout("timeout"),
+            httpx.Response(503, headers={"Retry-After": "0"}),
+            httpx.Response(200, json=[{"name": "main.py"}]),
+        ]
+    )
+
+    result = await GitHubService._make_request(url, client)
+
+    assert result == [{"name": "main.py"}]
+    assert client.get.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_make_request_fails_fast_when_circuit_open(mocker):
+    breaker = CircuitBreaker(
+        "github-test", failure_threshold=1, recovery_timeout=60
+    )
+    breaker.record_failure()
+    mocker.patch(
+        "app.services.github_service.github_circuit_breaker", breaker
+    )
+    client = AsyncMock()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await GitHubService._make_request(
+            "https://api.github.com/repos/owner/repo/contents", client
+        )
+
+    assert exc_info.value.status_code == 503
+    client.get.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_main_reuses_repo_snapshot(mocker, tmp_path):
+    mocker.patch.object(
+        GitHubService,
+        "_send_request",
+        return_value=httpx.Response(200, text="abc123"),
+    )
+    mock_fetch = mocker.patch.object(
+        GitHubService,
+        "_fetch_repo",
+        return_value=Repository(
+            [RepoFile("src/main.py", "print('hi')")], ["src"]
+        ),
+    )
+    store = SnapshotStore(root=str(tmp_path))
+
+    first = await GitHubService(snapshot_store=store).main(
+        "https://github.com/owner/repo"
+    )
+    second = await GitHubService(snapshot_store=store).main(
+        "https://github.com/owner/repo"
+    )
+
+    assert files(first) == files(second) == [("src/main.py", "print('hi')")]
+    assert first.directories == second.directories == ["src"]
+    assert mock_fetch.call_count == 1
+    meta, entries = await store.get("owner/repo@abc123")
+    assert entries == [("src", None), ("src/main.py", b"print('hi')")]
+
+
+@pytest.mark.asyncio
+async def test_fetch_changes_fetches_only_changed_files(mocker):
+    mocker.patch.object(
+        GitHubService,
+        "_send_request",
+        return_value=httpx.Response(200, text="new"),
+    )
+    mock_request = mocker.patch.object(
+        GitHubService,
+        "_make_request",
+        side_effect=[
+            {
+                "status": "ahead",
+                "files": [
+                    {"filename": "src/app.py", "status": "modified",
+                     "sha": "1"},
+                    {"filename": "logo.png", "status": "added", "sha": "2"},
+                    {"filename": "old.py", "status": "removed", "sha": "3"},
+                    {"filename": "new.py", "status": "renamed", "sha": "4",
+                     "previous_filename": "util.py"},
+                ],
+            },
+            {"content": base64.b64encode(b"print('app')").decode()},
+            {"content": base64.b64encode(b"print('new')").decode()},
+        ],
+    )
+
+    repo_data, removed = await GitHubService().fetch_changes(
+        "https://github.com/owner/repo", "old"
+    )
+
+    assert files(repo_data) == [
+        ("new.py", "print('new')"),
+        ("src/app.py", "print('app')"),
+    ]
+    assert removed == ["util.py", "old.py"]
+    assert mock_request.call_args_list[0].args[0] == (
+        "https://api.github.com/repos/owner/repo/compare/old...new"
+    )
+    assert mock_request.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_changes_gives_up_on_diverged_history(mocker):
+    mocker.patch.object(
+        GitHubService,
+        "_send_request",
+        return_value=httpx.Response(200, text="new"),
+    )
+    mocker.patch.object(
+        GitHubService,
+        "_make_request",
+        return_value={"status": "diverged", "files": []},
+    )
+
+    assert await GitHubService().fetch_changes(
+        "https://github.com/owner/repo", "old"
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_main_tarball_mode_downloads_resolved_commit(mocker):
+    mocker.patch.object(
+        GitHubService, "_resolve_head_commit", return_value="abc123"
+    )
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz"):
+        pass
+    mock_send = mocker.patch.object(
+        GitHubService,
+        "_send_request",
+        return_value=httpx.Response(200, content=archive.getvalue()),
+    )
+
+    await GitHubService(fetch_mode="tarball").main(
+        "https://github.com/owner/repo"
+    )
+
+    assert mock_send.call_args.args[0] == (
+        "https://api.github.com/repos/owner/repo/tarball/abc123"
+    )
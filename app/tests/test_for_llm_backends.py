@@ -0,0 +1,119 @@
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+from openai import APITimeoutError, RateLimitError
+
+from app.services.llm_backends import (
+    LLMTimeoutError,
+    LLMUnavailableError,
+    OpenAIBackend,
+    StubBackend,
+    create_llm_backend,
+)
+
+MESSAGES = [{"role": "user", "content": "File: a.py\nContent:\nprint()"}]
+
+
+class FakeStream:
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for part in self.parts:
+            yield SimpleNamespace(
+                choices=[SimpleNamespace(delta=SimpleNamespace(content=part))]
+            )
+
+
+def make_openai_backend(**create_kwargs):
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(**create_kwargs)
+    return OpenAIBackend(client=client)
+
+
+@pytest.mark.asyncio
+async def test_openai_backend_complete():
+    backend = make_openai_backend(
+        return_value=SimpleNamespace(
+            choices=[
+                SimpleNamespace(message=SimpleNamespace(content="{}"))
+            ]
+        )
+    )
+
+    assert await backend.complete(MESSAGES) == "{}"
+
+
+@pytest.mark.asyncio
+async def test_openai_backend_stream_skips_empty_deltas():
+    backend = make_openai_backend(
+        return_value=FakeStream(['{"Rating": ', None, "7}"])
+    )
+
+    parts = [part async for part in backend.stream(MESSAGES)]
+
+    assert parts == ['{"Rating": ', "7}"]
+    create = backend.client.chat.completions.create
+    assert create.await_args.kwargs["stream"] is True
+
+
+@pytest.mark.asyncio
+async def test_openai_backend_maps_errors():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat")
+
+    backend = make_openai_backend(side_effect=APITimeoutError(request))
+    with pytest.raises(LLMTimeoutError):
+        await backend.complete(MESSAGES)
+
+    backend = make_openai_backend(
+        side_effect=RateLimitError(
+            "Rate limited",
+            response=httpx.Response(429, request=request),
+            body=None,
+        )
+    )
+    with pytest.raises(LLMUnavailableError):
+        await backend.complete(MESSAGES)
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_is_deterministic():
+    backend = StubBackend(latency=0, tokens_per_second=0, response_tokens=50)
+
+    first = await backend.complete(MESSAGES)
+    streamed = "".join([part async for part in backend.stream(MESSAGES)])
+
+    assert first == streamed == await backend.complete(MESSAGES)
+    assert len(first) >= 50 * StubBackend.CHARS_PER_TOKEN
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_simulates_latency_and_throughput():
+    backend = StubBackend(
+        latency=0.05, tokens_per_second=1000, response_tokens=50
+    )
+
+    start = time.perf_counter()
+    await backend.complete(MESSAGES)
+
+    assert time.perf_counter() - start >= 0.05 + 50 / 1000
+
+
+@pytest.mark.asyncio
+async def test_stub_backend_simulates_errors():
+    backend = StubBackend(latency=0, error_rate=1)
+
+    with pytest.raises(LLMUnavailableError):
+        await backend.complete(MESSAGES)
+
+
+def test_create_llm_backend():
+    assert isinstance(create_llm_backend("stub"), StubBackend)
+    with pytest.raises(ValueError):
+        create_llm_backend("unknown")
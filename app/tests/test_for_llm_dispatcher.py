@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import fastapi
+import pytest
+
+from app.services.llm_backends import StubBackend
+from app.services.llm_dispatcher import LLMDispatcher, LLMQueueTimeoutError
+from app.services.openai_services import OpenAIService
+
+
+@pytest.mark.asyncio
+async def test_queues_requests_over_the_token_budget():
+    dispatcher = LLMDispatcher(tokens_per_minute=6000, requests_per_minute=0)
+
+    start = time.monotonic()
+    await dispatcher.acquire(6000)
+    admitted = time.monotonic() - start
+    await dispatcher.acquire(10)
+    queued = time.monotonic() - start
+
+    assert admitted < 0.05
+    assert 0.05 < queued < 0.5
+
+
+@pytest.mark.asyncio
+async def test_limits_requests_per_minute():
+    dispatcher = LLMDispatcher(tokens_per_minute=0, requests_per_minute=600)
+    dispatcher._requests = 1
+
+    start = time.monotonic()
+    await dispatcher.acquire(1)
+    await dispatcher.acquire(1)
+
+    assert 0.05 < time.monotonic() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_admits_interactive_requests_before_batch():
+    dispatcher = LLMDispatcher(tokens_per_minute=60000, requests_per_minute=0)
+    dispatcher._tokens = 0
+    admitted = []
+
+    async def request(name: str, priority: str) -> None:
+        await dispatcher.acquire(100, priority)
+        admitted.append(name)
+
+    batch = [
+        asyncio.create_task(request(f"batch{index}", "batch"))
+        for index in range(3)
+    ]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(request("interactive", "interactive"))
+    await asyncio.gather(*batch, interactive)
+
+    assert admitted == ["interactive", "batch0", "batch1", "batch2"]
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_wait_and_keeps_dispatching():
+    dispatcher = LLMDispatcher(
+        tokens_per_minute=600, requests_per_minute=0, max_wait=0.05
+    )
+    dispatcher._tokens = 0
+
+    with pytest.raises(LLMQueueTimeoutError):
+        await dispatcher.acquire(600)
+
+    dispatcher._tokens = 600
+    await asyncio.wait_for(dispatcher.acquire(10), 0.5)
+    assert dispatcher._queue == []
+
+
+@pytest.mark.asyncio
+async def test_pause_delays_admission():
+    dispatcher = LLMDispatcher(tokens_per_minute=6000, requests_per_minute=0)
+    dispatcher.pause(0.1)
+
+    start = time.monotonic()
+    await dispatcher.acquire(1)
+
+    assert time.monotonic() - start >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_request_review_returns_busy_when_queue_wait_is_too_long():
+    dispatcher = LLMDispatcher(
+        tokens_per_minute=600, requests_per_minute=0, max_wait=0.01
+    )
+    dispatcher._tokens = 0
+    service = OpenAIService(
+        backend=StubBackend(latency=0), dispatcher=dispatcher
+    )
+
+    with pytest.raises(fastapi.HTTPException) as exc_info:
+        await service._request_review("Review this", "repo")
+
+    assert exc_info.value.status_code == 503
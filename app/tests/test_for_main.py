@@ -1,8 +1,29 @@
+import json
+
 import pytest
 from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
 from unittest.mock import AsyncMock, patch
-from main import app, ReviewRequest
+from main import (
+    app,
+    blob_cache,
+    chunk_review_cache,
+    model_router,
+    review_history,
+    snapshot_store,
+    ReviewRequest,
+)
+
+
+@pytest.fixture(autouse=True)
+def review_cache_key():
+    with patch(
+        "app.services.manage_api_service.ManageAPIService"
+        ".get_review_cache_key",
+        new_callable=AsyncMock,
+        return_value="review:owner/repo@abc:junior:gpt-4-turbo:hash",
+    ) as mock_key:
+        yield mock_key
 
 
 @pytest.fixture
@@ -75,3 +96,357 @@ async def test_review_general_exception(client):
 
         assert response.status_code == 500
         assert response.json() == {"detail": "An unexpected error occurred"}
+
+
+def test_lifespan_shares_github_client():
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "http://github.com/owner/repo",
+        "candidate_level": "junior",
+    }
+
+    with TestClient(app) as client, patch(
+        "main.ManageAPIService"
+    ) as mock_service:
+        mock_service.return_value.main = AsyncMock(return_value={})
+        mock_service.return_value.get_review_cache_key = AsyncMock(
+            return_value=None
+        )
+
+        client.post("/review", json=request_data)
+        client.post("/review", json=request_data)
+
+        github_client = app.state.github_client
+        assert mock_service.call_count == 2
+        assert all(
+            call.args
+            == (
+                github_client,
+                blob_cache,
+                chunk_review_cache,
+                model_router,
+                snapshot_store,
+                review_history,
+            )
+            for call in mock_service.call_args_list
+        )
+
+
+def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "github_scheduler_queue_depth" in response.text
+
+
+def test_review_returns_cached_result(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "http://github.com/owner/repo",
+        "candidate_level": "junior",
+    }
+
+    with patch(
+        "main.review_cache.get",
+        new_callable=AsyncMock,
+        return_value=({"result": "cached"}, False),
+    ), patch(
+        "app.services.manage_api_service.ManageAPIService.main",
+        new_callable=AsyncMock,
+    ) as mock_main:
+        response = client.post("/review", json=request_data)
+
+        assert response.json() == {"result": "cached"}
+        mock_main.assert_not_awaited()
+
+
+def test_review_refreshes_stale_result(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "http://github.com/owner/repo",
+        "candidate_level": "junior",
+    }
+
+    with patch(
+        "main.review_cache.get",
+        new_callable=AsyncMock,
+        return_value=({"result": "stale"}, True),
+    ), patch(
+        "main.review_cache.refresh_in_background"
+    ) as mock_refresh:
+        response = client.post("/review", json=request_data)
+
+        assert response.json() == {"result": "stale"}
+        mock_refresh.assert_called_once()
+        assert mock_refresh.call_args.args[0] == (
+            "review:owner/repo@abc:junior:gpt-4-turbo:hash"
+        )
+
+
+def test_create_review_job(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "http://github.com/owner/repo",
+        "candidate_level": "junior",
+        "webhook_url": "https://example.com/hook",
+    }
+
+    with patch(
+        "main.review_job_queue.enqueue",
+        new_callable=AsyncMock,
+        return_value="job-1",
+    ) as mock_enqueue, patch(
+        "main.validate_webhook_url", new_callable=AsyncMock
+    ):
+        response = client.post("/reviews", json=request_data)
+
+        assert response.status_code == 202
+        assert response.json() == {"job_id": "job-1", "status": "queued"}
+        mock_enqueue.assert_awaited_once_with(request_data)
+
+
+@pytest.mark.parametrize(
+    "webhook_url, status_code",
+    [
+        ("file:///etc/passwd", 422),
+        ("http://redis:6379", 400),
+        ("http://169.254.169.254/latest/meta-data", 400),
+    ],
+)
+def test_create_review_job_rejects_internal_webhook(
+    client, webhook_url, status_code
+):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "http://github.com/owner/repo",
+        "candidate_level": "junior",
+        "webhook_url": webhook_url,
+    }
+
+    with patch(
+        "main.review_job_queue.enqueue", new_callable=AsyncMock
+    ) as mock_enqueue:
+        response = client.post("/reviews", json=request_data)
+
+        assert response.status_code == status_code
+        mock_enqueue.assert_not_awaited()
+
+
+def test_get_review_job(client):
+    job = {
+        "job_id": "job-1",
+        "status": "completed",
+        "request": {},
+        "result": {"Rating": 7},
+    }
+
+    with patch(
+        "main.review_job_queue.get", new_callable=AsyncMock, return_value=job
+    ):
+        response = client.get("/reviews/job-1")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "job_id": "job-1",
+            "status": "completed",
+            "result": {"Rating": 7},
+        }
+
+
+def test_get_review_job_not_found(client):
+    with patch(
+        "main.review_job_queue.get", new_callable=AsyncMock, return_value=None
+    ):
+        response = client.get("/reviews/missing")
+
+        assert response.status_code == 404
+
+
+def test_review_stream(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "http://github.com/owner/repo",
+        "candidate_level": "junior",
+    }
+
+    async def stream(*args):
+        yield "files_fetched", {"files": 1, "tokens": 10, "done": True}
+        yield "review", {"Rating": 7}
+        raise HTTPException(status_code=503, detail="Unavailable")
+
+    with patch(
+        "app.services.manage_api_service.ManageAPIService.stream",
+        side_effect=stream,
+    ):
+        response = client.post("/review/stream", json=request_data)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.split("\n\n")[:-1] == [
+        'event: started\ndata: {"repo_url": "http://github.com/owner/repo"}',
+        'event: files_fetched\n'
+        'data: {"files": 1, "tokens": 10, "done": true}',
+        'event: review\ndata: {"Rating": 7}',
+        'event: error\n'
+        'data: {"status_code": 503, "detail": "Unavailable"}',
+    ]
+
+
+def test_review_stream_encodes_non_string_error_detail(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "http://github.com/owner/private",
+        "candidate_level": "junior",
+    }
+
+    async def stream(*args):
+        raise HTTPException(status_code=403, detail={"Forbidden"})
+        yield
+
+    with patch(
+        "app.services.manage_api_service.ManageAPIService.stream",
+        side_effect=stream,
+    ):
+        response = client.post("/review/stream", json=request_data)
+
+    assert response.text.split("\n\n")[-2] == (
+        'event: error\ndata: {"status_code": 403, "detail": ["Forbidden"]}'
+    )
+
+
+def test_review_batch_streams_results(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "submissions": [
+            {
+                "github_repo_url": "http://github.com/owner/first",
+                "candidate_level": "junior",
+            },
+            {
+                "github_repo_url": "http://github.com/owner/second",
+                "candidate_level": "senior",
+            },
+        ],
+    }
+
+    async def review(repo_url, candidate_level, assignment_description):
+        if repo_url.endswith("second"):
+            raise HTTPException(status_code=404, detail="Not found")
+        return {"Rating": 7}
+
+    async def run_produce(key, produce):
+        return await produce()
+
+    with patch(
+        "main.review_cache.get", new_callable=AsyncMock, return_value=None
+    ), patch("main.review_cache.set", new_callable=AsyncMock), patch(
+        "app.services.manage_api_service.ManageAPIService.main",
+        side_effect=review,
+    ), patch("main.review_single_flight.do", side_effect=run_produce):
+        response = client.post("/review/batch", json=request_data)
+
+    assert response.status_code == 200
+    lines = sorted(
+        (json.loads(line) for line in response.text.splitlines()),
+        key=lambda line: line["index"],
+    )
+    assert lines == [
+        {
+            "index": 0,
+            "github_repo_url": "http://github.com/owner/first",
+            "review": {"Rating": 7},
+            "status": "completed",
+        },
+        {
+            "index": 1,
+            "github_repo_url": "http://github.com/owner/second",
+            "status": "failed",
+            "error": {"status_code": 404, "detail": "Not found"},
+        },
+    ]
+
+
+def test_review_batch_encodes_non_string_error_detail(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "submissions": [
+            {
+                "github_repo_url": "http://github.com/owner/first",
+                "candidate_level": "junior",
+            },
+            {
+                "github_repo_url": "http://github.com/owner/private",
+                "candidate_level": "junior",
+            },
+        ],
+    }
+
+    async def review(repo_url, candidate_level, assignment_description):
+        if repo_url.endswith("private"):
+            raise HTTPException(status_code=403, detail={"Forbidden"})
+        return {"Rating": 7}
+
+    async def run_produce(key, produce):
+        return await produce()
+
+    with patch(
+        "main.review_cache.get", new_callable=AsyncMock, return_value=None
+    ), patch("main.review_cache.set", new_callable=AsyncMock), patch(
+        "app.services.manage_api_service.ManageAPIService.main",
+        side_effect=review,
+    ), patch("main.review_single_flight.do", side_effect=run_produce):
+        response = client.post("/review/batch", json=request_data)
+
+    lines = sorted(
+        (json.loads(line) for line in response.text.splitlines()),
+        key=lambda line: line["index"],
+    )
+    assert [line["status"] for line in lines] == ["completed", "failed"]
+    assert lines[1]["error"] == {"status_code": 403, "detail": ["Forbidden"]}
+
+
+def test_review_batch_openai_format(client):
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "submissions": [
+            {
+                "github_repo_url": "http://github.com/owner/repo",
+                "candidate_level": "junior",
+            },
+            {
+                "github_repo_url": "http://github.com/owner/missing",
+                "candidate_level": "junior",
+            },
+        ],
+        "output_format": "openai_batch",
+    }
+    batch_request = {
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {"model": "gpt-4-turbo", "messages": []},
+    }
+
+    async def build(repo_url, candidate_level, assignment_description):
+        if repo_url.endswith("missing"):
+            raise HTTPException(status_code=404, detail="Not found")
+        return batch_request
+
+    with patch(
+        "app.services.manage_api_service.ManageAPIService"
+        ".build_batch_request",
+        side_effect=build,
+    ):
+        response = client.post("/review/batch", json=request_data)
+
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"custom_id": "submission-0", **batch_request}
+    ]
+
+
+def test_review_batch_rejects_empty_batch(client):
+    response = client.post(
+        "/review/batch",
+        json={"assignment_description": "Analyze.", "submissions": []},
+    )
+
+    assert response.status_code == 422
@@ -5,6 +5,7 @@ from fastapi import HTTPException
 
 from app.services.github_service import GitHubService
 from app.services.manage_api_service import ManageAPIService
+from app.services.repo_model import RepoFile, Repository
 
 
 @pytest.fixture
@@ -42,3 +43,119 @@ async def test_main_github_failure(mock_github_service, manage_api_service):
         )
     assert exc_info.value.status_code == 404
     assert "Repo not found" in exc_info.value.detail
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_fetch_progress(manage_api_service):
+    async def fetch(repo_url, token_budget, assignment_description):
+        token_budget.files = 3
+        token_budget.total = 42
+        return Repository([RepoFile("main.py", "print()")])
+
+    async def stream_code_review(*args):
+        yield "review", {"Rating": 7}
+
+    with patch.object(GitHubService, "main", side_effect=fetch), patch.object(
+        manage_api_service.openai_service,
+        "stream_code_review",
+        side_effect=stream_code_review,
+    ):
+        events = [
+            event
+            async for event in manage_api_service.stream(
+                "https://github.com/user/repo", "junior", "API"
+            )
+        ]
+
+    assert events == [
+        ("fetch_started", {"repo_url": "https://github.com/user/repo"}),
+        ("files_fetched", {"files": 3, "tokens": 42, "done": True}),
+        ("review", {"Rating": 7}),
+    ]
+
+
+@pytest.fixture
+def review_history():
+    history = AsyncMock()
+    history.get = AsyncMock(return_value=None)
+    return history
+
+
+@pytest.mark.asyncio
+async def test_main_reviews_only_changed_files(review_history):
+    service = ManageAPIService(review_history=review_history)
+    review_history.get.return_value = {
+        "commit_sha": "old",
+        "review": {"Rating": 5},
+        "files": ["main.py", "old.py"],
+    }
+    changed = Repository([RepoFile("main.py", "print()")])
+
+    with patch.object(
+        GitHubService,
+        "get_head_commit",
+        return_value=("user", "repo", "new"),
+    ), patch.object(
+        GitHubService, "fetch_changes", return_value=(changed, ["old.py"])
+    ) as fetch_changes, patch.object(
+        GitHubService, "main"
+    ) as full_fetch, patch.object(
+        service.openai_service,
+        "review_changes",
+        AsyncMock(return_value={"Rating": 8}),
+    ) as review_changes:
+        review = await service.main(
+            "https://github.com/user/repo", "junior", "API"
+        )
+
+    assert review == {"Rating": 8}
+    full_fetch.assert_not_called()
+    assert fetch_changes.await_args.args[:2] == (
+        "https://github.com/user/repo",
+        "old",
+    )
+    assert review_changes.await_args.args[:3] == (
+        changed,
+        ["old.py"],
+        {"Rating": 5},
+    )
+    assert review_history.set.await_args.args[1:] == (
+        "new",
+        {"Rating": 8},
+        ["main.py"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_main_falls_back_to_full_review(review_history):
+    service = ManageAPIService(review_history=review_history)
+    review_history.get.return_value = {
+        "commit_sha": "old",
+        "review": {"Rating": 5},
+        "files": ["main.py"],
+    }
+    repo_data = Repository([RepoFile("app.py", "print()")])
+
+    with patch.object(
+        GitHubService,
+        "get_head_commit",
+        return_value=("user", "repo", "new"),
+    ), patch.object(
+        GitHubService, "fetch_changes", return_value=None
+    ), patch.object(
+        GitHubService, "main", return_value=repo_data
+    ), patch.object(
+        service.openai_service,
+        "analyze_code_with_openai",
+        AsyncMock(return_value={"Rating": 9}),
+    ):
+        review = await service.main(
+            "https://github.com/user/repo", "junior", "API"
+        )
+
+    assert review == {"Rating": 9}
+    assert review_history.set.await_args.args[1:] == (
+        "new",
+        {"Rating": 9},
+        ["app.py"],
+    )
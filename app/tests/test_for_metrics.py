@@ -0,0 +1,62 @@
+import pytest
+
+from app.services.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    REGISTRY,
+)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr("app.services.metrics.REGISTRY", registry)
+    return registry
+
+
+def test_counter_render(registry):
+    counter = Counter("test_requests_total", "Test requests")
+    counter.inc(status="200")
+    counter.inc(2, status="200")
+
+    assert counter.get(status="200") == 3
+    assert registry.render() == (
+        "# HELP test_requests_total Test requests\n"
+        "# TYPE test_requests_total counter\n"
+        'test_requests_total{status="200"} 3.0\n'
+    )
+
+
+def test_histogram_render(registry):
+    histogram = Histogram(
+        "test_duration_seconds", "Test duration", buckets=(0.1, 1.0)
+    )
+    histogram.observe(0.05, stage="fetch")
+    histogram.observe(0.5, stage="fetch")
+    histogram.observe(5, stage="fetch")
+
+    assert histogram.count(stage="fetch") == 3
+    assert histogram.get(stage="fetch") == pytest.approx(5.55)
+    assert registry.render().splitlines()[2:] == [
+        'test_duration_seconds_bucket{stage="fetch",le="0.1"} 1',
+        'test_duration_seconds_bucket{stage="fetch",le="1.0"} 2',
+        'test_duration_seconds_bucket{stage="fetch",le="+Inf"} 3',
+        'test_duration_seconds_sum{stage="fetch"} 5.55',
+        'test_duration_seconds_count{stage="fetch"} 3',
+    ]
+
+
+def test_histogram_timer_records_elapsed(registry):
+    histogram = Histogram("test_timer_seconds", "Test timer")
+
+    with histogram.time(stage="parse") as timer:
+        pass
+
+    assert timer.elapsed >= 0
+    assert histogram.count(stage="parse") == 1
+    assert histogram.get(stage="parse") == timer.elapsed
+
+
+def test_registry_exposes_stage_durations():
+    assert "review_stage_duration_seconds" in REGISTRY.render()
@@ -0,0 +1,113 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.llm_backends import (
+    LLMRateLimitError,
+    LLMTimeoutError,
+    StubBackend,
+)
+from app.services.model_router import ModelRouter
+from app.services.openai_services import OpenAIService
+from app.services.resilience import RetryPolicy
+
+MODELS = ("gpt-3.5-turbo", "gpt-4-turbo")
+
+
+@pytest.fixture(autouse=True)
+def token_limits():
+    with patch.dict(
+        "settings.MODEL_TOKEN_LIMITS",
+        {"gpt-3.5-turbo": 16000, "gpt-4-turbo": 128000},
+    ):
+        yield
+
+
+def make_router(strategy="cost"):
+    return ModelRouter(
+        MODELS,
+        strategy,
+        backend_factory=lambda model: StubBackend(
+            model, latency=0, tokens_per_second=0
+        ),
+    )
+
+
+def models(backends):
+    return [backend.model for backend in backends]
+
+
+def test_routes_small_junior_prompt_to_cheapest_model():
+    router = make_router()
+
+    assert models(router.route(1000, "junior")) == list(MODELS)
+
+
+def test_senior_prompt_skips_lower_quality_models():
+    router = make_router()
+
+    assert models(router.route(1000, "senior")) == ["gpt-4-turbo"]
+    assert models(router.route(1000)) == ["gpt-4-turbo"]
+
+
+def test_prompt_over_model_limit_skips_model():
+    router = make_router()
+
+    assert models(router.route(100000, "junior")) == ["gpt-4-turbo"]
+
+
+def test_latency_strategy_prefers_faster_model():
+    router = make_router("latency")
+    router.record("gpt-3.5-turbo", 4.0, "ok")
+    router.record("gpt-4-turbo", 1.0, "ok")
+
+    assert models(router.route(1000, "junior")) == [
+        "gpt-4-turbo",
+        "gpt-3.5-turbo",
+    ]
+
+    for _ in range(10):
+        router.record("gpt-4-turbo", 10.0, "ok")
+
+    assert models(router.route(1000, "junior"))[0] == "gpt-3.5-turbo"
+
+
+def test_open_circuit_skips_model():
+    router = make_router()
+    breaker = router.backend("gpt-3.5-turbo").circuit_breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    assert models(router.route(1000, "junior")) == ["gpt-4-turbo"]
+
+
+def test_rejects_unknown_strategy_and_models():
+    with pytest.raises(ValueError):
+        ModelRouter(MODELS, "random")
+    with pytest.raises(ValueError):
+        ModelRouter(("unknown-model",))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error",
+    [LLMRateLimitError("Rate limited"), LLMTimeoutError("Timed out")],
+)
+async def test_request_review_falls_back_to_next_model(error):
+    router = make_router()
+    primary = router.backend("gpt-3.5-turbo")
+    primary.complete = AsyncMock(side_effect=error)
+    service = OpenAIService(
+        router=router,
+        retry_policy=RetryPolicy(
+            max_retries=0, base_delay=0, max_delay=0, deadline=10
+        ),
+    )
+
+    review = await service._request_review(
+        "File: a.py\nContent:\nprint()", "repo", candidate_level="junior"
+    )
+
+    assert review["Found files"] == 1
+    primary.complete.assert_awaited_once()
+    assert "gpt-4-turbo" in router.latency
@@ -0,0 +1,104 @@
+import asyncio
+import base64
+import time
+
+import pytest
+
+from app.services.github_service import GitHubService
+from app.services.offload import OFFLOADED_TASKS, Offloader
+
+LARGE_FILES = 40
+LARGE_FILE_SIZE = 2 * 1024 * 1024
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+def make_tree(prefix: str, files: int) -> dict:
+    return {
+        "tree": [
+            {
+                "path": f"{prefix}/file_{index}.py",
+                "type": "blob",
+                "mode": "100644",
+                "url": f"https://api.github.com/{prefix}/{index}",
+            }
+            for index in range(files)
+        ]
+    }
+
+
+async def process_repos(mocker, offloader: Offloader) -> tuple[float, list]:
+    large_blob = base64.b64encode(
+        b"x = 1\n" * (LARGE_FILE_SIZE // 6)
+    ).decode()
+    small_blob = base64.b64encode(b"print('hi')\n").decode()
+
+    async def fake_request(url, client, conditional=False):
+        await asyncio.sleep(0)
+        blob = large_blob if "/large/" in url else small_blob
+        return {"content": blob}
+
+    mocker.patch.object(
+        GitHubService, "_make_request", side_effect=fake_request
+    )
+    mocker.patch("app.services.github_service.offloader", offloader)
+    service = GitHubService(fetch_mode="tree")
+    finished = []
+
+    async def review(prefix: str, files: int) -> None:
+        await service._receive_repo_tree(make_tree(prefix, files), None)
+        finished.append(prefix)
+
+    stop = asyncio.Event()
+    lag = asyncio.ensure_future(measure_lag(stop))
+    await asyncio.sleep(0.01)
+    await asyncio.gather(
+        review("large", LARGE_FILES),
+        *(review(f"small{index}", 3) for index in range(5)),
+    )
+    stop.set()
+
+    return await lag, finished
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_with_offloading(mocker):
+    offloader = Offloader(inline_max_bytes=64 * 1024, thread_workers=2)
+    try:
+        lag, finished = await process_repos(mocker, offloader)
+    finally:
+        offloader.shutdown()
+
+    assert lag < 0.1
+    assert finished[-1] == "large"
+
+
+@pytest.mark.asyncio
+async def test_offloader_chooses_pool_by_size():
+    offloader = Offloader(
+        inline_max_bytes=10, process_min_bytes=100, process_workers=1
+    )
+    before = {
+        pool: OFFLOADED_TASKS.get(pool=pool)
+        for pool in ("inline", "thread", "process")
+    }
+    try:
+        assert await offloader.run(5, len, "small") == 5
+        assert await offloader.run(50, len, "x" * 50) == 50
+        assert await offloader.run(500, len, "x" * 500) == 500
+        assert await offloader.run(
+            500, len, "x" * 500, threads_only=True
+        ) == 500
+    finally:
+        offloader.shutdown()
+
+    assert OFFLOADED_TASKS.get(pool="inline") == before["inline"] + 1
+    assert OFFLOADED_TASKS.get(pool="thread") == before["thread"] + 2
+    assert OFFLOADED_TASKS.get(pool="process") == before["process"] + 1
@@ -1,20 +1,28 @@
 import os
-from unittest.mock import patch
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import fastapi
 import pytest
 
+from app.services.llm_backends import (
+    LLMRateLimitError,
+    StubBackend,
+    create_llm_backend,
+)
 from app.services.openai_services import (
     OpenAIService,
     OPENAI_MODEL,
     MODEL_TOKEN_LIMITS,
 )
+from app.services.repo_model import RepoFile, Repository
+from app.services.resilience import CircuitBreaker, RetryPolicy
 
 
 @pytest.fixture
 def openai_service():
     with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_api_key"}):
-        return OpenAIService()
+        return OpenAIService(backend=create_llm_backend())
 
 
 def test_validate_length_prompt_valid(openai_service):
@@ -33,3 +41,215 @@ def test_validate_length_prompt_too_long(openai_service):
         openai_service._validate_length_prompt(prompt)
     except fastapi.HTTPException:
         pytest.fail("HTTPException was raised unexpectedly")
+
+
+def fake_count_tokens(text: str) -> int:
+    return len(text.split())
+
+
+@pytest.fixture
+def word_tokens():
+    with patch.object(
+        OpenAIService, "_count_tokens", side_effect=fake_count_tokens
+    ):
+        yield
+
+
+REPO_DATA = Repository(
+    [
+        RepoFile("README.md", "one two three"),
+        RepoFile("src/a.py", "a " * 10),
+        RepoFile("src/b.py", "b " * 10),
+    ],
+    ["src"],
+)
+
+
+def test_split_into_chunks_keeps_files_whole(openai_service, word_tokens):
+    chunks = openai_service._split_into_chunks(REPO_DATA, budget=20)
+
+    assert len(chunks) == 2
+    assert "File: README.md" in chunks[0]
+    assert "File: src/a.py" in chunks[0]
+    assert chunks[1].startswith("File: src/b.py")
+
+
+def test_split_into_chunks_splits_large_file(openai_service, word_tokens):
+    repo_data = Repository([RepoFile("big.py", "x = 1\n" * 30)])
+
+    chunks = openai_service._split_into_chunks(repo_data, budget=30)
+
+    assert len(chunks) == 3
+    assert "File: big.py (part 1 of 3)" in chunks[0]
+    assert all(fake_count_tokens(chunk) <= 40 for chunk in chunks)
+
+
+@pytest.mark.asyncio
+async def test_analyze_code_uses_map_reduce(openai_service, word_tokens):
+    final_review = {"Rating": 7, "Conclusion": "Good"}
+
+    with patch.dict(MODEL_TOKEN_LIMITS, {OPENAI_MODEL: 30}), patch(
+        "app.services.openai_services.MAP_REDUCE_CHUNK_TOKENS", 20
+    ), patch.object(
+        OpenAIService,
+        "_request_review",
+        new_callable=AsyncMock,
+        side_effect=[{"Rating": 6}, {"Rating": 8}, final_review],
+    ) as mock_request:
+        result = await openai_service.analyze_code_with_openai(
+            REPO_DATA, "junior", "API", "https://github.com/o/r"
+        )
+
+    assert result == final_review
+    assert mock_request.await_count == 3
+    reduce_prompt = mock_request.await_args_list[-1].args[0]
+    assert "Merge them into a single review" in reduce_prompt
+
+
+@pytest.mark.asyncio
+async def test_review_chunk_uses_cache(openai_service):
+    chunk_cache = AsyncMock()
+    chunk_cache.get = AsyncMock(return_value={"Rating": 5})
+    openai_service.chunk_cache = chunk_cache
+
+    with patch.object(
+        OpenAIService, "_request_review", new_callable=AsyncMock
+    ) as mock_request:
+        result = await openai_service._review_chunk(
+            "File: a.py", 1, 2, "junior", "Build an API", "repo"
+        )
+
+    assert result == {"Rating": 5}
+    mock_request.assert_not_awaited()
+
+
+def test_count_repo_tokens_uses_precomputed_counts(openai_service):
+    repo_data = Repository([RepoFile("a.py", "a b c", tokens=100)])
+
+    with patch.object(
+        OpenAIService, "_count_tokens", side_effect=fake_count_tokens
+    ) as mock_count:
+        result = openai_service._count_repo_tokens(repo_data)
+
+    assert result == 100 + fake_count_tokens("File: a.py\nContent:\n") + 1
+    assert mock_count.call_count == 1
+
+
+def test_format_repo_data_for_prompt(openai_service):
+    repo_data = Repository(
+        [RepoFile("README.md", "# Repo"), RepoFile("src/main.py", "print(1)")],
+        ["src/empty"],
+    )
+
+    assert openai_service._format_repo_data_for_prompt(repo_data) == (
+        "File: README.md\nContent:\n# Repo\n\n"
+        "Directory: src\n"
+        "  Directory: empty\n"
+        "  File: main.py\nContent:\nprint(1)\n\n"
+    )
+
+
+def test_build_review_prompt(openai_service):
+    repo_data = Repository([RepoFile("main.py", "print(1)")])
+
+    prompt = openai_service._build_review_prompt(
+        repo_data, "junior", "Build an API"
+    )
+
+    assert prompt.startswith(
+        "Here is a repository with the following files: "
+        "File: main.py\nContent:\nprint(1)\n\n. "
+        "Description: Build an API. "
+        "Analyze the code for a junior developer, and provide feedback."
+        "Return the review result"
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_code_review(openai_service, word_tokens):
+    async def stream(messages):
+        for part in ('{"Rating": ', "7}"):
+            yield part
+
+    openai_service.backend = MagicMock()
+    openai_service.backend.stream = MagicMock(side_effect=stream)
+
+    with patch.dict(MODEL_TOKEN_LIMITS, {OPENAI_MODEL: 1000}):
+        events = [
+            event
+            async for event in openai_service.stream_code_review(
+                REPO_DATA, "junior", "API", "https://github.com/o/r"
+            )
+        ]
+
+    assert events == [
+        ("tokens_counted", {"tokens": events[0][1]["tokens"]}),
+        ("review_started", {"mode": "single"}),
+        ("model_tokens", {"text": '{"Rating": '}),
+        ("model_tokens", {"text": "7}"}),
+        ("review", {"Rating": 7}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_request_review_maps_unavailable_backend(openai_service):
+    openai_service.backend = StubBackend(latency=0, error_rate=1)
+    openai_service.retry_policy = RetryPolicy(
+        max_retries=2, base_delay=0, max_delay=0, deadline=10
+    )
+    openai_service.backend.complete = AsyncMock(
+        wraps=openai_service.backend.complete
+    )
+
+    with pytest.raises(fastapi.HTTPException) as exc_info:
+        await openai_service._request_review("prompt", "repo")
+
+    assert exc_info.value.status_code == 503
+    assert openai_service.backend.complete.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_request_review_honors_rate_limit_retry_after(openai_service):
+    openai_service.retry_policy = RetryPolicy(
+        max_retries=3, base_delay=0, max_delay=0, deadline=10
+    )
+    openai_service.backend.complete = AsyncMock(
+        side_effect=[
+            LLMRateLimitError("Rate limited", retry_after=0.05),
+            '{"Rating": 7}',
+        ]
+    )
+
+    start = time.perf_counter()
+    review = await openai_service._request_review("prompt", "repo")
+
+    assert review == {"Rating": 7}
+    assert time.perf_counter() - start >= 0.05
+    assert openai_service.backend.circuit_breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_request_review_fails_fast_when_circuit_open(openai_service):
+    openai_service.backend.circuit_breaker = CircuitBreaker(
+        "llm:test", failure_threshold=1, recovery_timeout=60
+    )
+    openai_service.backend.circuit_breaker.record_failure()
+    openai_service.backend.complete = AsyncMock()
+
+    with pytest.raises(fastapi.HTTPException) as exc_info:
+        await openai_service._request_review("prompt", "repo")
+
+    assert exc_info.value.status_code == 503
+    openai_service.backend.complete.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_request_review_with_stub_backend(openai_service):
+    openai_service.backend = StubBackend(latency=0, tokens_per_second=0)
+
+    review = await openai_service._request_review(
+        "File: a.py\nContent:\nprint()", "repo"
+    )
+
+    assert review["Found files"] == 1
+    assert 0 <= review["Rating"] <= 10
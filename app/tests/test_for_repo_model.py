@@ -0,0 +1,43 @@
+from app.services.repo_model import RepoFile, Repository
+
+
+def test_repository_lists_files_and_directories():
+    repository = Repository(
+        [RepoFile("README.md", "# Repo"), RepoFile("src/main.py", "x = 1")],
+        ["src", "src/empty"],
+    )
+
+    assert repository.paths == ["README.md", "src/main.py"]
+    assert repository.directories == ["src", "src/empty"]
+    assert len(repository) == 2
+    assert repository.size == len("# Repo") + len("x = 1")
+    assert repository
+    assert not Repository()
+
+
+def test_walk_derives_parent_directories():
+    repository = Repository(
+        [RepoFile("src/app/main.py", "x"), RepoFile("README.md", "y")]
+    )
+
+    assert [
+        (depth, name, file is not None)
+        for depth, name, file in repository.walk()
+    ] == [
+        (0, "README.md", True),
+        (0, "src", False),
+        (1, "app", False),
+        (2, "main.py", True),
+    ]
+
+
+def test_repo_file_decodes_content_lazily():
+    file = RepoFile("src/main.py", "print('привіт')".encode())
+
+    assert file.name == "main.py"
+    assert file.size == len("print('привіт')".encode())
+    assert isinstance(file.data, bytes)
+    assert file.content == "print('привіт')"
+    assert file.data == "print('привіт')"
+    assert len(Repository([file])) == 1
+    assert Repository([file]).size == file.size
@@ -0,0 +1,110 @@
+import random
+import time
+from email.utils import formatdate
+
+import pytest
+
+from app.services.resilience import (
+    CIRCUIT_REJECTED,
+    CIRCUIT_STATE,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+def make_policy(**kwargs) -> RetryPolicy:
+    options = {
+        "max_retries": 3,
+        "base_delay": 1,
+        "max_delay": 4,
+        "deadline": 60,
+        "rng": random.Random(0),
+    }
+    options.update(kwargs)
+    return RetryPolicy(**options)
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = make_policy()
+
+    delays = [policy.backoff(attempt) for attempt in range(6)]
+
+    assert all(0 <= delay <= min(4, 2 ** attempt)
+               for attempt, delay in enumerate(delays))
+    assert len(set(delays)) == len(delays)
+
+
+def test_retry_budget_stops_after_max_retries():
+    retries = make_policy().start()
+
+    delays = [retries.next_delay() for _ in range(4)]
+
+    assert all(delay is not None for delay in delays[:3])
+    assert delays[3] is None
+    assert retries.attempt == 3
+
+
+def test_retry_budget_honors_retry_after_and_deadline():
+    retries = make_policy(deadline=10).start()
+
+    assert retries.next_delay(retry_after=5) >= 5
+    assert retries.next_delay(retry_after=30) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"Retry-After": "3"}) == 3.0
+    assert parse_retry_after({"Retry-After": "soon"}) is None
+    assert parse_retry_after({}) is None
+
+
+def test_parse_retry_after_http_date():
+    assert 8 <= parse_retry_after(
+        {"Retry-After": formatdate(time.time() + 10, usegmt=True)}
+    ) <= 10
+    assert parse_retry_after(
+        {"Retry-After": formatdate(time.time() - 60, usegmt=True)}
+    ) == 0.0
+
+
+def test_circuit_breaker_opens_and_recovers():
+    breaker = CircuitBreaker(
+        "test-upstream", failure_threshold=2, recovery_timeout=0.05
+    )
+    rejected_before = CIRCUIT_REJECTED.get(upstream="test-upstream")
+
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert CIRCUIT_STATE.get(upstream="test-upstream") == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert (
+        CIRCUIT_REJECTED.get(upstream="test-upstream") == rejected_before + 1
+    )
+
+    time.sleep(0.05)
+    breaker.check()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert CIRCUIT_STATE.get(upstream="test-upstream") == 0
+
+
+def test_circuit_breaker_reopens_when_probe_fails():
+    breaker = CircuitBreaker(
+        "test-probe", failure_threshold=5, recovery_timeout=0
+    )
+    for _ in range(5):
+        breaker.record_failure()
+
+    breaker.check()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
@@ -0,0 +1,35 @@
+from app.services.response_store import GitHubResponseStore
+
+
+def test_put_requires_validator():
+    store = GitHubResponseStore()
+    store.put("url", {}, [], 10)
+
+    assert store.get("url") is None
+
+
+def test_conditional_headers():
+    store = GitHubResponseStore()
+    store.put(
+        "url",
+        {"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+        [],
+        10,
+    )
+
+    assert store.get("url").conditional_headers() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+
+
+def test_put_evicts_least_recently_used():
+    store = GitHubResponseStore(max_bytes=20)
+    store.put("a", {"ETag": "a"}, ["a"], 10)
+    store.put("b", {"ETag": "b"}, ["b"], 10)
+    store.get("a")
+    store.put("c", {"ETag": "c"}, ["c"], 10)
+
+    assert store.get("a").data == ["a"]
+    assert store.get("b") is None
+    assert store.size == 20
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.cache_codec import cache_codec
+from app.services.review_cache import ReviewCache, ReviewHistory
+
+
+def test_build_key_depends_on_description_and_model():
+    key = ReviewCache.build_key(
+        "owner", "repo", "abc", "Junior", "Build an API", "gpt-4-turbo"
+    )
+
+    assert key.startswith("review:owner/repo@abc:junior:gpt-4-turbo:")
+    assert key != ReviewCache.build_key(
+        "owner", "repo", "abc", "junior", "Build a CLI", "gpt-4-turbo"
+    )
+    assert key != ReviewCache.build_key(
+        "owner", "repo", "abc", "junior", "Build an API", "gpt-4"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_marks_old_entries_stale():
+    redis_client = AsyncMock()
+    cache = ReviewCache(redis_client, ttl=100, refresh_after=50)
+
+    redis_client.get = AsyncMock(
+        return_value=json.dumps(
+            {"created_at": time.time() - 10, "review": {"Rating": 7}}
+        )
+    )
+    assert await cache.get("key") == ({"Rating": 7}, False)
+
+    redis_client.get = AsyncMock(
+        return_value=json.dumps(
+            {"created_at": time.time() - 60, "review": {"Rating": 7}}
+        )
+    )
+    assert await cache.get("key") == ({"Rating": 7}, True)
+
+
+@pytest.mark.asyncio
+async def test_get_returns_none_when_redis_is_down():
+    redis_client = AsyncMock()
+    redis_client.get = AsyncMock(side_effect=ConnectionError("down"))
+
+    assert await ReviewCache(redis_client).get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_in_background_runs_once():
+    redis_client = AsyncMock()
+    redis_client.set = AsyncMock(return_value=True)
+    cache = ReviewCache(redis_client, ttl=100)
+    produce = AsyncMock(return_value={"Rating": 8})
+
+    cache.refresh_in_background("key", produce)
+    cache.refresh_in_background("key", produce)
+    await asyncio.gather(*cache._tasks)
+
+    produce.assert_awaited_once()
+    stored = cache_codec.decode(redis_client.set.call_args_list[-1].args[1])
+    assert stored["review"] == {"Rating": 8}
+    assert redis_client.set.call_args_list[-1].kwargs == {"ex": 100}
+
+
+@pytest.mark.asyncio
+async def test_review_history_round_trip():
+    redis_client = AsyncMock()
+    history = ReviewHistory(redis_client, ttl=100)
+    key = ReviewHistory.build_key(
+        "owner", "repo", "Junior", "Build an API", "gpt-4-turbo"
+    )
+
+    await history.set(key, "abc", {"Rating": 7}, ["main.py"])
+    stored = redis_client.set.await_args.args[1]
+    redis_client.get = AsyncMock(return_value=stored)
+
+    assert key.startswith("review_history:owner/repo:junior:gpt-4-turbo:")
+    assert await history.get(key) == {
+        "commit_sha": "abc",
+        "review": {"Rating": 7},
+        "files": ["main.py"],
+    }
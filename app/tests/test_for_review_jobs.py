@@ -0,0 +1,225 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+import redis.asyncio as redis
+from fastapi import HTTPException
+
+from app.services.review_jobs import (
+    ReviewJobQueue,
+    ReviewWorker,
+    validate_webhook_url,
+)
+
+REQUEST = {
+    "assignment_description": "Analyze this code.",
+    "github_repo_url": "https://github.com/owner/repo",
+    "candidate_level": "junior",
+    "webhook_url": None,
+}
+
+
+@pytest.fixture
+def queue(fake_redis):
+    return ReviewJobQueue(fake_redis)
+
+
+def make_worker(queue, result=None, exc=None, webhook_client=None):
+    service = MagicMock()
+    service.main = AsyncMock(return_value=result, side_effect=exc)
+    return ReviewWorker(queue, lambda: service, webhook_client), service
+
+
+@pytest.mark.asyncio
+async def test_enqueue_and_dequeue(queue):
+    job_id = await queue.enqueue(REQUEST)
+
+    assert (await queue.get(job_id))["status"] == "queued"
+    assert await queue.dequeue() == (job_id, REQUEST)
+    assert (await queue.get(job_id))["status"] == "running"
+    assert await queue.dequeue() is None
+
+
+@pytest.mark.asyncio
+async def test_processed_job_is_acknowledged(queue):
+    worker, _ = make_worker(queue, result={"Rating": 7})
+    job_id = await queue.enqueue(REQUEST)
+
+    await worker.process(*await queue.dequeue())
+
+    assert queue.redis_client.lists[queue.processing] == []
+    assert not await queue.redis_client.exists(queue._lease_key(job_id))
+
+
+@pytest.mark.asyncio
+async def test_requeues_job_abandoned_by_crashed_worker(queue):
+    job_id = await queue.enqueue(REQUEST)
+    await queue.dequeue()
+    await queue.redis_client.delete(queue._lease_key(job_id))
+
+    assert await queue.requeue_stale() == 0
+    assert await queue.requeue_stale() == 1
+
+    assert (await queue.get(job_id))["status"] == "queued"
+    assert await queue.dequeue() == (job_id, REQUEST)
+
+
+@pytest.mark.asyncio
+async def test_does_not_requeue_leased_job(queue):
+    await queue.enqueue(REQUEST)
+    await queue.dequeue()
+
+    assert await queue.requeue_stale() == 0
+    assert await queue.requeue_stale() == 0
+
+
+@pytest.mark.asyncio
+async def test_get_unknown_job(queue):
+    assert await queue.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_worker_completes_job(queue):
+    worker, service = make_worker(queue, result={"Rating": 7})
+    job_id = await queue.enqueue(REQUEST)
+
+    await worker.process(*await queue.dequeue())
+
+    job = await queue.get(job_id)
+    assert job["status"] == "completed"
+    assert job["result"] == {"Rating": 7}
+    service.main.assert_awaited_once_with(
+        REQUEST["github_repo_url"],
+        REQUEST["candidate_level"],
+        REQUEST["assignment_description"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_worker_records_failure(queue):
+    worker, _ = make_worker(
+        queue, exc=HTTPException(status_code=404, detail="Not found")
+    )
+    job_id = await queue.enqueue(REQUEST)
+
+    await worker.process(*await queue.dequeue())
+
+    job = await queue.get(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == {"status_code": 404, "detail": "Not found"}
+
+
+@pytest.mark.asyncio
+async def test_worker_records_failure_with_non_string_detail(queue):
+    worker, _ = make_worker(
+        queue, exc=HTTPException(status_code=403, detail={"Forbidden"})
+    )
+    job_id = await queue.enqueue(REQUEST)
+
+    await worker.process(*await queue.dequeue())
+
+    job = await queue.get(job_id)
+    assert job["error"] == {"status_code": 403, "detail": ["Forbidden"]}
+    assert queue.redis_client.lists[queue.processing] == []
+
+
+@pytest.mark.asyncio
+async def test_worker_loop_survives_redis_errors(queue):
+    worker, _ = make_worker(queue, result={"Rating": 7})
+    worker.ERROR_BACKOFF = 0
+    job_id = await queue.enqueue(REQUEST)
+    blmove = queue.redis_client.blmove
+
+    async def blmove_once(*args, **kwargs):
+        queue.redis_client.blmove = blmove
+        raise redis.ConnectionError("Connection reset")
+
+    queue.redis_client.blmove = blmove_once
+    loop = asyncio.create_task(worker._run_loop())
+    try:
+        for _ in range(100):
+            if (await queue.get(job_id))["status"] == "completed":
+                break
+            await asyncio.sleep(0.01)
+        assert not loop.done()
+    finally:
+        loop.cancel()
+
+    assert (await queue.get(job_id))["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_worker_calls_webhook(queue):
+    webhook_client = MagicMock()
+    webhook_client.post = AsyncMock(
+        return_value=httpx.Response(
+            200, request=httpx.Request("POST", "https://example.com/hook")
+        )
+    )
+    worker, _ = make_worker(
+        queue, result={"Rating": 7}, webhook_client=webhook_client
+    )
+    job_id = await queue.enqueue(
+        {**REQUEST, "webhook_url": "https://example.com/hook"}
+    )
+
+    with patch(
+        "app.services.review_jobs.validate_webhook_url",
+        new_callable=AsyncMock,
+    ):
+        await worker.process(*await queue.dequeue())
+
+    webhook_client.post.assert_awaited_once()
+    assert webhook_client.post.call_args.args == ("https://example.com/hook",)
+    assert webhook_client.post.call_args.kwargs["json"] == {
+        "job_id": job_id,
+        "status": "completed",
+        "result": {"Rating": 7},
+    }
+
+
+@pytest.mark.asyncio
+async def test_worker_skips_webhook_to_internal_host(queue):
+    webhook_client = MagicMock()
+    webhook_client.post = AsyncMock()
+    worker, _ = make_worker(
+        queue, result={"Rating": 7}, webhook_client=webhook_client
+    )
+    await queue.enqueue({**REQUEST, "webhook_url": "http://localhost:6379"})
+
+    await worker.process(*await queue.dequeue())
+
+    webhook_client.post.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "url",
+    [
+        "ftp://93.184.216.34/hook",
+        "http://127.0.0.1:6379",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+    ],
+)
+async def test_validate_webhook_url_rejects_internal_targets(url):
+    with pytest.raises(ValueError):
+        await validate_webhook_url(url)
+
+
+@pytest.mark.asyncio
+async def test_validate_webhook_url_accepts_public_address():
+    await validate_webhook_url("https://93.184.216.34/hook")
+
+
+@pytest.mark.asyncio
+async def test_validate_webhook_url_uses_allowlist():
+    with patch(
+        "app.services.review_jobs.REVIEW_WEBHOOK_ALLOWED_HOSTS",
+        ("hooks.internal",),
+    ):
+        await validate_webhook_url("http://hooks.internal/done")
+        with pytest.raises(ValueError):
+            await validate_webhook_url("https://93.184.216.34/hook")
@@ -0,0 +1,178 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services.single_flight import SingleFlight
+from main import app
+
+
+def slow_producer(result=None, exc=None):
+    async def produce(*args):
+        await asyncio.sleep(0.05)
+        if exc:
+            raise exc
+        return result
+
+    return AsyncMock(side_effect=produce)
+
+
+@pytest.mark.asyncio
+async def test_do_coalesces_in_process():
+    single_flight = SingleFlight()
+    produce = slow_producer({"Rating": 7})
+
+    results = await asyncio.gather(
+        *(single_flight.do("key", produce) for _ in range(20))
+    )
+
+    assert results == [{"Rating": 7}] * 20
+    produce.assert_awaited_once()
+    assert single_flight._calls == {}
+
+
+@pytest.mark.asyncio
+async def test_do_shares_errors_with_waiters():
+    single_flight = SingleFlight()
+    produce = slow_producer(exc=HTTPException(status_code=404))
+
+    results = await asyncio.gather(
+        *(single_flight.do("key", produce) for _ in range(3)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, HTTPException) for result in results)
+    produce.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_do_coalesces_across_workers(fake_redis):
+    workers = [SingleFlight(fake_redis, wait_timeout=5) for _ in range(4)]
+    produce = slow_producer({"Rating": 9})
+
+    results = await asyncio.gather(
+        *(worker.do("key", produce) for worker in workers for _ in range(5))
+    )
+
+    assert results == [{"Rating": 9}] * 20
+    produce.assert_awaited_once()
+    assert "singleflight:key:lock" not in fake_redis.data
+
+
+@pytest.mark.asyncio
+async def test_do_propagates_errors_across_workers(fake_redis):
+    leader, follower = SingleFlight(fake_redis), SingleFlight(fake_redis)
+    produce = slow_producer(
+        exc=HTTPException(status_code=400, detail="Prompt is too long")
+    )
+
+    results = await asyncio.gather(
+        leader.do("key", produce),
+        follower.do("key", produce),
+        return_exceptions=True,
+    )
+
+    assert [result.status_code for result in results] == [400, 400]
+    assert results[1].detail == "Prompt is too long"
+    produce.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_do_propagates_unexpected_errors_across_workers(fake_redis):
+    leader = SingleFlight(fake_redis)
+    follower = SingleFlight(fake_redis, wait_timeout=5)
+    produce = slow_producer(exc=ValueError("Unparsable review"))
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            leader.do("key", produce),
+            follower.do("key", produce),
+            return_exceptions=True,
+        ),
+        1,
+    )
+
+    assert isinstance(results[0], ValueError)
+    assert results[1].status_code == 500
+    assert results[1].detail == "Unparsable review"
+    produce.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_do_propagates_non_string_error_detail_across_workers(
+    fake_redis,
+):
+    leader = SingleFlight(fake_redis)
+    follower = SingleFlight(fake_redis, wait_timeout=5)
+    produce = slow_producer(
+        exc=HTTPException(status_code=403, detail={"Forbidden"})
+    )
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            leader.do("key", produce),
+            follower.do("key", produce),
+            return_exceptions=True,
+        ),
+        1,
+    )
+
+    assert [result.status_code for result in results] == [403, 403]
+    assert results[1].detail == ["Forbidden"]
+    produce.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_follower_stops_waiting_when_lock_is_released(fake_redis):
+    follower = SingleFlight(fake_redis, wait_timeout=5)
+    follower.LOCK_POLL_INTERVAL = 0.01
+    await fake_redis.set("singleflight:key:lock", "crashed-leader")
+    produce = slow_producer({"Rating": 4})
+
+    async def crash_leader():
+        await asyncio.sleep(0.05)
+        await fake_redis.delete("singleflight:key:lock")
+
+    results = await asyncio.wait_for(
+        asyncio.gather(follower.do("key", produce), crash_leader()), 1
+    )
+
+    assert results[0] == {"Rating": 4}
+    produce.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_identical_reviews_make_one_upstream_call():
+    request_data = {
+        "assignment_description": "Analyze this code.",
+        "github_repo_url": "https://github.com/owner/repo",
+        "candidate_level": "junior",
+    }
+    produce = slow_producer({"Rating": 5})
+
+    with patch(
+        "app.services.manage_api_service.ManageAPIService"
+        ".get_review_cache_key",
+        new_callable=AsyncMock,
+        return_value="review:owner/repo@abc:junior:gpt-4-turbo:hash",
+    ), patch(
+        "main.review_cache.get", new_callable=AsyncMock, return_value=None
+    ), patch(
+        "main.review_cache.set", new_callable=AsyncMock
+    ), patch(
+        "main.review_single_flight.redis_client", None
+    ), patch(
+        "app.services.manage_api_service.ManageAPIService.main", produce
+    ):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            responses = await asyncio.gather(
+                *(client.post("/review", json=request_data) for _ in range(25))
+            )
+
+    assert [response.json() for response in responses] == [{"Rating": 5}] * 25
+    produce.assert_awaited_once()
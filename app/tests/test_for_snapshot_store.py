@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from app.services.snapshot_store import SNAPSHOT_EVICTIONS, SnapshotStore
+
+ENTRIES = [
+    ("src", None),
+    ("src/main.py", "print('hi')\n"),
+    ("README.md", "# Привіт"),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(root=str(tmp_path), max_bytes=1024 * 1024)
+
+
+def test_build_key():
+    assert SnapshotStore.build_key("owner", "repo", "abc") == "owner/repo@abc"
+
+
+@pytest.mark.asyncio
+async def test_put_and_get_round_trip(store):
+    await store.put("owner/repo@abc", ENTRIES, selection=None, tokens=12)
+
+    meta, entries = await store.get("owner/repo@abc")
+
+    assert meta == {"selection": None, "tokens": 12}
+    assert entries == [
+        (path, None if content is None else content.encode("utf-8"))
+        for path, content in ENTRIES
+    ]
+    assert await store.get("owner/repo@def") is None
+
+
+@pytest.mark.asyncio
+async def test_get_discards_corrupt_snapshot(store):
+    path = store._path("owner/repo@abc")
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(b"not a snapshot")
+
+    assert await store.get("owner/repo@abc") is None
+    assert not os.path.exists(path)
+
+
+@pytest.mark.asyncio
+async def test_collect_garbage_evicts_least_recently_used(tmp_path):
+    content = "x" * 400
+    store = SnapshotStore(root=str(tmp_path), max_bytes=1200)
+    evictions_before = SNAPSHOT_EVICTIONS.get()
+
+    await store.put("owner/repo@1", [("a.py", content)])
+    await store.put("owner/repo@2", [("a.py", content)])
+    os.utime(store._path("owner/repo@1"), (0, 0))
+    os.utime(store._path("owner/repo@2"), (1, 1))
+    assert await store.get("owner/repo@1") is not None
+    await store.put("owner/repo@3", [("a.py", content)])
+
+    assert await store.get("owner/repo@2") is None
+    assert await store.get("owner/repo@1") is not None
+    assert await store.get("owner/repo@3") is not None
+    assert SNAPSHOT_EVICTIONS.get() == evictions_before + 1
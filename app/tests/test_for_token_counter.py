@@ -0,0 +1,91 @@
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.github_service import GitHubService
+from app.services.token_counter import TokenBudget, TokenCounter
+
+
+@pytest.fixture
+def encoding():
+    fake_encoding = MagicMock()
+    fake_encoding.encode.side_effect = str.split
+    with patch(
+        "app.services.token_counter.get_encoding", return_value=fake_encoding
+    ):
+        yield fake_encoding
+
+
+def test_count_is_memoized_by_sha(encoding):
+    counter = TokenCounter()
+
+    assert counter.count("a b c", "sha1") == 3
+    assert counter.count("a b c", "sha1") == 3
+    assert counter.count("a b c") == 3
+    assert encoding.encode.call_count == 2
+
+
+def test_count_evicts_oldest_sha(encoding):
+    counter = TokenCounter(max_entries=1)
+    counter.count("a", "sha1")
+    counter.count("b", "sha2")
+    counter.count("a", "sha1")
+
+    assert encoding.encode.call_count == 3
+
+
+def test_budget_raises_when_exceeded(encoding):
+    budget = TokenBudget(5, TokenCounter())
+    budget.add("a b c")
+
+    with pytest.raises(HTTPException) as exc:
+        budget.add("d e f")
+
+    assert exc.value.status_code == 400
+    assert budget.total == 6
+
+
+def test_budget_counts_concurrent_files_from_threads():
+    budget = TokenBudget(10**9, TokenCounter())
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(budget.add_counted, [1] * 10000))
+
+    assert (budget.total, budget.files) == (10000, 10000)
+
+
+@pytest.mark.asyncio
+async def test_github_service_aborts_oversized_repo_early(encoding):
+    files = [
+        {
+            "name": f"file{index}.py",
+            "type": "file",
+            "sha": f"sha{index}",
+            "url": f"https://api.github.com/file{index}",
+        }
+        for index in range(20)
+    ]
+    fetched = []
+
+    async def make_request(url, client, conditional=False):
+        index = int(url.removeprefix("https://api.github.com/file"))
+        await asyncio.sleep(index * 0.01)
+        fetched.append(index)
+        return {"content": base64.b64encode(b"x y z").decode()}
+
+    service = GitHubService()
+    with patch.object(
+        GitHubService, "_make_request", side_effect=make_request
+    ):
+        with pytest.raises(HTTPException) as exc:
+            await service._receive_repo_data(
+                files, MagicMock(), TokenBudget(10, TokenCounter())
+            )
+        await asyncio.sleep(0.25)
+
+    assert exc.value.status_code == 400
+    assert len(fetched) == 4
@@ -0,0 +1,106 @@
+import argparse
+import json
+import logging
+import time
+
+from app.services.cache_codec import PACKAGES, CacheCodec
+from benchmarks.fake_github import make_synthetic_repo
+
+
+def _payloads(files: int, file_size: int) -> dict[str, object]:
+    repo = make_synthetic_repo(files, file_size)
+    contents = {path: data.decode() for path, data in repo.files.items()}
+    review = {
+        "Found files": sorted(contents)[:20],
+        "Downsides/Comments": "Handlers mix validation and persistence. "
+        * 20,
+        "Rating": 7,
+        "Conclusion": "Solid structure, needs tests.",
+    }
+    return {
+        "review": {"created_at": time.time(), "review": review},
+        "blob": next(iter(contents.values())),
+        "repo": contents,
+    }
+
+
+def _codecs(min_bytes: int) -> dict[str, CacheCodec]:
+    codecs = {"legacy json": None}
+    for serializer, compression in (
+        ("json", "none"),
+        ("orjson", "none"),
+        ("msgpack", "none"),
+        ("orjson", "zlib"),
+        ("orjson", "zstd"),
+        ("orjson", "lz4"),
+    ):
+        if PACKAGES.get(serializer, True) and PACKAGES.get(compression, True):
+            codecs[f"{serializer}+{compression}"] = CacheCodec(
+                serializer, compression, compression_min_bytes=min_bytes
+            )
+    return codecs
+
+
+def _throughput(func, value, size: int, min_time: float) -> float:
+    runs = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < min_time or not runs:
+        func(value)
+        runs += 1
+    return size * runs / elapsed / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Encode/decode throughput and stored size of cache values"
+    )
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--file-size", type=int, default=2048)
+    parser.add_argument("--min-bytes", type=int, default=1024)
+    parser.add_argument("--min-time", type=float, default=0.5)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    redis_client = None
+    if args.redis_url:
+        from redis import Redis
+
+        redis_client = Redis.from_url(args.redis_url)
+
+    print(
+        f"{'payload':<8}{'codec':<16}{'encode MB/s':>12}{'decode MB/s':>12}"
+        f"{'stored B':>11}{'redis B':>10}"
+    )
+    for name, value in _payloads(args.files, args.file_size).items():
+        raw_size = len(json.dumps(value).encode())
+        for label, codec in _codecs(args.min_bytes).items():
+            if codec is None:
+                def encode(item):
+                    return json.dumps(item).encode()
+
+                decode = json.loads
+            else:
+                encode, decode = codec.encode, codec.decode
+
+            encoded = encode(value)
+            assert decode(encoded) == value
+            memory = "-"
+            if redis_client is not None:
+                key = f"bench:cache_codec:{name}:{label}"
+                redis_client.set(key, encoded)
+                memory = redis_client.memory_usage(key, samples=0)
+                redis_client.delete(key)
+
+            encode_rate = _throughput(encode, value, raw_size, args.min_time)
+            decode_rate = _throughput(
+                decode, encoded, raw_size, args.min_time
+            )
+            print(
+                f"{name:<8}{label:<16}{encode_rate:>12.0f}"
+                f"{decode_rate:>12.0f}{len(encoded):>11}{memory:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
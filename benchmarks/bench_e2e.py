@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.fake_github import create_fake_github_app
+from benchmarks.fake_openai import create_fake_openai_app
+from benchmarks.utils import request_count, run_server, start_server
+from settings import GITHUB_FETCH_MODES
+
+
+def create_review_app() -> FastAPI:
+    logging.disable(logging.INFO)
+
+    from main import app
+
+    return app
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    index = max(int(round(len(ordered) * percent / 100)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def _memory_mb(pid: int) -> dict[str, float | None]:
+    usage: dict[str, float | None] = {"rss": None, "peak_rss": None}
+    try:
+        with open(f"/proc/{pid}/status") as status_file:
+            for line in status_file:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    name = "rss" if key == "VmRSS" else "peak_rss"
+                    usage[name] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        pass
+    return usage
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _drive(
+    base_url: str, requests: int, concurrency: int, repos: int
+) -> tuple[list[float], Counter, float]:
+    latencies: list[float] = []
+    status_codes: Counter = Counter()
+    next_request = iter(range(requests))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+
+        async def run_client() -> None:
+            for index in next_request:
+                repo = "repo" if index % repos == 0 else (
+                    f"repo-{index % repos}"
+                )
+                start = time.perf_counter()
+                response = await client.post(
+                    "/review",
+                    json={
+                        "assignment_description": "Build a REST API",
+                        "github_repo_url": f"https://github.com/owner/{repo}",
+                        "candidate_level": "middle",
+                    },
+                )
+                latencies.append(time.perf_counter() - start)
+                status_codes[response.status_code] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_client() for _ in range(concurrency)))
+        duration = time.perf_counter() - start
+
+    return latencies, status_codes, duration
+
+
+def _summarize(
+    latencies: list[float], status_codes: Counter, duration: float
+) -> dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": sum(
+            count for code, count in status_codes.items() if code != 200
+        ),
+        "status_codes": {
+            str(code): count for code, count in sorted(status_codes.items())
+        },
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(ordered) / duration, 2),
+        "latency_ms": {
+            "mean": round(statistics.mean(ordered) * 1000, 1),
+            "p50": round(_percentile(ordered, 50) * 1000, 1),
+            "p95": round(_percentile(ordered, 95) * 1000, 1),
+            "p99": round(_percentile(ordered, 99) * 1000, 1),
+            "max": round(ordered[-1] * 1000, 1),
+        },
+    }
+
+
+def _print_report(report: dict[str, Any], baseline: dict | None) -> None:
+    results = report["results"]
+    rows = [
+        ("throughput rps", results["throughput_rps"], "throughput_rps"),
+        ("p50 ms", results["latency_ms"]["p50"], "latency_ms.p50"),
+        ("p95 ms", results["latency_ms"]["p95"], "latency_ms.p95"),
+        ("p99 ms", results["latency_ms"]["p99"], "latency_ms.p99"),
+        ("errors", results["errors"], "errors"),
+        (
+            "github requests",
+            results["upstream_requests"]["github"],
+            "upstream_requests.github",
+        ),
+        (
+            "openai requests",
+            results["upstream_requests"]["openai"],
+            "upstream_requests.openai",
+        ),
+        (
+            "peak rss MB",
+            results["memory_mb"]["peak_rss"],
+            "memory_mb.peak_rss",
+        ),
+    ]
+
+    print(f"{'metric':<18}{'value':>12}{'baseline':>12}")
+    for label, value, path in rows:
+        previous: Any = baseline["results"] if baseline else None
+        for key in path.split("."):
+            previous = previous.get(key) if previous else None
+        print(
+            f"{label:<18}{str(value):>12}"
+            f"{'' if previous is None else str(previous):>12}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Drive /review end to end against fake GitHub and OpenAI"
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--repos", type=int, default=10)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--file-size", type=int, default=2048)
+    parser.add_argument("--github-latency", type=float, default=0.02)
+    parser.add_argument("--openai-latency", type=float, default=0.5)
+    parser.add_argument("--openai-tokens-per-second", type=float, default=0)
+    parser.add_argument(
+        "--fetch-mode", choices=GITHUB_FETCH_MODES, default="tree"
+    )
+    parser.add_argument("--redis-url", default="redis://127.0.0.1:6379")
+    parser.add_argument("--output", default="bench_e2e.json")
+    parser.add_argument("--baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    github_kwargs = {
+        "num_files": args.files,
+        "file_size": args.file_size,
+        "latency": args.github_latency,
+        "num_repos": args.repos,
+    }
+    openai_kwargs = {
+        "latency": args.openai_latency,
+        "tokens_per_second": args.openai_tokens_per_second,
+    }
+
+    with run_server(
+        create_fake_github_app, github_kwargs
+    ) as github_url, run_server(
+        create_fake_openai_app, openai_kwargs
+    ) as openai_url, tempfile.TemporaryDirectory() as snapshot_dir:
+        os.environ.update(
+            {
+                "GITHUB_API_URL": github_url,
+                "GITHUB_FETCH_MODE": args.fetch_mode,
+                "OPENAI_BASE_URL": f"{openai_url}/v1",
+                "OPENAI_API_KEY": "benchmark",
+                "LLM_BACKEND": "openai",
+                "REDIS_URL": args.redis_url,
+                "SNAPSHOT_STORE_DIR": snapshot_dir,
+                "LLM_TOKENS_PER_MINUTE": os.getenv(
+                    "LLM_TOKENS_PER_MINUTE", "0"
+                ),
+                "LLM_REQUESTS_PER_MINUTE": os.getenv(
+                    "LLM_REQUESTS_PER_MINUTE", "0"
+                ),
+            }
+        )
+        with start_server(create_review_app, lifespan="on") as (
+            app_url,
+            app_process,
+        ):
+            latencies, status_codes, duration = asyncio.run(
+                _drive(app_url, args.requests, args.concurrency, args.repos)
+            )
+            results = _summarize(latencies, status_codes, duration)
+            results["memory_mb"] = _memory_mb(app_process.pid)
+
+        results["upstream_requests"] = {
+            "github": request_count(github_url),
+            "openai": request_count(openai_url),
+        }
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print(
+        f"{args.requests} reviews of {args.repos} repos x {args.files} files, "
+        f"concurrency {args.concurrency}, {args.fetch_mode} mode"
+    )
+    _print_report(report, baseline)
+    print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import logging
+import time
+
+from app.services.github_service import GitHubService
+from benchmarks.fake_github import create_fake_github_app
+from benchmarks.utils import request_count, run_server
+from settings import GITHUB_FETCH_MODES
+
+
+async def _run_mode(base_url: str, mode: str) -> tuple[float, int]:
+    service = GitHubService(fetch_mode=mode)
+    service.API_HOST = base_url.rstrip("/")
+
+    start = time.perf_counter()
+    structure = await service.main("https://github.com/owner/repo")
+    return time.perf_counter() - start, len(structure)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare GitHub fetch modes against a fake GitHub server"
+    )
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--file-size", type=int, default=2048)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    app_kwargs = {
+        "num_files": args.files,
+        "file_size": args.file_size,
+        "latency": args.latency,
+    }
+
+    print(
+        f"{args.files} files x {args.file_size} B, "
+        f"{args.latency * 1000:.0f} ms simulated latency per request"
+    )
+    print(f"{'mode':<10}{'requests':>10}{'files':>8}{'wall time':>12}")
+
+    with run_server(create_fake_github_app, app_kwargs) as base_url:
+        for mode in GITHUB_FETCH_MODES:
+            request_count(base_url, reset=True)
+            elapsed, files = asyncio.run(_run_mode(base_url, mode))
+            print(
+                f"{mode:<10}{request_count(base_url):>10}"
+                f"{files:>8}{elapsed:>11.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
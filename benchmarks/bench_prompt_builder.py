@@ -0,0 +1,93 @@
+import argparse
+import logging
+import time
+import tracemalloc
+
+from app.services.openai_services import OpenAIService, REVIEW_FORMAT
+from app.services.repo_model import RepoFile, Repository
+from benchmarks.bench_repo_model import legacy_tree
+from benchmarks.fake_github import make_synthetic_repo
+
+
+def legacy_format(repo_data: list[dict], indent=0) -> str:
+    formatted_data = ""
+    for item in repo_data:
+        if item.get("type") == "file":
+            formatted_data += " " * indent + (
+                f"File: {item['name']}\n"
+                f"Content:\n"
+                f"{item['content']}\n\n"
+            )
+        elif item.get("type") == "dir":
+            formatted_data += " " * indent + f"Directory: {item['name']}\n"
+            formatted_data += legacy_format(item["content"], indent + 2)
+    return formatted_data
+
+
+def legacy_prompt(repo_data: list[dict]) -> str:
+    formatted_data_from_github = legacy_format(repo_data)
+    return (
+        f"Here is a repository with the following files: "
+        f"{formatted_data_from_github}. "
+        f"Description: Build an API. "
+        f"Analyze the code for a junior developer, "
+        f"and provide feedback."
+        f"{REVIEW_FORMAT}"
+    )
+
+
+def _measure(func) -> tuple[float, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(result)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Legacy string concatenation vs streaming prompt builder"
+    )
+    parser.add_argument(
+        "--files", type=int, nargs="+", default=[1000, 10000]
+    )
+    parser.add_argument("--file-size", type=int, default=2048)
+    parser.add_argument("--files-per-dir", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    service = OpenAIService.__new__(OpenAIService)
+
+    print(
+        f"{'files':>7}  {'builder':<10}{'time ms':>10}"
+        f"{'peak MB':>10}{'prompt MB':>11}"
+    )
+    for num_files in args.files:
+        repo = make_synthetic_repo(
+            num_files, args.file_size, args.files_per_dir
+        )
+        files = {path: data.decode() for path, data in repo.files.items()}
+        repo_data = Repository(
+            [RepoFile(path, content) for path, content in files.items()],
+            list(repo.directories),
+        )
+        repo_tree = legacy_tree(files, repo.directories)
+
+        builders = {
+            "legacy": lambda: legacy_prompt(repo_tree),
+            "streaming": lambda: service._build_review_prompt(
+                repo_data, "junior", "Build an API"
+            ),
+        }
+        for name, builder in builders.items():
+            elapsed, peak, length = _measure(builder)
+            print(
+                f"{num_files:>7}  {name:<10}{elapsed * 1000:>10.1f}"
+                f"{peak / 2**20:>10.1f}{length / 2**20:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
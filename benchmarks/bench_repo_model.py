@@ -0,0 +1,111 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from app.services.repo_model import RepoFile, Repository
+from benchmarks.fake_github import git_blob_sha, make_synthetic_repo
+
+
+def legacy_tree(files: dict[str, str], directories: list[str]) -> list[dict]:
+    root: list[dict] = []
+    nodes = {"": root}
+    for directory in sorted(directories):
+        parent, _, name = directory.rpartition("/")
+        content: list[dict] = []
+        nodes[parent].append({"name": name, "type": "dir", "content": content})
+        nodes[directory] = content
+    for path, content in files.items():
+        parent, _, name = path.rpartition("/")
+        nodes[parent].append(
+            {
+                "name": name,
+                "type": "file",
+                "content": content,
+                "tokens": len(content) // 4,
+            }
+        )
+    return root
+
+
+def model_tree(
+    files: dict[str, str], shas: dict[str, str], directories: list[str]
+) -> Repository:
+    return Repository(
+        [
+            RepoFile(
+                path, content, sha=shas[path], tokens=len(content) // 4
+            )
+            for path, content in files.items()
+        ],
+        list(directories),
+    )
+
+
+def legacy_paths(repo_data: list[dict], prefix: str = "") -> list[str]:
+    paths = []
+    for item in repo_data:
+        if item["type"] == "file":
+            paths.append(f"{prefix}{item['name']}")
+        else:
+            paths.extend(
+                legacy_paths(item["content"], f"{prefix}{item['name']}/")
+            )
+    return paths
+
+
+def _measure(build) -> tuple[object, float, int]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    structure = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return structure, elapsed, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Nested repository dicts vs the compact repository model"
+    )
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--file-size", type=int, default=2048)
+    parser.add_argument("--files-per-dir", type=int, default=10)
+    args = parser.parse_args()
+
+    repo = make_synthetic_repo(args.files, args.file_size, args.files_per_dir)
+    files = {path: data.decode() for path, data in repo.files.items()}
+    shas = {path: git_blob_sha(data) for path, data in repo.files.items()}
+    content_bytes = sum(len(content) for content in files.values())
+
+    print(
+        f"{args.files} files in {len(repo.directories)} directories, "
+        f"{content_bytes / 2**20:.1f} MB of content shared by both layouts"
+    )
+    print(f"{'layout':<10}{'build ms':>10}{'overhead MB':>13}{'paths ms':>10}")
+
+    layouts = {
+        "nested": (
+            lambda: legacy_tree(files, repo.directories),
+            legacy_paths,
+        ),
+        "model": (
+            lambda: model_tree(files, shas, repo.directories),
+            lambda repository: repository.paths,
+        ),
+    }
+    for name, (build, list_paths) in layouts.items():
+        structure, elapsed, size = _measure(build)
+        start = time.perf_counter()
+        list_paths(structure)
+        paths_elapsed = time.perf_counter() - start
+        print(
+            f"{name:<10}{elapsed * 1000:>10.1f}{size / 2**20:>13.2f}"
+            f"{paths_elapsed * 1000:>10.1f}"
+        )
+        del structure
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import logging
+import time
+
+import tiktoken
+
+from app.services.openai_services import OpenAIService
+from app.services.repo_model import RepoFile, Repository
+from app.services.token_counter import TokenCounter, get_encoding
+from benchmarks.fake_github import git_blob_sha, make_synthetic_repo
+from settings import OPENAI_MODEL
+
+
+def _timed(label: str, func) -> None:
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<34}{elapsed:>10.1f} ms{result:>12}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Full-prompt vs per-file token counting"
+    )
+    parser.add_argument("--size-mb", type=float, default=5.0)
+    parser.add_argument("--file-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    num_files = int(args.size_mb * 1024 * 1024 / args.file_size)
+    repo = make_synthetic_repo(num_files, args.file_size)
+    files = {path: data.decode() for path, data in repo.files.items()}
+    shas = {path: git_blob_sha(data) for path, data in repo.files.items()}
+    repo_data = Repository(
+        [RepoFile(path, content) for path, content in files.items()],
+        list(repo.directories),
+    )
+    service = OpenAIService.__new__(OpenAIService)
+
+    print(f"{num_files} files, {args.size_mb} MB, model {OPENAI_MODEL}")
+    print(f"{'strategy':<34}{'time':>13}{'tokens':>12}")
+
+    def full_prompt() -> int:
+        encoding = tiktoken.encoding_for_model(OPENAI_MODEL)
+        prompt = service._format_repo_data_for_prompt(repo_data)
+        return len(encoding.encode(prompt))
+
+    _timed("load encoder + encode full prompt", full_prompt)
+    get_encoding(OPENAI_MODEL)
+    _timed(
+        "cached encoder, full prompt",
+        lambda: len(
+            get_encoding(OPENAI_MODEL).encode(
+                service._format_repo_data_for_prompt(repo_data)
+            )
+        ),
+    )
+
+    counter = TokenCounter()
+
+    def per_file() -> int:
+        return sum(
+            counter.count(content, shas[path])
+            for path, content in files.items()
+        )
+
+    _timed("per-file, cold SHA memo", per_file)
+    _timed("per-file, warm SHA memo", per_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import base64
+import hashlib
+import io
+import tarfile
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    Response,
+)
+
+from benchmarks.utils import add_request_stats
+
+
+def git_blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeRepo:
+    def __init__(self, files: dict[str, bytes]) -> None:
+        self.files = dict(sorted(files.items()))
+        self.blobs = {git_blob_sha(data): data for data in files.values()}
+        self.directories = sorted(
+            {
+                path.rsplit("/", i)[0]
+                for path in self.files
+                for i in range(1, path.count("/") + 1)
+            }
+        )
+        self.commit_sha = hashlib.sha1(
+            b"".join(git_blob_sha(data).encode() for data in files.values())
+        ).hexdigest()
+        self._archive: bytes | None = None
+
+    def list_directory(self, path: str) -> list[tuple[str, str]]:
+        prefix = f"{path}/" if path else ""
+        children: dict[str, str] = {}
+        for candidate in [*self.directories, *self.files]:
+            if not candidate.startswith(prefix):
+                continue
+            name = candidate[len(prefix):]
+            if name and "/" not in name:
+                children[name] = (
+                    "dir" if candidate in self.directories else "file"
+                )
+        return sorted(children.items())
+
+    def archive(self) -> bytes:
+        if self._archive is None:
+            buffer = io.BytesIO()
+            root = f"owner-repo-{self.commit_sha[:7]}"
+            with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+                for directory in ["", *self.directories]:
+                    info = tarfile.TarInfo(f"{root}/{directory}".rstrip("/"))
+                    info.type = tarfile.DIRTYPE
+                    tar.addfile(info)
+                for path, data in self.files.items():
+                    info = tarfile.TarInfo(f"{root}/{path}")
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+            self._archive = buffer.getvalue()
+        return self._archive
+
+
+def _contents_entry(
+    fake_repo: FakeRepo, base: str, full_name: str, path: str, entry_type: str
+) -> dict[str, Any]:
+    data = fake_repo.files.get(path, b"")
+    return {
+        "name": path.rsplit("/", 1)[-1],
+        "path": path,
+        "sha": git_blob_sha(data) if entry_type == "file" else "",
+        "size": len(data) if entry_type == "file" else 0,
+        "type": entry_type,
+        "url": f"{base}repos/{full_name}/contents/{path}",
+    }
+
+
+def _conditional_json(request: Request, data: Any) -> Response:
+    response = JSONResponse(data)
+    etag = f'"{hashlib.sha1(response.body).hexdigest()}"'
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return response
+
+
+def make_synthetic_repo(
+    num_files: int,
+    file_size: int = 2048,
+    files_per_dir: int = 10,
+    seed: int = 0,
+) -> FakeRepo:
+    files = {}
+    for index in range(num_files):
+        directory = "/".join(
+            f"pkg{part}" for part in str(index // files_per_dir)
+        )
+        line = (
+            f"def func_{index}(value):\n"
+            f"    return value * {index + seed}\n"
+        )
+        body = (line * (file_size // len(line) + 1))[:file_size]
+        files[f"{directory}/module_{index}.py"] = body.encode()
+    return FakeRepo(files)
+
+
+def create_fake_github_app(
+    repos: dict[str, FakeRepo] | None = None,
+    latency: float = 0.0,
+    num_files: int = 0,
+    file_size: int = 2048,
+    num_repos: int = 1,
+) -> FastAPI:
+    if repos is None:
+        repos = {"owner/repo": make_synthetic_repo(num_files, file_size)}
+        for index in range(1, num_repos):
+            repos[f"owner/repo-{index}"] = make_synthetic_repo(
+                num_files, file_size, seed=index
+            )
+
+    app = FastAPI()
+    add_request_stats(app, latency)
+
+    def get_repo(owner: str, repo: str) -> FakeRepo:
+        fake_repo = repos.get(f"{owner}/{repo}")
+        if fake_repo is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return fake_repo
+
+    @app.get("/repos/{owner}/{repo}/contents")
+    @app.get("/repos/{owner}/{repo}/contents/{path:path}")
+    async def contents(
+        request: Request, owner: str, repo: str, path: str = ""
+    ):
+        fake_repo = get_repo(owner, repo)
+        base = str(request.base_url)
+        full_name = f"{owner}/{repo}"
+        if path in fake_repo.files:
+            entry = _contents_entry(fake_repo, base, full_name, path, "file")
+            entry["encoding"] = "base64"
+            entry["content"] = base64.b64encode(
+                fake_repo.files[path]
+            ).decode()
+            return entry
+        if path and path not in fake_repo.directories:
+            raise HTTPException(status_code=404, detail="Not Found")
+        prefix = f"{path}/" if path else ""
+        return _conditional_json(
+            request,
+            [
+                _contents_entry(
+                    fake_repo, base, full_name, f"{prefix}{name}", entry_type
+                )
+                for name, entry_type in fake_repo.list_directory(path)
+            ],
+        )
+
+    @app.get("/repos/{owner}/{repo}/commits/{ref}")
+    async def commit(owner: str, repo: str, ref: str):
+        return PlainTextResponse(get_repo(owner, repo).commit_sha)
+
+    @app.get("/repos/{owner}/{repo}/git/trees/{ref}")
+    async def tree(request: Request, owner: str, repo: str, ref: str):
+        fake_repo = get_repo(owner, repo)
+        base = str(request.base_url)
+        items = [
+            {"path": path, "mode": "040000", "type": "tree", "sha": ""}
+            for path in fake_repo.directories
+        ]
+        for path, data in fake_repo.files.items():
+            sha = git_blob_sha(data)
+            items.append(
+                {
+                    "path": path,
+                    "mode": "100644",
+                    "type": "blob",
+                    "sha": sha,
+                    "size": len(data),
+                    "url": f"{base}repos/{owner}/{repo}/git/blobs/{sha}",
+                }
+            )
+        items.sort(key=lambda item: item["path"])
+        return _conditional_json(
+            request,
+            {"sha": fake_repo.commit_sha, "tree": items, "truncated": False},
+        )
+
+    @app.get("/repos/{owner}/{repo}/git/blobs/{sha}")
+    async def blob(owner: str, repo: str, sha: str):
+        data = get_repo(owner, repo).blobs.get(sha)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return {
+            "sha": sha,
+            "size": len(data),
+            "encoding": "base64",
+            "content": base64.b64encode(data).decode(),
+        }
+
+    @app.get("/repos/{owner}/{repo}/tarball")
+    @app.get("/repos/{owner}/{repo}/tarball/{ref}")
+    async def tarball(
+        request: Request, owner: str, repo: str, ref: str | None = None
+    ):
+        get_repo(owner, repo)
+        return RedirectResponse(
+            f"{request.base_url}codeload/{owner}/{repo}/tar.gz",
+            status_code=302,
+        )
+
+    @app.get("/codeload/{owner}/{repo}/tar.gz")
+    async def codeload(owner: str, repo: str):
+        return Response(
+            get_repo(owner, repo).archive(), media_type="application/x-gzip"
+        )
+
+    return app
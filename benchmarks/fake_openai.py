@@ -0,0 +1,98 @@
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator
+
+from fastapi import Body, FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.services.llm_backends import StubBackend
+from benchmarks.utils import add_request_stats
+
+
+def _chunk(
+    completion_id: str, model: str, content: str | None
+) -> dict[str, Any]:
+    return {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "delta": {"content": content} if content else {},
+                "finish_reason": None if content else "stop",
+            }
+        ],
+    }
+
+
+def _usage(messages: list[dict[str, str]], content: str) -> dict[str, int]:
+    prompt_tokens = sum(
+        len(message["content"]) for message in messages
+    ) // StubBackend.CHARS_PER_TOKEN
+    completion_tokens = len(content) // StubBackend.CHARS_PER_TOKEN
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_fake_openai_app(
+    latency: float = 0.5,
+    tokens_per_second: float = 0.0,
+    response_tokens: int = 200,
+) -> FastAPI:
+    backend = StubBackend(
+        latency=latency,
+        tokens_per_second=tokens_per_second,
+        response_tokens=response_tokens,
+        error_rate=0,
+    )
+
+    app = FastAPI()
+    add_request_stats(app)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(payload: dict[str, Any] = Body(...)):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = payload["model"]
+        messages = payload["messages"]
+
+        if payload.get("stream"):
+
+            async def events() -> AsyncIterator[str]:
+                content = []
+                async for text in backend.stream(messages):
+                    content.append(text)
+                    chunk = _chunk(completion_id, model, text)
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                chunk = _chunk(completion_id, model, None)
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if payload.get("stream_options", {}).get("include_usage"):
+                    usage = _usage(messages, "".join(content))
+                    chunk = {**chunk, "choices": [], "usage": usage}
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        content = await backend.complete(messages)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": _usage(messages, content),
+        }
+
+    return app
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from shutil import which
+
+from app.services.github_service import GitHubService
+from app.services.http_client import create_github_client
+from benchmarks.fake_github import create_fake_github_app
+from benchmarks.utils import run_server
+
+
+def _generate_certificate(directory: str) -> tuple[str, str] | None:
+    if which("openssl") is None:
+        return None
+
+    keyfile = os.path.join(directory, "key.pem")
+    certfile = os.path.join(directory, "cert.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", keyfile, "-out", certfile,
+            "-days", "1", "-subj", "/CN=127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return keyfile, certfile
+
+
+async def _review(base_url: str, client) -> float:
+    service = GitHubService(fetch_mode="tree", client=client)
+    service.API_HOST = base_url
+
+    start = time.perf_counter()
+    await service.main("https://github.com/owner/repo")
+    return time.perf_counter() - start
+
+
+async def _run_unshared(base_url: str, reviews: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_review() -> float:
+        async with semaphore:
+            async with create_github_client(verify=False) as client:
+                return await _review(base_url, client)
+
+    return await asyncio.gather(*(one_review() for _ in range(reviews)))
+
+
+async def _run_shared(base_url: str, reviews: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with create_github_client(verify=False) as client:
+
+        async def one_review() -> float:
+            async with semaphore:
+                return await _review(base_url, client)
+
+        return await asyncio.gather(*(one_review() for _ in range(reviews)))
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<14}{statistics.mean(ordered) * 1000:>10.1f}"
+        f"{statistics.median(ordered) * 1000:>10.1f}{p95 * 1000:>10.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-review latency with and without a shared pool"
+    )
+    parser.add_argument("--reviews", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--files", type=int, default=10)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        certificate = _generate_certificate(directory)
+        ssl_kwargs = {}
+        if certificate:
+            ssl_kwargs = {
+                "ssl_keyfile": certificate[0],
+                "ssl_certfile": certificate[1],
+            }
+
+        with run_server(
+            create_fake_github_app, {"num_files": args.files}, **ssl_kwargs
+        ) as base_url:
+            print(
+                f"{args.reviews} reviews of {args.files} files, "
+                f"concurrency {args.concurrency}, "
+                f"{'TLS' if certificate else 'plain HTTP'}"
+            )
+            print(f"{'pool':<14}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+            _report(
+                "per-review",
+                asyncio.run(
+                    _run_unshared(base_url, args.reviews, args.concurrency)
+                ),
+            )
+            _report(
+                "shared",
+                asyncio.run(
+                    _run_shared(base_url, args.reviews, args.concurrency)
+                ),
+            )
+
+
+if __name__ == "__main__":
+    main()
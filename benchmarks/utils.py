@@ -0,0 +1,109 @@
+import asyncio
+import multiprocessing
+import socket
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"Server on port {port} did not start in {timeout}s")
+
+
+def _serve(
+    app_factory: Callable[..., FastAPI],
+    factory_kwargs: dict[str, Any],
+    port: int,
+    config_kwargs: dict[str, Any],
+) -> None:
+    config = uvicorn.Config(
+        app_factory(**factory_kwargs),
+        host="127.0.0.1",
+        port=port,
+        log_level="warning",
+        **{"lifespan": "off", **config_kwargs},
+    )
+    uvicorn.Server(config).run()
+
+
+@contextmanager
+def start_server(
+    app_factory: Callable[..., FastAPI],
+    factory_kwargs: dict[str, Any] | None = None,
+    **config_kwargs,
+) -> Iterator[tuple[str, multiprocessing.Process]]:
+    port = _free_port()
+    process = multiprocessing.get_context("spawn").Process(
+        target=_serve,
+        args=(app_factory, factory_kwargs or {}, port, config_kwargs),
+        daemon=True,
+    )
+    process.start()
+
+    try:
+        _wait_for_port(port)
+        scheme = "https" if config_kwargs.get("ssl_certfile") else "http"
+        yield f"{scheme}://127.0.0.1:{port}", process
+    finally:
+        process.terminate()
+        process.join()
+
+
+@contextmanager
+def run_server(
+    app_factory: Callable[..., FastAPI],
+    factory_kwargs: dict[str, Any] | None = None,
+    **config_kwargs,
+) -> Iterator[str]:
+    with start_server(app_factory, factory_kwargs, **config_kwargs) as (
+        base_url,
+        _,
+    ):
+        yield base_url
+
+
+def add_request_stats(app: FastAPI, latency: float = 0.0) -> None:
+    app.state.request_count = 0
+
+    @app.middleware("http")
+    async def count_requests(request: Request, call_next):
+        if request.url.path.startswith("/_stats"):
+            return await call_next(request)
+
+        app.state.request_count += 1
+        if latency:
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    @app.get("/_stats")
+    async def stats():
+        return {"request_count": app.state.request_count}
+
+    @app.post("/_stats/reset")
+    async def reset_stats():
+        request_count, app.state.request_count = app.state.request_count, 0
+        return {"request_count": request_count}
+
+
+def request_count(base_url: str, reset: bool = False) -> int:
+    with httpx.Client(base_url=base_url, verify=False) as client:
+        if reset:
+            return client.post("/_stats/reset").json()["request_count"]
+        return client.get("/_stats").json()["request_count"]
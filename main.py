@@ -1,20 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Literal
+
 import json
-from typing import Any
 
-from fastapi import FastAPI
+import httpx
+from fastapi import Depends, FastAPI, Request
 from fastapi import HTTPException, status
-from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl
 from redis.asyncio import Redis
 
+from app.services.blob_cache import BlobCache
+from app.services.http_client import create_github_client
 from app.services.manage_api_service import ManageAPIService
-from settings import setup_logger, REDIS_URL
+from app.services.metrics import REGISTRY
+from app.services.model_router import ModelRouter
+from app.services.offload import offloader
+from app.services.review_cache import (
+    ChunkReviewCache,
+    ReviewCache,
+    ReviewHistory,
+)
+from app.services.review_jobs import ReviewJobQueue, validate_webhook_url
+from app.services.single_flight import SingleFlight
+from app.services.snapshot_store import SnapshotStore
+from app.services.token_counter import get_encoding
+from settings import (
+    setup_logger,
+    BLOB_CACHE_REDIS_ENABLED,
+    OPENAI_MODEL,
+    REDIS_URL,
+    REVIEW_BATCH_CONCURRENCY,
+    REVIEW_BATCH_MAX_SUBMISSIONS,
+    SNAPSHOT_STORE_ENABLED,
+)
 
 logger = setup_logger()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    try:
+        get_encoding(OPENAI_MODEL)
+    except Exception as exc:
+        logger.warning(f"Failed to load tokenizer for {OPENAI_MODEL}: {exc}")
+
+    async with create_github_client() as github_client:
+        app.state.github_client = github_client
+        yield
+
+    offloader.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 redis_client = Redis.from_url(REDIS_URL)
 
+blob_cache = BlobCache(
+    redis_client=redis_client if BLOB_CACHE_REDIS_ENABLED else None
+)
+
+review_cache = ReviewCache(redis_client)
+
+chunk_review_cache = ChunkReviewCache(redis_client)
+
+review_history = ReviewHistory(redis_client)
+
+review_single_flight = SingleFlight(redis_client)
+
+review_job_queue = ReviewJobQueue(redis_client)
+
+model_router = ModelRouter()
+
+snapshot_store = SnapshotStore() if SNAPSHOT_STORE_ENABLED else None
+
 
 class ReviewRequest(BaseModel):
     assignment_description: str
@@ -22,44 +83,288 @@ class ReviewRequest(BaseModel):
     candidate_level: str
 
 
+class BatchSubmission(BaseModel):
+    github_repo_url: str
+    candidate_level: str
+
+
+class BatchReviewRequest(BaseModel):
+    assignment_description: str
+    submissions: list[BatchSubmission] = Field(
+        min_length=1, max_length=REVIEW_BATCH_MAX_SUBMISSIONS
+    )
+    output_format: Literal["results", "openai_batch"] = "results"
+
+
+class ReviewJobRequest(ReviewRequest):
+    webhook_url: HttpUrl | None = None
+
+
+def get_github_client(request: Request) -> httpx.AsyncClient | None:
+    return getattr(request.app.state, "github_client", None)
+
+
+async def get_review(
+    manage_api_service: ManageAPIService,
+    repo_url: str,
+    candidate_level: str,
+    assignment_description: str,
+) -> dict[str, Any]:
+    try:
+        cache_key = await manage_api_service.get_review_cache_key(
+            repo_url, candidate_level, assignment_description
+        )
+    except Exception as exc:
+        logger.info(f"Failed to resolve cache key. Error: '{exc}'")
+        cache_key = None
+
+    async def run_review() -> dict[str, Any]:
+        return await manage_api_service.main(
+            repo_url, candidate_level, assignment_description
+        )
+
+    if not cache_key:
+        return await run_review()
+
+    cached = await review_cache.get(cache_key)
+    if cached:
+        cached_result, stale = cached
+        logger.info(f"Found cached result for '{repo_url}'")
+        if stale:
+            review_cache.refresh_in_background(cache_key, run_review)
+        return cached_result
+
+    async def run_and_cache_review() -> dict[str, Any]:
+        result = await run_review()
+        await review_cache.set(cache_key, result)
+        return result
+
+    return await review_single_flight.do(cache_key, run_and_cache_review)
+
+
 @app.post("/review")
-async def review(request: ReviewRequest) -> dict[str, Any]:
+async def review(
+    request: ReviewRequest,
+    github_client: httpx.AsyncClient | None = Depends(get_github_client),
+) -> dict[str, Any]:
     try:
         logger.info(
             f"Trying to fetch repo contents for '{request.github_repo_url}'"
         )
-        cache_key = f"{request.github_repo_url}_{request.candidate_level}"
-
-        try:
-            cached_result = await redis_client.get(cache_key)
-            if cached_result:
-                logger.info(
-                    f"Found cached result for '{request.github_repo_url}'"
-                )
-                return json.loads(cached_result)
-        except Exception as exc:
-            logger.info(
-                f"Failed to fetch cached result. Error: '{exc}'"
-            )
+        manage_api_service = ManageAPIService(
+            github_client,
+            blob_cache,
+            chunk_review_cache,
+            model_router,
+            snapshot_store,
+            review_history,
+        )
 
-        result = await ManageAPIService().main(
+        return await get_review(
+            manage_api_service,
             request.github_repo_url,
             request.candidate_level,
-            request.assignment_description
+            request.assignment_description,
         )
+    except HTTPException as exc:
+        raise exc
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(exc),
+        )
+
+
+@app.post("/review/batch")
+async def review_batch(
+    request: BatchReviewRequest,
+    github_client: httpx.AsyncClient | None = Depends(get_github_client),
+) -> StreamingResponse:
+    manage_api_service = ManageAPIService(
+        github_client,
+        blob_cache,
+        chunk_review_cache,
+        model_router,
+        snapshot_store,
+        review_history,
+        priority="batch",
+    )
+    semaphore = asyncio.Semaphore(REVIEW_BATCH_CONCURRENCY)
+
+    logger.info(
+        f"Starting batch review of {len(request.submissions)} submissions"
+    )
+
+    async def run(
+        index: int, submission: BatchSubmission
+    ) -> dict[str, Any] | None:
+        result: dict[str, Any] = {
+            "index": index,
+            "github_repo_url": submission.github_repo_url,
+        }
+        async with semaphore:
+            try:
+                if request.output_format == "openai_batch":
+                    return {
+                        "custom_id": f"submission-{index}",
+                        **await manage_api_service.build_batch_request(
+                            submission.github_repo_url,
+                            submission.candidate_level,
+                            request.assignment_description,
+                        ),
+                    }
+
+                result["review"] = await get_review(
+                    manage_api_service,
+                    submission.github_repo_url,
+                    submission.candidate_level,
+                    request.assignment_description,
+                )
+                result["status"] = "completed"
+            except HTTPException as exc:
+                result["status"] = "failed"
+                result["error"] = {
+                    "status_code": exc.status_code,
+                    "detail": jsonable_encoder(exc.detail),
+                }
+            except Exception as exc:
+                logger.error(
+                    f"Batch review failed for "
+                    f"'{submission.github_repo_url}'. Error: '{exc}'"
+                )
+                result["status"] = "failed"
+                result["error"] = {
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": str(exc),
+                }
+
+        if request.output_format == "openai_batch":
+            logger.warning(
+                f"Leaving submission {index} "
+                f"('{submission.github_repo_url}') out of the batch file. "
+                f"Error: '{result['error']['detail']}'"
+            )
+            return None
+        return result
+
+    async def results() -> AsyncIterator[str]:
+        tasks = [
+            asyncio.ensure_future(run(index, submission))
+            for index, submission in enumerate(request.submissions)
+        ]
+        failed = 0
+        try:
+            for task in asyncio.as_completed(tasks):
+                line = await task
+                if line is None:
+                    failed += 1
+                    continue
+                yield json.dumps(line) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if failed:
+            logger.warning(
+                f"Batch file is missing {failed} of {len(tasks)} "
+                f"submissions that failed to build"
+            )
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+def format_sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
 
+@app.post("/review/stream")
+async def review_stream(
+    request: ReviewRequest,
+    github_client: httpx.AsyncClient | None = Depends(get_github_client),
+) -> StreamingResponse:
+    manage_api_service = ManageAPIService(
+        github_client,
+        blob_cache,
+        chunk_review_cache,
+        model_router,
+        snapshot_store,
+        review_history,
+    )
+
+    async def events() -> AsyncIterator[str]:
+        yield format_sse("started", {"repo_url": request.github_repo_url})
         try:
-            await redis_client.set(cache_key, json.dumps(result), ex=300)
+            async for event, data in manage_api_service.stream(
+                request.github_repo_url,
+                request.candidate_level,
+                request.assignment_description,
+            ):
+                yield format_sse(event, data)
+        except HTTPException as exc:
+            yield format_sse(
+                "error",
+                {"status_code": exc.status_code, "detail": exc.detail},
+            )
         except Exception as exc:
-            logger.info(
-                f"Failed to adding a result to cache. Error: '{exc}'"
+            logger.error(
+                f"Streaming review failed for "
+                f"'{request.github_repo_url}'. Error: '{exc}'"
+            )
+            yield format_sse(
+                "error",
+                {
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": str(exc),
+                },
             )
 
-        return result
-    except HTTPException as exc:
-        raise exc
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    return REGISTRY.render()
+
+
+@app.post("/reviews", status_code=status.HTTP_202_ACCEPTED)
+async def create_review_job(request: ReviewJobRequest) -> dict[str, str]:
+    if request.webhook_url is not None:
+        try:
+            await validate_webhook_url(str(request.webhook_url))
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+            )
+
+    try:
+        job_id = await review_job_queue.enqueue(
+            request.model_dump(mode="json")
+        )
     except Exception as exc:
+        logger.error(f"Failed to enqueue review job. Error: '{exc}'")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(exc),
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Review queue is unavailable",
         )
+
+    logger.info(
+        f"Queued review job {job_id} for '{request.github_repo_url}'"
+    )
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/reviews/{job_id}")
+async def get_review_job(job_id: str) -> dict[str, Any]:
+    job = await review_job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Review job not found: {job_id}",
+        )
+
+    job.pop("request", None)
+    return job
@@ -1,4 +1,5 @@
 import logging
+import os
 
 
 OPENAI_MODEL = "gpt-4-turbo"
@@ -10,7 +11,200 @@ MODEL_TOKEN_LIMITS = {
     "gpt-3.5-turbo": 200000,
 }
 
-REDIS_URL = "redis://redis:6379"
+MODEL_QUALITY_TIERS = {
+    "gpt-4": 2,
+    "gpt-4o-realtime-preview": 2,
+    "gpt-4-turbo": 2,
+    "gpt-3.5-turbo": 1,
+}
+MODEL_PROMPT_COSTS = {
+    "gpt-4": 0.03,
+    "gpt-4o-realtime-preview": 0.005,
+    "gpt-4-turbo": 0.01,
+    "gpt-3.5-turbo": 0.0005,
+}
+CANDIDATE_LEVEL_TIERS = {"junior": 1, "middle": 2, "senior": 2}
+
+LLM_ROUTING_MODELS = tuple(
+    model.strip()
+    for model in os.getenv(
+        "LLM_ROUTING_MODELS", f"gpt-3.5-turbo,{OPENAI_MODEL}"
+    ).split(",")
+    if model.strip()
+)
+LLM_ROUTING_STRATEGIES = ("latency", "cost")
+LLM_ROUTING_STRATEGY = os.getenv("LLM_ROUTING_STRATEGY", "latency")
+
+LLM_BACKENDS = ("openai", "stub")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+
+STUB_LLM_LATENCY = float(os.getenv("STUB_LLM_LATENCY", "0.5"))
+STUB_LLM_TOKENS_PER_SECOND = float(
+    os.getenv("STUB_LLM_TOKENS_PER_SECOND", "50")
+)
+STUB_LLM_RESPONSE_TOKENS = int(os.getenv("STUB_LLM_RESPONSE_TOKENS", "200"))
+STUB_LLM_ERROR_RATE = float(os.getenv("STUB_LLM_ERROR_RATE", "0"))
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379")
+
+OFFLOAD_INLINE_MAX_BYTES = int(os.getenv("OFFLOAD_INLINE_MAX_BYTES", "65536"))
+OFFLOAD_PROCESS_MIN_BYTES = int(os.getenv("OFFLOAD_PROCESS_MIN_BYTES", "0"))
+OFFLOAD_THREAD_WORKERS = int(os.getenv("OFFLOAD_THREAD_WORKERS", "4"))
+OFFLOAD_PROCESS_WORKERS = int(os.getenv("OFFLOAD_PROCESS_WORKERS", "2"))
+
+REPO_MAX_TOKENS = int(os.getenv("REPO_MAX_TOKENS", "500000"))
+TOKEN_COUNT_CACHE_SIZE = int(os.getenv("TOKEN_COUNT_CACHE_SIZE", "100000"))
+
+MAP_REDUCE_ENABLED = os.getenv("MAP_REDUCE_ENABLED", "true").lower() == "true"
+MAP_REDUCE_CHUNK_TOKENS = int(os.getenv("MAP_REDUCE_CHUNK_TOKENS", "20000"))
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", "4"))
+CHUNK_REVIEW_CACHE_TTL = int(os.getenv("CHUNK_REVIEW_CACHE_TTL", "2592000"))
+
+REVIEW_CACHE_TTL = int(os.getenv("REVIEW_CACHE_TTL", "2592000"))
+REVIEW_CACHE_REFRESH_AFTER = int(
+    os.getenv("REVIEW_CACHE_REFRESH_AFTER", "2332800")
+)
+
+INCREMENTAL_REVIEW_ENABLED = (
+    os.getenv("INCREMENTAL_REVIEW_ENABLED", "true").lower() == "true"
+)
+INCREMENTAL_REVIEW_MAX_FILES = int(
+    os.getenv("INCREMENTAL_REVIEW_MAX_FILES", "100")
+)
+REVIEW_HISTORY_TTL = int(os.getenv("REVIEW_HISTORY_TTL", "7776000"))
+
+SINGLE_FLIGHT_LOCK_TTL = int(os.getenv("SINGLE_FLIGHT_LOCK_TTL", "600"))
+SINGLE_FLIGHT_WAIT_TIMEOUT = float(
+    os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", "300")
+)
+
+REVIEW_STREAM_PROGRESS_INTERVAL = float(
+    os.getenv("REVIEW_STREAM_PROGRESS_INTERVAL", "0.5")
+)
+
+REVIEW_BATCH_CONCURRENCY = int(os.getenv("REVIEW_BATCH_CONCURRENCY", "8"))
+REVIEW_BATCH_MAX_SUBMISSIONS = int(
+    os.getenv("REVIEW_BATCH_MAX_SUBMISSIONS", "200")
+)
+
+REVIEW_JOB_QUEUE = os.getenv("REVIEW_JOB_QUEUE", "review_jobs")
+REVIEW_JOB_TTL = int(os.getenv("REVIEW_JOB_TTL", "86400"))
+REVIEW_JOB_LEASE_TTL = int(os.getenv("REVIEW_JOB_LEASE_TTL", "60"))
+REVIEW_WORKER_CONCURRENCY = int(os.getenv("REVIEW_WORKER_CONCURRENCY", "4"))
+REVIEW_WEBHOOK_TIMEOUT = float(os.getenv("REVIEW_WEBHOOK_TIMEOUT", "10"))
+REVIEW_WEBHOOK_MAX_RETRIES = int(os.getenv("REVIEW_WEBHOOK_MAX_RETRIES", "3"))
+REVIEW_WEBHOOK_ALLOWED_HOSTS = tuple(
+    host.strip().lower()
+    for host in os.getenv("REVIEW_WEBHOOK_ALLOWED_HOSTS", "").split(",")
+    if host.strip()
+)
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+GITHUB_FETCH_MODES = ("contents", "tree", "tarball")
+GITHUB_FETCH_MODE = os.getenv("GITHUB_FETCH_MODE", "contents")
+
+GITHUB_HTTP2 = os.getenv("GITHUB_HTTP2", "true").lower() == "true"
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "100"))
+GITHUB_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("GITHUB_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+GITHUB_KEEPALIVE_EXPIRY = float(os.getenv("GITHUB_KEEPALIVE_EXPIRY", "60"))
+
+GITHUB_MAX_CONCURRENT_REQUESTS = int(
+    os.getenv("GITHUB_MAX_CONCURRENT_REQUESTS", "20")
+)
+GITHUB_RATE_LIMIT_MAX_RETRIES = int(
+    os.getenv("GITHUB_RATE_LIMIT_MAX_RETRIES", "3")
+)
+GITHUB_RATE_LIMIT_MAX_WAIT = float(
+    os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "60")
+)
+GITHUB_RATE_LIMIT_PACING_THRESHOLD = int(
+    os.getenv("GITHUB_RATE_LIMIT_PACING_THRESHOLD", "100")
+)
+
+GITHUB_RESPONSE_STORE_MAX_BYTES = int(
+    os.getenv("GITHUB_RESPONSE_STORE_MAX_BYTES", "67108864")
+)
+
+GITHUB_RETRY_MAX_RETRIES = int(os.getenv("GITHUB_RETRY_MAX_RETRIES", "5"))
+GITHUB_RETRY_BASE_DELAY = float(os.getenv("GITHUB_RETRY_BASE_DELAY", "0.5"))
+GITHUB_RETRY_MAX_DELAY = float(os.getenv("GITHUB_RETRY_MAX_DELAY", "10"))
+GITHUB_RETRY_DEADLINE = float(os.getenv("GITHUB_RETRY_DEADLINE", "60"))
+
+LLM_RETRY_MAX_RETRIES = int(os.getenv("LLM_RETRY_MAX_RETRIES", "5"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+LLM_RETRY_DEADLINE = float(os.getenv("LLM_RETRY_DEADLINE", "180"))
+
+LLM_PRIORITIES = ("interactive", "batch")
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_DISPATCH_COMPLETION_TOKENS = int(
+    os.getenv("LLM_DISPATCH_COMPLETION_TOKENS", "1000")
+)
+LLM_DISPATCH_MAX_WAIT = float(os.getenv("LLM_DISPATCH_MAX_WAIT", "300"))
+
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(
+    os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")
+)
+CIRCUIT_BREAKER_RECOVERY_TIMEOUT = float(
+    os.getenv("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "30")
+)
+
+FILE_FILTER_ENABLED = (
+    os.getenv("FILE_FILTER_ENABLED", "true").lower() == "true"
+)
+FILE_FILTER_MAX_FILE_SIZE = int(
+    os.getenv("FILE_FILTER_MAX_FILE_SIZE", "204800")
+)
+FILE_FILTER_EXCLUDED_DIRS = (
+    ".git", ".github", ".idea", ".vscode", ".venv", "venv", "env",
+    "node_modules", "bower_components", "vendor", "third_party",
+    "dist", "build", "out", "target", "coverage", "htmlcov",
+    "__pycache__", ".pytest_cache", ".mypy_cache", ".tox", ".next",
+)
+FILE_FILTER_EXCLUDED_FILES = (
+    "package-lock.json", "yarn.lock", "pnpm-lock.yaml", "poetry.lock",
+    "Pipfile.lock", "composer.lock", "Cargo.lock", "Gemfile.lock", "go.sum",
+    ".DS_Store",
+)
+FILE_FILTER_EXCLUDED_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".svg", ".webp",
+    ".ttf", ".otf", ".woff", ".woff2", ".eot",
+    ".zip", ".tar", ".gz", ".tgz", ".bz2", ".7z", ".rar", ".jar", ".war",
+    ".exe", ".dll", ".so", ".dylib", ".bin", ".o", ".a", ".class",
+    ".pyc", ".pyo", ".whl", ".egg",
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+    ".mp3", ".mp4", ".wav", ".avi", ".mov", ".webm",
+    ".sqlite", ".sqlite3", ".db", ".pkl", ".npy", ".h5",
+    ".lock", ".map", ".min.js", ".min.css",
+)
+
+SNAPSHOT_STORE_ENABLED = (
+    os.getenv("SNAPSHOT_STORE_ENABLED", "true").lower() == "true"
+)
+SNAPSHOT_STORE_DIR = os.getenv("SNAPSHOT_STORE_DIR", ".snapshots")
+SNAPSHOT_STORE_MAX_BYTES = int(
+    os.getenv("SNAPSHOT_STORE_MAX_BYTES", "1073741824")
+)
+
+BLOB_CACHE_MAX_BYTES = int(os.getenv("BLOB_CACHE_MAX_BYTES", "134217728"))
+BLOB_CACHE_REDIS_ENABLED = (
+    os.getenv("BLOB_CACHE_REDIS_ENABLED", "true").lower() == "true"
+)
+BLOB_CACHE_REDIS_TTL = int(os.getenv("BLOB_CACHE_REDIS_TTL", "604800"))
+
+CACHE_SERIALIZERS = ("json", "orjson", "msgpack")
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "orjson")
+CACHE_COMPRESSIONS = ("none", "zlib", "zstd", "lz4")
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zstd")
+CACHE_COMPRESSION_MIN_BYTES = int(
+    os.getenv("CACHE_COMPRESSION_MIN_BYTES", "1024")
+)
+CACHE_COMPRESSION_LEVEL = int(os.getenv("CACHE_COMPRESSION_LEVEL", "3"))
+
 
 def setup_logger() -> logging.Logger:
     logging.basicConfig(
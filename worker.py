@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+from redis.asyncio import Redis
+
+from app.services.blob_cache import BlobCache
+from app.services.http_client import create_github_client
+from app.services.manage_api_service import ManageAPIService
+from app.services.model_router import ModelRouter
+from app.services.review_cache import ChunkReviewCache, ReviewHistory
+from app.services.review_jobs import ReviewJobQueue, ReviewWorker
+from app.services.snapshot_store import SnapshotStore
+from settings import (
+    setup_logger,
+    BLOB_CACHE_REDIS_ENABLED,
+    REDIS_URL,
+    SNAPSHOT_STORE_ENABLED,
+)
+
+logger = setup_logger()
+
+
+async def main() -> None:
+    redis_client = Redis.from_url(REDIS_URL)
+    blob_cache = BlobCache(
+        redis_client=redis_client if BLOB_CACHE_REDIS_ENABLED else None
+    )
+    chunk_review_cache = ChunkReviewCache(redis_client)
+    review_history = ReviewHistory(redis_client)
+    model_router = ModelRouter()
+    snapshot_store = SnapshotStore() if SNAPSHOT_STORE_ENABLED else None
+
+    async with create_github_client() as github_client, \
+            httpx.AsyncClient() as webhook_client:
+        worker = ReviewWorker(
+            ReviewJobQueue(redis_client),
+            lambda: ManageAPIService(
+                github_client,
+                blob_cache,
+                chunk_review_cache,
+                model_router,
+                snapshot_store,
+                review_history,
+                priority="batch",
+            ),
+            webhook_client,
+        )
+        await worker.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())